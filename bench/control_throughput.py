@@ -0,0 +1,102 @@
+"""Throughput of the local control API against the simulated backend.
+
+Run from the project root:
+
+    python -m bench.control_throughput --messages 5000 --batch 10
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from src.backends import create_backend
+from src.control import ControlClient, ControlServer
+from src.core import BalancerCore
+from src.dispatch import LoopDispatcher
+
+
+def start_core(sessions):
+    backend = create_backend("simulated", session_count=sessions, seed=1)
+    backend.add_session("discord.exe")
+    backend.add_session("game.exe")
+
+    dispatcher = LoopDispatcher()
+    core = BalancerCore(backend, dispatcher, fade_duration=0)
+    core.start()
+    core.refresh(wait=True)
+
+    thread = threading.Thread(target=dispatcher.run, name="core", daemon=True)
+    thread.start()
+    return core, dispatcher, thread
+
+
+def _balance(i):
+    return round((i % 200) / 100 - 1.0, 2)
+
+
+def measure(client, messages, batch):
+    results = {}
+
+    started = time.perf_counter()
+    for i in range(messages):
+        client.set_balance(_balance(i))
+    elapsed = time.perf_counter() - started
+    results["round_trip"] = {"commands_per_s": messages / elapsed, "latency_ms": elapsed / messages * 1000}
+
+    commands = [[{"cmd": "set_balance", "value": _balance(i)}] for i in range(messages)]
+    started = time.perf_counter()
+    for chunk in range(0, messages, 100):
+        client.pipeline(commands[chunk:chunk + 100])
+    elapsed = time.perf_counter() - started
+    results["pipelined"] = {"commands_per_s": messages / elapsed}
+
+    batches = [
+        [{"cmd": "set_balance", "value": _balance(i + j)} for j in range(batch)]
+        for i in range(0, messages, batch)
+    ]
+    started = time.perf_counter()
+    for chunk in range(0, len(batches), 100):
+        client.pipeline(batches[chunk:chunk + 100])
+    elapsed = time.perf_counter() - started
+    results[f"batched_{batch}"] = {"commands_per_s": len(batches) * batch / elapsed, "messages_per_s": len(batches) / elapsed}
+
+    return results
+
+
+def run(messages=2000, batch=10, sessions=100, address=None):
+    address = address or f"unix:{os.path.join(tempfile.mkdtemp(), 'bench.sock')}"
+    core, dispatcher, thread = start_core(sessions)
+    server = ControlServer(core, address, os.path.join(tempfile.mkdtemp(), "control.token"))
+    server.start()
+
+    try:
+        with ControlClient(server.address, token=server.token) as client:
+            client.select(1, name="discord.exe")
+            client.select(2, name="game.exe")
+            return measure(client, messages, batch)
+    finally:
+        server.stop()
+        dispatcher.post(dispatcher.stop)
+        thread.join()
+        core.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=10)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--address", help="control address (default: a temporary unix socket)")
+    args = parser.parse_args()
+
+    address = args.address
+    if address is None and os.name == "nt":
+        address = "tcp:127.0.0.1:0"
+    print(json.dumps(run(args.messages, args.batch, args.sessions, address), indent=2))
+
+
+if __name__ == "__main__":
+    main()
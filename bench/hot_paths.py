@@ -0,0 +1,218 @@
+"""Timings of the window's hot paths against the simulated backend.
+
+Run from the project root (on a Linux box without a display, under Xvfb):
+
+    xvfb-run python -m bench.hot_paths --sessions 2,100,10000 --output before.json
+    xvfb-run python -m bench.hot_paths --sessions 2,100,10000 --compare before.json
+
+Each session count gets a fresh window with hotkeys disabled. Results are
+written as JSON with per-call median, p95 and mean times in microseconds;
+``--compare`` prints the change against a previous run and exits with
+status 1 when a median regressed by more than ``--threshold``.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tkinter as tk
+
+from src.backends import create_backend
+from src.commands import CommandQueue
+from src.hotkeys import NUDGE_STEP
+from src.main import VolumeBalancer
+
+DEFAULT_SESSIONS = (2, 10, 100, 1000, 10000)
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "calls": len(ordered),
+        "median_us": statistics.median(ordered) * 1e6,
+        "p95_us": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1e6,
+        "mean_us": statistics.fmean(ordered) * 1e6,
+    }
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+
+#########################################
+# Workloads
+#########################################
+
+def bench_refresh(app, backend, repeat):
+    steady = [timed(app.refresh_processes, True) for _ in range(repeat)]
+
+    # A session appears before one timed refresh and leaves before the next
+    churn = []
+    for i in range(repeat):
+        if i % 2 == 0:
+            added = backend.add_session()
+        else:
+            backend.remove_session(added.pid)
+        churn.append(timed(app.refresh_processes, True))
+    return {"refresh_processes": summarize(steady), "refresh_processes_churn": summarize(churn)}
+
+
+def bench_combobox(app, repeat):
+    return {"update_combobox_values": summarize([timed(app.update_combobox_values) for _ in range(repeat)])}
+
+
+def bench_selection(app, repeat):
+    keys = [key for key in app.audio_sessions.keys() if key.startswith(("discord.exe", "game.exe"))]
+    samples = []
+    for i in range(repeat):
+        app.process1_var.set(keys[i % 2] if app.process2 is None else keys[0])
+        samples.append(timed(app.on_process1_selected))
+    return {"on_process1_selected": summarize(samples)}
+
+
+def bench_slider_drag(app, root, repeat):
+    # Sweeps the slider end to end at its resolution; every step runs update_volumes
+    positions = [round(-1.0 + i / 100, 2) for i in range(201)]
+    samples = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for position in positions:
+            samples.append(timed(app.balance_var.set, position))
+        root.update()
+        positions.reverse()
+    flushed = timed(app.scheduler.flush)
+    return {
+        "update_volumes_slider_drag": summarize(samples),
+        "slider_drag_total_ms": (time.perf_counter() - started) * 1000,
+        "slider_drag_flush_us": flushed * 1e6,
+    }
+
+
+def bench_hotkey_repeat(app, root, repeat):
+    # Key repeat at ~30 Hz: ten presses one way, then ten back, each applied at once
+    app.crossfader.duration = 0
+    samples = []
+    for i in range(repeat):
+        delta = NUDGE_STEP if (i // 10) % 2 == 0 else -NUDGE_STEP
+        samples.append(timed(app.core.nudge, delta))
+        if i % 10 == 9:
+            root.update()
+    flushed = timed(app.scheduler.flush)
+    return {"update_volumes_hotkey_repeat": summarize(samples), "hotkey_repeat_flush_us": flushed * 1e6}
+
+
+def bench_hotkey_queue(app, repeat):
+    # The path real hotkeys take: the hook thread enqueues, the dispatcher drains.
+    # The Tk dispatcher drains every 20 ms, so at ~30 Hz repeat most drains see one press
+    app.crossfader.duration = 0
+    commands = CommandQueue(app.core)
+    enqueue = []
+    drain = []
+    for i in range(repeat):
+        delta = NUDGE_STEP if (i // 10) % 2 == 0 else -NUDGE_STEP
+        enqueue.append(timed(commands.nudge, delta))
+        if i % 3 != 2:
+            drain.append(timed(app.dispatcher.drain))
+    flushed = timed(app.scheduler.flush)
+    return {
+        "hotkey_queue_enqueue": summarize(enqueue),
+        "hotkey_queue_drain": summarize(drain),
+        "hotkey_queue_flush_us": flushed * 1e6,
+    }
+
+
+def bench_sessions(count, repeat):
+    backend = create_backend("simulated", session_count=max(count - 2, 0), seed=1)
+    backend.add_session("discord.exe")
+    backend.add_session("game.exe")
+
+    root = tk.Tk()
+    root.withdraw()
+    app = VolumeBalancer(root, backend, hotkeys=False)
+    try:
+        results = {"sessions": count}
+        results["first_refresh_us"] = timed(app.refresh_processes, True) * 1e6
+        results.update(bench_refresh(app, backend, repeat))
+        results.update(bench_combobox(app, repeat))
+        results.update(bench_selection(app, repeat))
+        # The selection sweep may leave game.exe in slot 1, which slot 2 needs
+        keys = app.audio_sessions.keys()
+        app.core.select(0, next(key for key in keys if key.startswith("discord.exe")))
+        app.core.select(1, next(key for key in keys if key.startswith("game.exe")))
+        results.update(bench_slider_drag(app, root, max(repeat // 20, 1)))
+        results.update(bench_hotkey_repeat(app, root, repeat))
+        results.update(bench_hotkey_queue(app, repeat))
+        return results
+    finally:
+        app.on_closing()
+
+
+#########################################
+# Output
+#########################################
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run(sessions=DEFAULT_SESSIONS, repeat=200):
+    return {"meta": metadata(), "results": {str(count): bench_sessions(count, repeat) for count in sessions}}
+
+
+def compare(baseline, current, threshold):
+    """Prints median changes per session count and operation, returns the regressions."""
+    regressions = []
+    for count, results in current["results"].items():
+        before = baseline["results"].get(count)
+        if before is None:
+            continue
+        for name, stats in results.items():
+            if not isinstance(stats, dict) or name not in before:
+                continue
+            old, new = before[name]["median_us"], stats["median_us"]
+            change = (new - old) / old if old else 0.0
+            flag = " REGRESSION" if change > threshold else ""
+            print(f"{count:>6} {name:<30}{old:>12.1f} us {new:>12.1f} us {change:>+8.1%}{flag}")
+            if flag:
+                regressions.append((count, name, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default=",".join(map(str, DEFAULT_SESSIONS)), help="comma separated session counts")
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls per operation")
+    parser.add_argument("--output", metavar="FILE", help="write the results to FILE instead of stdout")
+    parser.add_argument("--compare", metavar="FILE", help="compare against the results in FILE")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative median slowdown counted as a regression")
+    args = parser.parse_args()
+
+    results = run([int(count) for count in args.sessions.split(",")], args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    elif not args.compare:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
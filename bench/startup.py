@@ -0,0 +1,112 @@
+"""Time to first interactive window, cold and warm-started from a snapshot.
+
+Run from the project root (on a Linux box without a display, under Xvfb):
+
+    xvfb-run python -m bench.startup --runs 10 --sessions 100
+
+Every run launches ``python -m src`` against the simulated backend and
+reads the "Window ready" line it prints once the main loop first goes
+idle. Cold runs start without a snapshot; warm runs start from the one the
+previous run saved. Every run starts with a journal holding a few volumes
+a crashed run left behind, as a real launch often does, so their restore
+is part of the measurement. Config files go to a temporary directory.
+Results are printed as JSON with median and worst
+times in milliseconds, both as the window measures them (from the first
+import) and from process spawn, plus how many sessions the window listed
+when it became ready.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.journal import VolumeJournal
+
+READY = re.compile(r"Window ready in ([\d.]+) ms listing (\d+) sessions")
+
+
+class LeftOver:
+    """Stands in for a session whose volume a crashed run left changed."""
+
+    def __init__(self, pid):
+        self.pid = pid
+
+    def get_session_pid(self):
+        return self.pid
+
+    def get_session_name(self):
+        return "crashed.exe"
+
+    def get_initial_volume(self):
+        return 1.0
+
+
+def leave_journal(config):
+    journal = VolumeJournal(os.path.join(config, "volume-balancer", "volumes.journal"))
+    journal.record({LeftOver(pid): 0.5 for pid in range(900000, 900004)})
+    journal.close()
+
+
+def launch(config, snapshot, sessions, timeout=30.0):
+    command = [
+        sys.executable, "-m", "src", "--backend", "simulated", "--sessions", str(sessions),
+        "--no-hotkeys", "--no-profiles", "--journal", "--snapshot", snapshot, "--exit-after", "0.5",
+    ]
+    leave_journal(config)
+    environment = dict(os.environ, APPDATA=config, XDG_CONFIG_HOME=config)
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, env=environment)
+    try:
+        for line in process.stdout:
+            match = READY.search(line)
+            if match:
+                spawn_ms = (time.perf_counter() - started) * 1000
+                return float(match.group(1)), spawn_ms, int(match.group(2))
+        raise RuntimeError(f"Window never became ready (exit status {process.wait()})")
+    finally:
+        # Let the window close itself so the snapshot gets saved
+        process.stdout.read()
+        process.wait(timeout)
+
+
+def summarize(samples):
+    window, spawn, listed = zip(*samples)
+    return {
+        "runs": len(samples),
+        "ready_median_ms": statistics.median(window),
+        "ready_max_ms": max(window),
+        "from_spawn_median_ms": statistics.median(spawn),
+        "sessions_listed": min(listed),
+    }
+
+
+def run(runs, sessions):
+    config = tempfile.mkdtemp()
+    snapshot = os.path.join(config, "snapshot.json")
+    cold = []
+    for _ in range(runs):
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+        cold.append(launch(config, snapshot, sessions))
+
+    # The last cold run left a snapshot behind for the first warm one
+    warm = [launch(config, snapshot, sessions) for _ in range(runs)]
+    return {"sessions": sessions, "cold": summarize(cold), "warm": summarize(warm)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs, args.sessions), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+
+from .backends import BACKENDS, create_backend
+from .crossfade import CURVES
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src", description="Balance the volume of two audio sessions.")
+    parser.add_argument("--headless", action="store_true", help="run without a window, driven by the hotkeys")
+    parser.add_argument("--backend", choices=BACKENDS, default="pycaw", help="audio backend (default: pycaw)")
+    parser.add_argument("--sessions", type=int, default=8, help="number of sessions for the simulated backend")
+    parser.add_argument("--source1", metavar="EXE", help="executable to select as audio source 1")
+    parser.add_argument("--source2", metavar="EXE", help="executable to select as audio source 2")
+    parser.add_argument("--curve", choices=sorted(CURVES), default="linear", help="balance curve (default: linear)")
+    parser.add_argument("--control", nargs="?", const="", metavar="ADDRESS", help="serve the local control API on unix:PATH or tcp:HOST:PORT")
+    parser.add_argument("--metrics", nargs="?", const="", metavar="FILE", help="time backend calls and hotkeys; writes JSON (or Prometheus text for .prom) to FILE on exit")
+    parser.add_argument("--profiles", metavar="FILE", help="profile file (default: volume-balancer/profiles.json in the user config directory)")
+    parser.add_argument("--no-profiles", dest="use_profiles", action="store_false", help="do not load or save profiles")
+    parser.add_argument("--duck", nargs="?", type=float, const=0.5, metavar="DEPTH", help="lower source 2 while source 1 is loud (default depth: 0.5)")
+    parser.add_argument("--level", action="store_true", help="even out the loudness of the two sources")
+    parser.add_argument("--restore", action="store_true", help="restore the volumes left behind by a crashed run and exit")
+    parser.add_argument("--snapshot", metavar="FILE", help="startup snapshot file (default: volume-balancer/snapshot.json in the user config directory)")
+    parser.add_argument("--no-snapshot", dest="use_snapshot", action="store_false", help="do not start from or save a snapshot of the window")
+    parser.add_argument("--journal", dest="journal", action="store_true", default=None, help="journal volume changes for crash recovery (default: on, except with the simulated backend)")
+    parser.add_argument("--no-journal", dest="journal", action="store_false", help="do not journal volume changes for crash recovery")
+    parser.add_argument("--record", metavar="FILE", help="record balance changes and write them to FILE as a timeline on exit")
+    parser.add_argument("--play", metavar="FILE", help="play back a recorded balance timeline from FILE")
+    parser.add_argument("--no-hotkeys", dest="hotkeys", action="store_false", help="do not register global hotkeys")
+    parser.add_argument("--exit-after", type=float, metavar="SECONDS", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = {"session_count": args.sessions, "signals": args.duck is not None or args.level} if args.backend == "simulated" else {}
+    # The backend is only imported once a worker first needs it, so the window comes up first
+    backend = create_backend(args.backend, lazy=True, **options)
+    sources = (args.source1, args.source2)
+    control = args.control
+    if control == "":
+        from .control import default_address
+        control = default_address()
+
+    metrics = None
+    if args.metrics is not None:
+        from .metrics import Metrics
+        metrics = Metrics()
+
+    timeline = None
+    if args.play:
+        from .timeline import Timeline
+        try:
+            timeline = Timeline.load(args.play)
+        except (OSError, ValueError) as e:
+            print(f"Cannot play {args.play}: {e}")
+            return
+
+    # Simulated sessions have nothing to recover, and a journal of theirs would share the real one's file
+    if args.journal is None:
+        args.journal = args.backend != "simulated"
+
+    journal = None
+    if args.journal or args.restore:
+        from .journal import VolumeJournal, restore
+        journal = VolumeJournal()
+        if args.restore:
+            print(f"Restored the volume of {restore(journal, backend)} session(s) left changed by a previous run")
+            journal.close()
+            return
+
+    profiles = None
+    if args.use_profiles:
+        from .profiles import ProfileStore
+        profiles = ProfileStore(args.profiles)
+        try:
+            profiles.load()
+        except ValueError as e:
+            # Saving on exit would otherwise replace the user's file with an empty one
+            try:
+                print(f"Moved unreadable profile file {profiles.path} to {profiles.set_aside()}: {e}")
+                profiles = ProfileStore(args.profiles)
+            except OSError as error:
+                print(f"Profiles disabled, {profiles.path} is unreadable ({e}) and could not be moved: {error}")
+                profiles = None
+        except OSError as e:
+            print(f"Profiles disabled, {profiles.path} could not be read: {e}")
+            profiles = None
+
+    if args.headless:
+        from .headless import run_headless
+        run_headless(backend, args.curve, sources, args.hotkeys, STARTED, args.exit_after, control, metrics, profiles, args.duck, args.level, journal, args.record, timeline)
+    else:
+        snapshot = None
+        if args.use_snapshot:
+            from .snapshot import default_path
+            snapshot = args.snapshot or default_path()
+
+        from .main import main as run_window
+        run_window(backend, args.curve, sources, args.hotkeys, control, metrics, profiles, args.duck, args.level, journal, snapshot, STARTED, args.exit_after, args.record, timeline)
+
+    if args.metrics:
+        metrics.write(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
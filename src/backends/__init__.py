@@ -0,0 +1,17 @@
+from .base import AudioBackend, SessionExpiredError
+
+BACKENDS = ("pycaw", "simulated")
+
+
+def create_backend(name="pycaw", lazy=False, **options):
+    # Backends are imported on demand so pycaw/comtypes are only loaded on Windows
+    if lazy:
+        from .lazy import LazyBackend
+        return LazyBackend(name, options)
+    if name == "pycaw":
+        from .pycaw_backend import PycawBackend
+        return PycawBackend(**options)
+    if name == "simulated":
+        from .simulated import SimulatedBackend
+        return SimulatedBackend(**options)
+    raise ValueError(f"Unknown audio backend: {name}")
@@ -0,0 +1,72 @@
+class SessionExpiredError(Exception):
+    pass
+
+
+class AudioBackend:
+    """Interface between the balancer and an audio stack.
+
+    Sessions and volume controls are opaque handles owned by the backend:
+    ``list_sessions`` yields session handles, ``open_volume`` turns one into
+    a volume control that ``get_volume`` / ``set_volume`` operate on.
+    Backends that can see several output devices return one handle per
+    active endpoint from ``list_endpoints``, each listed separately by
+    ``list_sessions(endpoint)``, and tag sessions with the name of their
+    device; the default is a single ``None`` endpoint.
+    Backends that can push session changes implement ``watch_sessions``;
+    the default returns ``None`` and callers fall back to polling. The same
+    goes for ``watch_volume``, which reports volume changes made to a
+    session by anything other than this backend.
+    Backends that can meter sessions return a handle from ``open_meter``
+    that ``get_peak`` reads the current peak level (0.0 - 1.0) from.
+    Worker threads call ``thread_init`` / ``thread_exit`` around their use
+    of the backend.
+    """
+
+    name = None
+
+    def thread_init(self):
+        pass
+
+    def thread_exit(self):
+        pass
+
+    def list_endpoints(self):
+        return [None]
+
+    def get_endpoint_name(self, endpoint):
+        return None
+
+    def list_sessions(self, endpoint=None):
+        raise NotImplementedError
+
+    def watch_sessions(self, on_added, on_removed):
+        # Returns a callable that stops the notifications, or None if unsupported
+        return None
+
+    def watch_volume(self, session, on_changed):
+        # Returns a callable that stops the notifications, or None if unsupported
+        return None
+
+    def get_session_pid(self, session):
+        raise NotImplementedError
+
+    def get_session_name(self, session):
+        raise NotImplementedError
+
+    def get_session_device(self, session):
+        return None
+
+    def open_volume(self, session):
+        raise NotImplementedError
+
+    def get_volume(self, volume):
+        raise NotImplementedError
+
+    def set_volume(self, volume, value):
+        raise NotImplementedError
+
+    def open_meter(self, session):
+        raise NotImplementedError
+
+    def get_peak(self, meter):
+        raise NotImplementedError
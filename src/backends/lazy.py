@@ -0,0 +1,76 @@
+import threading
+
+from .base import AudioBackend
+
+
+class LazyBackend(AudioBackend):
+    """Creates the named backend on first use rather than at startup.
+
+    Importing pycaw/comtypes is a noticeable part of a launch. Deferred like
+    this, it happens on the first worker thread that touches the backend,
+    once the window is already up. Backends must therefore cope with
+    being imported off the main thread, see ``PycawBackend``.
+    """
+
+    def __init__(self, name, options):
+        self.name = name
+
+        self._options = options
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    from . import create_backend
+                    self._backend = create_backend(self.name, **self._options)
+        return self._backend
+
+    def thread_init(self):
+        self.backend.thread_init()
+
+    def thread_exit(self):
+        self.backend.thread_exit()
+
+    def list_endpoints(self):
+        return self.backend.list_endpoints()
+
+    def get_endpoint_name(self, endpoint):
+        return self.backend.get_endpoint_name(endpoint)
+
+    def list_sessions(self, endpoint=None):
+        if endpoint is None:
+            return self.backend.list_sessions()
+        return self.backend.list_sessions(endpoint)
+
+    def watch_sessions(self, on_added, on_removed):
+        return self.backend.watch_sessions(on_added, on_removed)
+
+    def watch_volume(self, session, on_changed):
+        return self.backend.watch_volume(session, on_changed)
+
+    def get_session_pid(self, session):
+        return self.backend.get_session_pid(session)
+
+    def get_session_name(self, session):
+        return self.backend.get_session_name(session)
+
+    def get_session_device(self, session):
+        return self.backend.get_session_device(session)
+
+    def open_volume(self, session):
+        return self.backend.open_volume(session)
+
+    def get_volume(self, volume):
+        return self.backend.get_volume(volume)
+
+    def set_volume(self, volume, value):
+        return self.backend.set_volume(volume, value)
+
+    def open_meter(self, session):
+        return self.backend.open_meter(session)
+
+    def get_peak(self, meter):
+        return self.backend.get_peak(meter)
@@ -0,0 +1,193 @@
+import sys
+import threading
+
+from ctypes import pointer
+
+# comtypes initialises COM on whichever thread imports it, which may be a
+# worker when the backend is loaded lazily. Make that the multithreaded
+# apartment the workers join, not a single-threaded one they cannot.
+sys.coinit_flags = 0  # COINIT_MULTITHREADED
+
+import comtypes
+
+from comtypes import GUID
+from pycaw.pycaw import (
+    DEVICE_STATE,
+    AudioSession,
+    AudioUtilities,
+    EDataFlow,
+    IAudioMeterInformation,
+    IAudioSessionControl2,
+)
+
+from .base import AudioBackend
+
+RPC_E_CHANGED_MODE = -2147417850  # 0x80010106
+
+
+class PycawBackend(AudioBackend):
+    name = "pycaw"
+
+    # Passed with every write so volume notifications can tell our own changes apart
+    EVENT_CONTEXT = GUID("{6F1B2C3E-8A4D-4E7B-9C15-3D2A7E90B541}")
+    _context = pointer(EVENT_CONTEXT)
+
+    def __init__(self):
+        self._endpoints = {}
+        self._expired = []
+        self._threads = threading.local()
+
+    def thread_init(self):
+        # WASAPI session interfaces are free-threaded, so workers join the MTA
+        try:
+            comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+        except OSError as e:
+            # The thread already has an apartment, e.g. from importing comtypes; keep it
+            if getattr(e, "winerror", None) != RPC_E_CHANGED_MODE:
+                raise
+            return
+        self._threads.initialized = True
+
+    def thread_exit(self):
+        if getattr(self._threads, "initialized", False):
+            self._threads.initialized = False
+            comtypes.CoUninitialize()
+
+    def list_endpoints(self):
+        try:
+            devices = AudioUtilities.GetAllDevices(EDataFlow.eRender.value, DEVICE_STATE.ACTIVE.value)
+            default = AudioUtilities.GetSpeakers()
+        except Exception:
+            devices = []
+        if len(devices) < 2:
+            # One device is what GetAllSessions already walks
+            self._endpoints = {}
+            return [None]
+
+        # Devices are kept across scans so their session managers are only activated once
+        endpoints = {device.id: self._endpoints.get(device.id, device) for device in devices}
+        self._endpoints = endpoints
+        # The default device goes first, so a process playing on several devices is balanced there
+        return sorted(endpoints.values(), key=lambda device: default is None or device.id != default.id)
+
+    def get_endpoint_name(self, endpoint):
+        return endpoint.FriendlyName if endpoint is not None else None
+
+    def list_sessions(self, endpoint=None):
+        self._release_expired()
+        if endpoint is None:
+            return [session for session in AudioUtilities.GetAllSessions() if session.Process]
+
+        name = endpoint.FriendlyName
+        enumerator = endpoint.AudioSessionManager.GetSessionEnumerator()
+        sessions = []
+        for index in range(enumerator.GetCount()):
+            control = enumerator.GetSession(index)
+            if control is None:
+                continue
+            session = AudioSession(control.QueryInterface(IAudioSessionControl2))
+            if session.Process:
+                session.device = name
+                sessions.append(session)
+        return sessions
+
+    def watch_sessions(self, on_added, on_removed):
+        from pycaw.callbacks import AudioSessionEvents, AudioSessionNotification
+
+        manager = AudioUtilities.GetAudioSessionManager()
+        if manager is None:
+            return None
+
+        speakers = AudioUtilities.GetSpeakers()
+        device = speakers.FriendlyName if speakers is not None else None
+        backend = self
+
+        class SessionEvents(AudioSessionEvents):
+            def __init__(self, session):
+                super().__init__()
+                self.session = session
+                self.pid = session.ProcessId
+
+            def on_state_changed(self, new_state, new_state_id):
+                if new_state == "Expired":
+                    self.expire()
+
+            def on_session_disconnected(self, disconnect_reason, disconnect_reason_id):
+                self.expire()
+
+            def expire(self):
+                if self.session is not None:
+                    # Unregistering from inside a callback is not allowed, so it waits for the next scan
+                    backend._expired.append(self.session)
+                    self.session = None
+                    on_removed(self.pid)
+
+        class SessionNotification(AudioSessionNotification):
+            def on_session_created(self, new_session):
+                if new_session.Process:
+                    if backend._endpoints:
+                        # Tagged like the scans of the default device
+                        new_session.device = device
+                    new_session.register_notification(SessionEvents(new_session))
+                    on_added(new_session)
+
+        notification = SessionNotification()
+        manager.RegisterSessionNotification(notification)
+        # Notifications are only delivered once the session list has been requested
+        manager.GetSessionEnumerator()
+
+        def unsubscribe():
+            manager.UnregisterSessionNotification(notification)
+            self._release_expired()
+
+        return unsubscribe
+
+    def _release_expired(self):
+        while self._expired:
+            session = self._expired.pop()
+            try:
+                session.unregister_notification()
+            except Exception:
+                pass
+
+    def watch_volume(self, session, on_changed):
+        from pycaw.callbacks import AudioSessionEvents
+
+        context = self.EVENT_CONTEXT
+
+        class VolumeEvents(AudioSessionEvents):
+            def on_simple_volume_changed(self, new_volume, new_mute, event_context):
+                if not event_context or event_context.contents != context:
+                    on_changed(new_volume)
+
+        events = VolumeEvents()
+        session._ctl.RegisterAudioSessionNotification(events)
+
+        def unsubscribe():
+            session._ctl.UnregisterAudioSessionNotification(events)
+
+        return unsubscribe
+
+    def get_session_pid(self, session):
+        return session.Process.pid
+
+    def get_session_name(self, session):
+        return session.Process.name()
+
+    def get_session_device(self, session):
+        return getattr(session, "device", None)
+
+    def open_volume(self, session):
+        return session.SimpleAudioVolume
+
+    def get_volume(self, volume):
+        return volume.GetMasterVolume()
+
+    def set_volume(self, volume, value):
+        volume.SetMasterVolume(value, self._context)
+
+    def open_meter(self, session):
+        return session._ctl.QueryInterface(IAudioMeterInformation)
+
+    def get_peak(self, meter):
+        return meter.GetPeakValue()
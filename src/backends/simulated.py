@@ -0,0 +1,231 @@
+import random
+import threading
+import time
+
+from collections import Counter
+
+from .base import AudioBackend, SessionExpiredError
+
+
+def talk_bursts(on=1.5, off=2.5, level=0.6, floor=0.02, phase=0.0):
+    """Synthetic peak signal alternating between talking and near silence."""
+    period = on + off
+
+    def signal(t):
+        return level if (t + phase) % period < on else floor
+
+    return signal
+
+
+class SimulatedSession:
+    __slots__ = ("pid", "name", "volume", "alive", "signal", "device")
+
+    def __init__(self, pid, name, volume=1.0, signal=None, device=None):
+        self.pid = pid
+        self.name = name
+        self.volume = volume
+        self.alive = True
+        self.signal = signal
+        self.device = device
+
+
+class SimulatedBackend(AudioBackend):
+    """In-memory audio stack for benchmarks and tests on any platform.
+
+    ``call_latency`` is added to every per-session call, ``enumerate_latency``
+    to every ``list_sessions``. ``churn`` is the fraction of sessions that
+    exit and get replaced by new ones on each enumeration. Session changes,
+    including churn, are pushed to ``watch_sessions`` subscribers. Peak
+    levels come from each session's ``signal`` (a function of the monotonic
+    clock) scaled by its volume; with ``signals`` every new session gets
+    talk bursts at a random phase, otherwise sessions are silent.
+    ``change_volume`` plays another application changing a session's volume
+    and is reported to ``watch_volume`` subscribers. With ``endpoints``,
+    sessions are spread over devices of those names, each listed on its own
+    with the extra delay given for it in ``endpoint_latency``.
+    """
+
+    name = "simulated"
+
+    DEFAULT_NAMES = (
+        "chrome.exe",
+        "discord.exe",
+        "spotify.exe",
+        "firefox.exe",
+        "game.exe",
+        "vlc.exe",
+        "teams.exe",
+        "obs64.exe",
+    )
+
+    def __init__(self, session_count=8, call_latency=0.0, enumerate_latency=0.0, churn=0.0, names=DEFAULT_NAMES, seed=None, signals=False,
+                 endpoints=(), endpoint_latency=None):
+        self.call_latency = call_latency
+        self.enumerate_latency = enumerate_latency
+        self.churn = churn
+        self.names = tuple(names)
+        self.signals = signals
+        self.endpoints = tuple(endpoints)
+        self.endpoint_latency = dict(endpoint_latency or {})
+        self.call_counts = Counter()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._watchers = []
+        self._volume_watchers = {}
+        self._next_pid = 1000
+
+        for _ in range(session_count):
+            self.add_session()
+
+    @property
+    def sessions(self):
+        with self._lock:
+            return list(self._sessions.values())
+
+    def add_session(self, name=None, pid=None, volume=1.0, device=None):
+        with self._lock:
+            session = self._add_session(name, pid, volume, device)
+        self._notify([], [session])
+        return session
+
+    def remove_session(self, pid):
+        with self._lock:
+            session = self._remove_session(pid)
+        if session is not None:
+            self._notify([session], [])
+        return session
+
+    def change_volume(self, pid, volume):
+        with self._lock:
+            session = self._sessions[pid]
+            session.volume = volume
+            watchers = list(self._volume_watchers.get(session, ()))
+        for on_changed in watchers:
+            on_changed(volume)
+
+    def list_endpoints(self):
+        return list(self.endpoints) or [None]
+
+    def get_endpoint_name(self, endpoint):
+        return endpoint
+
+    def list_sessions(self, endpoint=None):
+        self._call("list_sessions", self.enumerate_latency + self.endpoint_latency.get(endpoint, 0.0))
+        removed, added = [], []
+        with self._lock:
+            # Churn happens once per scan, on the first endpoint listed
+            if self.churn and (endpoint is None or endpoint == self.endpoints[0]):
+                removed, added = self._apply_churn()
+            sessions = list(self._sessions.values())
+        self._notify(removed, added)
+        if endpoint is not None:
+            sessions = [session for session in sessions if session.device == endpoint]
+        return sessions
+
+    def watch_sessions(self, on_added, on_removed):
+        watcher = (on_added, on_removed)
+        with self._lock:
+            self._watchers.append(watcher)
+
+        def unsubscribe():
+            with self._lock:
+                self._watchers.remove(watcher)
+
+        return unsubscribe
+
+    def watch_volume(self, session, on_changed):
+        with self._lock:
+            self._volume_watchers.setdefault(session, []).append(on_changed)
+
+        def unsubscribe():
+            with self._lock:
+                watchers = self._volume_watchers.get(session, [])
+                if on_changed in watchers:
+                    watchers.remove(on_changed)
+                if not watchers:
+                    self._volume_watchers.pop(session, None)
+
+        return unsubscribe
+
+    def get_session_pid(self, session):
+        return session.pid
+
+    def get_session_name(self, session):
+        self._call("get_session_name", self.call_latency)
+        return session.name
+
+    def get_session_device(self, session):
+        return session.device
+
+    def open_volume(self, session):
+        return session
+
+    def get_volume(self, volume):
+        self._call("get_volume", self.call_latency)
+        return volume.volume
+
+    def set_volume(self, volume, value):
+        self._call("set_volume", self.call_latency)
+        if not volume.alive:
+            raise SessionExpiredError(f"Session of PID {volume.pid} has expired")
+        volume.volume = value
+
+    def open_meter(self, session):
+        return session
+
+    def get_peak(self, meter):
+        self._call("get_peak", self.call_latency)
+        if not meter.alive:
+            raise SessionExpiredError(f"Session of PID {meter.pid} has expired")
+        # Like WASAPI session meters, the level is measured after the session volume
+        return meter.signal(time.monotonic()) * meter.volume if meter.signal is not None else 0.0
+
+    def _call(self, operation, latency):
+        self.call_counts[operation] += 1
+        if latency > 0:
+            time.sleep(latency)
+
+    def _notify(self, removed, added):
+        with self._lock:
+            watchers = list(self._watchers)
+        for on_added, on_removed in watchers:
+            for session in removed:
+                on_removed(session.pid)
+            for session in added:
+                on_added(session)
+
+    def _add_session(self, name, pid, volume, device=None):
+        if pid is None:
+            while self._next_pid in self._sessions:
+                self._next_pid += 1
+            pid = self._next_pid
+            self._next_pid += 1
+        if name is None:
+            name = self._random.choice(self.names)
+
+        signal = talk_bursts(phase=self._random.uniform(0.0, 4.0)) if self.signals else None
+        if device is None and self.endpoints:
+            device = self._random.choice(self.endpoints)
+        session = SimulatedSession(pid, name, volume, signal, device)
+        self._sessions[pid] = session
+        return session
+
+    def _remove_session(self, pid):
+        session = self._sessions.pop(pid, None)
+        if session is not None:
+            session.alive = False
+        return session
+
+    def _apply_churn(self):
+        churned = self.churn * len(self._sessions)
+        count = int(churned)
+        if self._random.random() < churned - count:
+            count += 1
+
+        removed, added = [], []
+        for pid in self._random.sample(list(self._sessions), min(count, len(self._sessions))):
+            removed.append(self._remove_session(pid))
+            added.append(self._add_session(None, None, 1.0))
+        return removed, added
@@ -0,0 +1,118 @@
+import bisect
+
+from .groups import group_key
+
+
+def _grams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SessionCatalog:
+    """Searchable index of readable session keys.
+
+    Keys are kept in a sorted list for prefix lookups and in a trigram
+    index for substring lookups, both updated per added or removed key.
+    Results list prefix matches first, then other substring matches, each
+    in key order. Keys touched since the last ``take_changes`` are tracked
+    so views can tell whether their results went stale. With ``groups``,
+    executables with more than one session also get a group key.
+    """
+
+    def __init__(self, keys=(), groups=False):
+        self._sorted = []
+        self._lower = {}
+        self._grams = {}
+        self._changes = set()
+        self._group_counts = {} if groups else None
+        for key in keys:
+            self.add(key)
+
+    def add(self, key):
+        if key in self._lower:
+            return
+        self._insert(key)
+        if self._group_counts is not None:
+            name = key.rpartition(" (PID: ")[0]
+            count = self._group_counts[name] = self._group_counts.get(name, 0) + 1
+            if count == 2:
+                self._insert(group_key(name))
+
+    def remove(self, key):
+        if key not in self._lower:
+            return
+        self._delete(key)
+        if self._group_counts is not None:
+            name = key.rpartition(" (PID: ")[0]
+            count = self._group_counts[name] = self._group_counts[name] - 1
+            if count == 1:
+                self._delete(group_key(name))
+            elif not count:
+                del self._group_counts[name]
+
+    def _insert(self, key):
+        if key in self._lower:
+            return
+        lower = self._lower[key] = key.lower()
+        bisect.insort(self._sorted, (lower, key))
+        for gram in _grams(lower):
+            self._grams.setdefault(gram, set()).add(key)
+        self._changes.add(key)
+
+    def _delete(self, key):
+        lower = self._lower.pop(key, None)
+        if lower is None:
+            return
+        index = bisect.bisect_left(self._sorted, (lower, key))
+        del self._sorted[index]
+        for gram in _grams(lower):
+            keys = self._grams[gram]
+            keys.discard(key)
+            if not keys:
+                del self._grams[gram]
+        self._changes.add(key)
+
+    def take_changes(self):
+        changes, self._changes = self._changes, set()
+        return changes
+
+    def matches(self, key, query):
+        return query.lower() in self._lower.get(key, key.lower())
+
+    def search(self, query="", limit=None, exclude=()):
+        query = query.strip().lower()
+        results = []
+        for key in self._candidates(query):
+            if key not in exclude:
+                results.append(key)
+                if len(results) == limit:
+                    break
+        return results
+
+    def _candidates(self, query):
+        entries = self._sorted
+        prefixed = set()
+        for index in range(bisect.bisect_left(entries, (query,)), len(entries)):
+            lower, key = entries[index]
+            if not lower.startswith(query):
+                break
+            prefixed.add(key)
+            yield key
+        if not query:
+            return
+
+        if len(query) < 3:
+            rest = (key for lower, key in self._sorted if query in lower)
+        else:
+            grams = sorted((self._grams.get(gram, set()) for gram in _grams(query)), key=len)
+            found = set.intersection(*grams) if grams else set()
+            rest = (key for key in sorted(found, key=self._lower.get) if query in self._lower[key])
+
+        for key in rest:
+            if key not in prefixed:
+                yield key
+
+    def __contains__(self, key):
+        return key in self._lower
+
+    def __len__(self):
+        return len(self._sorted)
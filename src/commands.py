@@ -0,0 +1,84 @@
+import collections
+import time
+
+NUDGE = "nudge"
+FADE = "fade"
+
+
+class CommandQueue:
+    """Hands balance commands from other threads to the core.
+
+    Producers such as the ``keyboard`` hook thread only append to a deque
+    and post a drain to the dispatcher when none is pending, so the core is
+    never touched off its own thread. A drain folds everything queued since
+    the last one into a single fade, which keeps held keys from leaving a
+    tail of steps behind after release.
+
+    With ``acceleration`` set, a nudge that repeats the previous direction
+    within ``repeat_window`` seconds grows by that fraction of its size per
+    repeat, up to ``max_step``.
+    """
+
+    def __init__(self, core, acceleration=0.0, max_step=0.5, repeat_window=0.15):
+        self.acceleration = acceleration
+        self.max_step = max_step
+        self.repeat_window = repeat_window
+
+        self._core = core
+        self._events = collections.deque()
+        self._scheduled = False
+        self._streak = 0
+        self._last_sign = 0
+        self._last_at = None
+
+    def nudge(self, delta):
+        self._push(NUDGE, delta)
+
+    def fade_to(self, target):
+        self._push(FADE, target)
+
+    def _push(self, kind, value):
+        if self._core.metrics is not None:
+            self._core.metrics.mark_input()
+        self._events.append((kind, value, time.monotonic()))
+        # The drain clears the flag before emptying the deque, so an event is never stranded
+        if not self._scheduled:
+            self._scheduled = True
+            self._core.dispatcher.post(self.drain)
+
+    def drain(self):
+        self._scheduled = False
+        position = None
+        while self._events:
+            kind, value, at = self._events.popleft()
+            if kind == FADE:
+                position = value
+                self._last_sign = 0
+            else:
+                if position is None:
+                    position = self._core.crossfader.target
+                position += self._step(value, at)
+            position = min(max(position, -1.0), 1.0)
+
+        if position is None:
+            return
+        core = self._core
+        submitted = core.scheduler.submitted
+        core.fade_balance(position)
+        if core.metrics is not None and not core.crossfader.active \
+                and core.scheduler.submitted == submitted and not self._events:
+            # Nothing will be written for this input, so no write may complete its mark
+            core.metrics.cancel_input()
+
+    def _step(self, delta, at):
+        sign = 1 if delta > 0 else -1
+        if sign == self._last_sign and at - self._last_at <= self.repeat_window:
+            self._streak += 1
+        else:
+            self._streak = 0
+        self._last_sign, self._last_at = sign, at
+
+        if not self.acceleration:
+            return delta
+        size = min(abs(delta) * (1 + self.acceleration * self._streak), max(self.max_step, abs(delta)))
+        return sign * size
@@ -0,0 +1,466 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+import tempfile
+import threading
+
+from .core import SelectionConflictError
+from .profiles import config_dir
+
+DEFAULT_TCP_PORT = 47321
+
+
+class ControlError(Exception):
+    pass
+
+
+def default_address():
+    # asyncio has no public named pipe server, so Windows listens on localhost TCP
+    if hasattr(socket, "AF_UNIX") and os.name != "nt":
+        return f"unix:{os.path.join(tempfile.gettempdir(), 'volume-balancer.sock')}"
+    return f"tcp:127.0.0.1:{DEFAULT_TCP_PORT}"
+
+
+def default_token_path(address=None):
+    # One token per socket, so instances on different addresses do not overwrite each other's
+    kind, target = parse_address(address or default_address())
+    if kind == "tcp":
+        name = f"tcp-{target[1]}"
+    else:
+        name = f"unix-{hashlib.sha256(target.encode()).hexdigest()[:12]}"
+    return os.path.join(config_dir(), f"control-{name}.token")
+
+
+def read_token(path=None, address=None):
+    with open(path or default_token_path(address)) as f:
+        return f.read().strip()
+
+
+def write_token(path, token):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Only the user running the balancer may read it
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+    os.chmod(path, 0o600)
+
+
+def parse_address(address):
+    kind, _, target = address.partition(":")
+    if kind == "unix" and target:
+        return kind, target
+    if kind == "tcp":
+        host, _, port = target.rpartition(":")
+        if host and port.isdigit():
+            return kind, (host, int(port))
+    raise ValueError(f"Invalid control address: {address} (expected unix:PATH or tcp:HOST:PORT)")
+
+
+def _answers(path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    probe.settimeout(1.0)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def _done(response):
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(response)
+    return future
+
+
+#########################################
+# Commands
+#########################################
+
+def _slot(command):
+    slot = command.get("slot")
+    if slot not in (1, 2):
+        raise ControlError(f"slot must be 1 or 2, got {slot!r}")
+    return slot - 1
+
+
+def _number(command, field, low=None, high=None):
+    value = command.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ControlError(f"{field} must be a number, got {value!r}")
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise ControlError(f"{field} must be between {low} and {high}, got {value}")
+    return float(value)
+
+
+def _duration(command):
+    return _number(command, "duration", 0.0) if "duration" in command else None
+
+
+def _group(command):
+    name = command["group"]
+    if not isinstance(name, str) or not name:
+        raise ControlError(f"group must be an executable name, got {name!r}")
+    return name
+
+
+def _resolve_session(core, command):
+    if "key" in command:
+        process = core.audio_sessions[command["key"]] if command["key"] in core.audio_sessions else None
+    elif "name" in command:
+        process = core.find_session(str(command["name"]), exclude=core.sources[1 - _slot(command)])
+    else:
+        raise ControlError("select needs a key or a name")
+
+    if process is None:
+        raise ControlError(f"No audio session matches {command.get('key', command.get('name'))!r}")
+    return process
+
+
+def _validate(core, command):
+    if not isinstance(command, dict):
+        raise ControlError(f"Commands must be objects, got {command!r}")
+
+    name = command.get("cmd")
+    if name == "select":
+        _slot(command)
+        if "group" in command:
+            _group(command)
+        else:
+            _resolve_session(core, command)
+    elif name == "clear":
+        _slot(command)
+    elif name == "set_balance":
+        _number(command, "value", -1.0, 1.0)
+        _duration(command)
+    elif name == "nudge":
+        _number(command, "delta", -2.0, 2.0)
+        _duration(command)
+    elif name not in ("state", "metrics"):
+        raise ControlError(f"Unknown command: {name!r}")
+
+
+def _apply(core, command):
+    name = command["cmd"]
+    if name == "select":
+        if "group" in command:
+            core.select_group(_slot(command), _group(command))
+        else:
+            core.select_process(_slot(command), _resolve_session(core, command))
+    elif name == "clear":
+        core.clear(_slot(command))
+    elif name == "set_balance":
+        duration = _duration(command)
+        if duration is None:
+            core.set_balance(_number(command, "value"))
+        else:
+            core.fade_balance(_number(command, "value"), duration)
+    elif name == "nudge":
+        core.nudge(_number(command, "delta"), _duration(command))
+    if name == "metrics":
+        return core.metrics.snapshot() if core.metrics is not None else None
+    return state(core) if name == "state" else None
+
+
+def state(core):
+    return {
+        "balance": core.balance,
+        "target": core.crossfader.target,
+        "sources": [p.get_readable_process_key() if p else None for p in core.sources],
+        "sessions": len(core.audio_sessions),
+        "keys": list(core.audio_sessions.keys()),
+        "degraded": [core.is_degraded(0), core.is_degraded(1)],
+    }
+
+
+def execute_batch(core, commands):
+    """Runs a list of commands on the core thread as one unit.
+
+    Every command is validated before any is applied, and a command that
+    still fails, e.g. because an earlier one in the batch took the session
+    it names, rolls the selection and balance back to where the batch
+    started. Volume writes are held until the whole batch has gone through,
+    so a rolled back batch writes nothing.
+    """
+
+    for command in commands:
+        _validate(core, command)
+
+    saved = core.save_state()
+    with core.scheduler.hold():
+        try:
+            return [_apply(core, command) for command in commands]
+        except SelectionConflictError as e:
+            core.restore_state(saved)
+            raise ControlError(str(e)) from None
+        except Exception:
+            core.restore_state(saved)
+            raise
+
+
+#########################################
+# Server
+#########################################
+
+class ControlServer:
+    """Local control socket speaking newline-delimited JSON.
+
+    A message is either one command object or ``{"commands": [...]}`` for
+    an atomic batch; an optional ``"id"`` is echoed in the response.
+    Every connection has to open with ``{"auth": TOKEN}`` within
+    ``auth_timeout`` seconds, where TOKEN is the random token the server
+    writes to ``token_path`` (readable by the current user only, and
+    specific to the address) once it listens; anything else closes the
+    connection, so other users and cross-protocol requests from a browser
+    cannot drive it. Lines longer than the stream limit are answered with
+    an error and close the connection. A unix socket that still answers
+    belongs to a running instance and is not taken over.
+    Commands are executed on the core's dispatcher thread, so they take the
+    same code paths as the widgets and hotkeys. Requests on a connection
+    may be pipelined and are answered in order.
+    """
+
+    def __init__(self, core, address=None, token_path=None, auth_timeout=5.0):
+        self.address = address or default_address()
+        self.token_path = token_path
+        self.token = None
+        self.auth_timeout = auth_timeout
+
+        self._core = core
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._error = None
+        self._ready = threading.Event()
+
+    def start(self):
+        self.token = secrets.token_hex(16)
+        self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+        # Written once listening, when a tcp port of 0 has become a real one
+        if self.token_path is None:
+            self.token_path = default_token_path(self.address)
+        write_token(self.token_path, self.token)
+
+    def stop(self):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+        if self.token_path is not None and self._error is None:
+            try:
+                os.unlink(self.token_path)
+            except OSError:
+                pass
+
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(self._listen())
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            loop.close()
+            return
+
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+            kind, target = parse_address(self.address)
+            if kind == "unix" and os.path.exists(target):
+                os.unlink(target)
+
+    async def _listen(self):
+        kind, target = parse_address(self.address)
+        if kind == "unix":
+            if os.path.exists(target):
+                if _answers(target):
+                    raise OSError(f"Another instance is already listening on {self.address}")
+                # Left behind by an instance that did not shut down cleanly
+                os.unlink(target)
+            return await asyncio.start_unix_server(self._handle, target)
+
+        server = await asyncio.start_server(self._handle, *target)
+        host, port = server.sockets[0].getsockname()[:2]
+        self.address = f"tcp:{host}:{port}"
+        return server
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                line = await asyncio.wait_for(reader.readline(), self.auth_timeout)
+                error = None if self._authorise(line) else "Not authorised"
+            except asyncio.TimeoutError:
+                error = "Timed out waiting for the token"
+            except ValueError:
+                error = "Line too long"
+            response = {"ok": True} if error is None else {"ok": False, "error": error}
+            writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            error = "Connection lost"
+        if error is not None:
+            writer.close()
+            return
+
+        responses = asyncio.Queue()
+        sender = asyncio.ensure_future(self._send(responses, writer))
+        try:
+            try:
+                while line := await reader.readline():
+                    await responses.put(asyncio.ensure_future(self._respond(line)))
+            except ValueError:
+                # The rest of the line is still unread, so answer what came before and hang up
+                await responses.put(_done({"ok": False, "error": "Line too long"}))
+            await responses.put(None)
+            await sender
+        except (ConnectionError, asyncio.CancelledError):
+            # Client went away or the server is stopping
+            sender.cancel()
+        finally:
+            writer.close()
+
+    def _authorise(self, line):
+        if self.token is None:
+            return False
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return False
+        token = message.get("auth") if isinstance(message, dict) else None
+        return isinstance(token, str) and hmac.compare_digest(token.encode(), self.token.encode())
+
+    async def _send(self, responses, writer):
+        while (response := await responses.get()) is not None:
+            try:
+                writer.write(json.dumps(await response, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, line):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return {"ok": False, "error": "Invalid JSON"}
+
+        batch = isinstance(message, dict) and "commands" in message
+        commands = message["commands"] if batch else [message]
+        if not isinstance(commands, list):
+            return {"ok": False, "error": "commands must be a list"}
+
+        future = concurrent.futures.Future()
+        self._core.dispatcher.post(self._execute, commands, future)
+        try:
+            response = {"ok": True, "results": await asyncio.wrap_future(future)}
+        except ControlError as e:
+            response = {"ok": False, "error": str(e)}
+
+        if isinstance(message, dict) and "id" in message:
+            response["id"] = message["id"]
+        return response
+
+    def _execute(self, commands, future):
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(execute_batch(self._core, commands))
+            except Exception as e:
+                future.set_exception(e if isinstance(e, ControlError) else ControlError(repr(e)))
+
+
+#########################################
+# Client
+#########################################
+
+class ControlClient:
+    """Blocking client for ``ControlServer``; ``token`` defaults to the one saved for ``address``."""
+
+    def __init__(self, address=None, timeout=5.0, token=None):
+        kind, target = parse_address(address or default_address())
+        family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+        self._socket = socket.socket(family, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(target)
+        if family == socket.AF_INET:
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._socket.makefile("rwb")
+
+        self._file.write(json.dumps({"auth": token or read_token(address=address)}).encode() + b"\n")
+        self._file.flush()
+        response = json.loads(self._file.readline() or b'{"ok":false,"error":"Connection closed"}')
+        if not response["ok"]:
+            self.close()
+            raise ControlError(response["error"])
+
+    def request(self, *commands):
+        return self.pipeline([list(commands)])[0]
+
+    def pipeline(self, batches):
+        """Sends several batches without waiting in between, returns their results."""
+        for commands in batches:
+            message = commands[0] if len(commands) == 1 else {"commands": commands}
+            self._file.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        self._file.flush()
+
+        responses = [json.loads(self._file.readline()) for _ in batches]
+        for response in responses:
+            if not response["ok"]:
+                raise ControlError(response["error"])
+        return [response["results"] for response in responses]
+
+    def select(self, slot, key=None, name=None, group=None):
+        command = {"cmd": "select", "slot": slot}
+        if group is not None:
+            command["group"] = group
+        else:
+            command.update({"key": key} if key is not None else {"name": name})
+        self.request(command)
+
+    def clear(self, slot):
+        self.request({"cmd": "clear", "slot": slot})
+
+    def set_balance(self, value, duration=None):
+        self.request(_with_duration({"cmd": "set_balance", "value": value}, duration))
+
+    def nudge(self, delta, duration=None):
+        self.request(_with_duration({"cmd": "nudge", "delta": delta}, duration))
+
+    def state(self):
+        return self.request({"cmd": "state"})[0]
+
+    def metrics(self):
+        return self.request({"cmd": "metrics"})[0]
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _with_duration(command, duration):
+    if duration is not None:
+        command["duration"] = duration
+    return command
@@ -0,0 +1,401 @@
+import traceback
+
+from .crossfade import CURVES, Crossfader
+from .groups import GroupMembership, SourceGroup, group_key, parse_group_key
+from .guard import SessionGuard
+from .mixer import MixingEngine
+from .reconcile import VolumeReconciler
+from .registry import SessionRegistry
+from .scheduler import VolumeWriteScheduler
+from .watcher import SessionWatcher
+
+
+class SelectionConflictError(ValueError):
+    """Raised when a selection would share sessions with the other source slot."""
+
+
+class BalancerCore:
+    """Balancing logic shared by the window and headless mode.
+
+    Holds the two source slots, the balance position and the session
+    registry. Everything here runs on the dispatcher thread; front ends
+    observe changes through ``add_listener`` and get called with one of
+    ``"balance"``, ``"sources"`` or ``"sessions"``. Passing a ``Metrics``
+    instance times every backend call and hotkey-to-write latency.
+
+    A source is either one session or a ``SourceGroup`` covering every
+    session of an executable, whose members follow sessions as they come
+    and go. A single-session source whose session exits is released and
+    re-bound to the next session of the same executable. The two slots never
+    share a session: selecting a session or group that overlaps the other
+    slot raises ``SelectionConflictError``.
+
+    With a ``ProfileStore`` attached through ``use_profiles``, a session
+    whose executable a profile names applies that profile while no source
+    is selected.
+
+    Volumes changed from outside, e.g. in the system mixer, are taken over
+    by a ``VolumeReconciler`` rather than overwritten.
+
+    Per-session backend calls go through a ``SessionGuard``, never the
+    dispatcher thread; sessions it has given up on for now are reported
+    with a ``"health"`` event and by ``is_degraded``.
+    """
+
+    SOURCE_POSITIONS = (-1.0, 1.0)
+
+    def __init__(self, backend, dispatcher, curve="linear", fade_duration=0.3, metrics=None):
+        if metrics is not None:
+            from .metrics import InstrumentedBackend
+            backend = InstrumentedBackend(backend, metrics)
+
+        self.backend = backend
+        self.dispatcher = dispatcher
+        self.metrics = metrics
+        self.guard = SessionGuard(backend, on_change=self._on_health_changed)
+        self.scheduler = VolumeWriteScheduler(backend, metrics=metrics, guard=self.guard)
+        self.mixer = MixingEngine(self.scheduler, curve)
+        self.audio_sessions = SessionRegistry(on_evict=self._on_evicted)
+        self.watcher = SessionWatcher(backend, dispatcher, self.audio_sessions, self._on_sessions_changed)
+        self.crossfader = Crossfader(dispatcher, self.set_balance, fade_duration)
+        self.groups = GroupMembership(self.audio_sessions, self._on_member_joined, self._on_member_left)
+        self.audio_sessions.attach(self.groups)
+
+        self.sources = [None, None]
+        self.balance = 0.0
+
+        self.profiles = None
+        self.active_profile = None
+        self.ducker = None
+        self.leveler = None
+        self.journal = None
+        self.recorder = None
+        self.player = None
+
+        self._wanted = [None, None]
+        self._journal_restore = None
+        self._evicted_source = False
+        self._matched_profile = None
+        self._listeners = []
+
+        self.reconciler = VolumeReconciler(self)
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def start(self):
+        self.watcher.start()
+        self.reconciler.start()
+
+    def refresh(self, wait=False):
+        return self.watcher.refresh(wait)
+
+    def select(self, slot, key):
+        if key in self.audio_sessions:
+            self._set_source(slot, self.audio_sessions[key])
+            return True
+
+        name = parse_group_key(key)
+        if name is None:
+            return False
+        self.select_group(slot, name)
+        return True
+
+    def select_process(self, slot, process):
+        self._set_source(slot, process)
+
+    def select_group(self, slot, name):
+        self._check_free(slot, name=name)
+        self._release(slot)
+        group = self._add_group(slot, name)
+        self._notify("sources")
+        return group
+
+    def find_session(self, name, exclude=None):
+        name = name.lower()
+        for process in self.audio_sessions.values():
+            if process is not exclude and process.get_session_name().lower() == name:
+                return process
+        return None
+
+    def bind_source(self, slot, name):
+        # Selects the first session of the executable now or once one appears
+        self._wanted[slot] = name.lower() if name else None
+        if self._wanted[slot] and self.sources[slot] is None:
+            self._bind_wanted()
+
+    def clear(self, slot):
+        self._wanted[slot] = None
+        if self.sources[slot] is None:
+            return
+        self._release(slot)
+        self._notify("sources")
+
+    def save_state(self):
+        """Captures the selection and balance for ``restore_state``."""
+        return list(self.sources), list(self._wanted), self.balance, self.crossfader.target
+
+    def restore_state(self, saved):
+        """Undoes selection and balance changes made since ``save_state``.
+
+        A single session that has exited since is not brought back; its slot
+        waits for the executable again, as after any exit.
+        """
+        sources, wanted, balance, target = saved
+        changed = [slot for slot in range(2) if self.sources[slot] is not sources[slot]]
+        for slot in changed:
+            self._release(slot)
+        for slot in changed:
+            source = sources[slot]
+            if isinstance(source, SourceGroup):
+                self._add_group(slot, source.name)
+            elif source is not None and self.audio_sessions.get_by_pid(source.get_session_pid()) is source:
+                self.sources[slot] = source
+                self.mixer.add(source, self.SOURCE_POSITIONS[slot])
+            elif source is not None:
+                wanted[slot] = source.get_session_name().lower()
+        self._wanted = list(wanted)
+        if changed:
+            self._notify("sources")
+
+        self.set_balance(balance)
+        if target != balance:
+            self.fade_balance(target)
+
+    def is_degraded(self, slot):
+        source = self.sources[slot]
+        if isinstance(source, SourceGroup):
+            return any(self.guard.degraded(process) for process in source.members.values())
+        return source is not None and self.guard.degraded(source)
+
+    def set_balance(self, balance):
+        if not self.crossfader.applying:
+            self.crossfader.jump_to(balance)
+        if balance != self.balance:
+            self.balance = balance
+            self.mixer.set_balance(balance)
+            self._notify("balance")
+
+    def fade_balance(self, target, duration=None):
+        self.crossfader.fade_to(min(max(target, -1.0), 1.0), duration)
+
+    def nudge(self, delta, duration=None):
+        self.fade_balance(self.crossfader.target + delta, duration)
+
+    def set_curve(self, curve):
+        self.mixer.set_curve(curve)
+
+    def enable_ducking(self, **options):
+        """Ducks source 2 while source 1 is loud, see ``metering.Ducker``."""
+        from .metering import Ducker
+        self.ducker = Ducker(self, **options)
+        self.ducker.start()
+        return self.ducker
+
+    def enable_leveling(self, **options):
+        """Evens out source loudness through mixer weights, see ``leveling.Leveler``."""
+        from .leveling import Leveler
+        self.leveler = Leveler(self, **options)
+        self.leveler.start()
+        return self.leveler
+
+    def use_journal(self, journal):
+        """Records every volume write in ``journal`` so a crash can be undone on the next launch.
+
+        Volumes a crashed run left in the journal are restored on the
+        enumeration worker ahead of the first scan, so call this before
+        ``start``; startup does not wait for the backend either way.
+        """
+        self.journal = journal
+        self.scheduler.journal = journal
+        if journal.pending():
+            self._journal_restore = self.watcher.submit(self._restore_journal)
+
+    def start_recording(self):
+        """Starts recording balance changes into a fresh ``timeline.Timeline``."""
+        from .timeline import TimelineRecorder
+        if self.recorder is None:
+            self.recorder = TimelineRecorder(self)
+        self.recorder.start()
+        return self.recorder
+
+    def stop_recording(self):
+        return self.recorder.stop() if self.recorder is not None else None
+
+    def play(self, timeline):
+        """Replays a recorded timeline off the dispatcher thread, see ``timeline.TimelinePlayer``."""
+        from .timeline import TimelinePlayer
+        if self.player is not None:
+            self.player.close()
+        self.player = TimelinePlayer(self, timeline)
+        self.player.start()
+        return self.player
+
+    def use_profiles(self, store):
+        from .profiles import ProfileTrigger
+        self.profiles = store
+        self.audio_sessions.attach(ProfileTrigger(self.audio_sessions, store, self._on_profile_matched))
+
+    def capture_profile(self, name):
+        from .profiles import Profile
+        rules = []
+        for source in self.sources:
+            if source is None:
+                rules.append(None)
+            else:
+                rules.append({"exe": source.get_session_name(), "group": isinstance(source, SourceGroup)})
+        curve = self.mixer.curve.name if self.mixer.curve.name in CURVES else "linear"
+        return Profile(name, rules, self.crossfader.target, curve)
+
+    def apply_profile(self, profile):
+        self.active_profile = profile
+        if profile.curve in CURVES:
+            self.set_curve(profile.curve)
+
+        for slot, rule in enumerate(profile.sources):
+            if rule is None:
+                continue
+            current = self.sources[slot]
+            if current is not None and current.get_session_name().lower() == rule["exe"].lower() \
+                    and isinstance(current, SourceGroup) == rule["group"]:
+                continue
+            if rule["group"]:
+                try:
+                    self.select_group(slot, rule["exe"])
+                except SelectionConflictError as e:
+                    print(f"Skipping a rule of profile {profile.name!r}: {e}")
+            else:
+                self.clear(slot)
+                self.bind_source(slot, rule["exe"])
+
+        self.fade_balance(profile.balance)
+
+    def close(self):
+        if self.player is not None:
+            self.player.close()
+        if self.ducker is not None:
+            self.ducker.close()
+        if self.leveler is not None:
+            self.leveler.close()
+        self.crossfader.cancel()
+        self.reconciler.close()
+        self.mixer.clear()
+        self.scheduler.close()
+        self.guard.close()
+        if self._journal_restore is not None:
+            self._journal_restore.cancel()
+        if self.journal is not None:
+            # Whatever is still open after the resets belongs to sessions that went away
+            self.journal.compact()
+            self.journal.close()
+        self.watcher.close()
+
+    def _release(self, slot):
+        source = self.sources[slot]
+        self.sources[slot] = None
+        if isinstance(source, SourceGroup):
+            with self.scheduler.hold():
+                for process in self.groups.remove_group(source):
+                    if process in self.mixer:
+                        self.mixer.remove(process)
+        elif source is not None:
+            self.mixer.remove(source)
+
+    def _add_group(self, slot, name):
+        group = SourceGroup(name)
+        members = self.groups.add_group(group)
+        self.sources[slot] = group
+        self.mixer.extend(members, self.SOURCE_POSITIONS[slot])
+        return group
+
+    def _check_free(self, slot, process=None, name=None):
+        other = self.sources[1 - slot]
+        if other is None:
+            return
+        if process is not None:
+            taken = other.matches(process) if isinstance(other, SourceGroup) else other is process
+            key = process.get_readable_process_key()
+        else:
+            taken = other.get_session_name().lower() == name.lower()
+            key = group_key(name)
+        if taken:
+            raise SelectionConflictError(f"{key} overlaps source {2 - slot}, {other.get_readable_process_key()}")
+
+    def _set_source(self, slot, process):
+        self._check_free(slot, process)
+        self._release(slot)
+        self.sources[slot] = process
+        self.mixer.add(process, self.SOURCE_POSITIONS[slot])
+        self._notify("sources")
+
+    def _bind_wanted(self):
+        for slot, name in enumerate(self._wanted):
+            other = self.sources[1 - slot]
+            if name is None or self.sources[slot] is not None:
+                continue
+            if isinstance(other, SourceGroup) and other.name.lower() == name:
+                # Every session of the executable already belongs to the other slot
+                continue
+            process = self.find_session(name, exclude=self.sources[1 - slot])
+            if process is not None:
+                self._set_source(slot, process)
+
+    def _on_member_joined(self, group, process):
+        slot = self.sources.index(group)
+        self.mixer.add(process, self.SOURCE_POSITIONS[slot])
+
+    def _on_member_left(self, group, process):
+        # The session is gone, so there is no volume left to restore
+        if process in self.mixer:
+            self.mixer.remove(process, reset=False)
+
+    def _on_evicted(self, process):
+        # Whatever was written or pending for the exited session goes with it
+        self.scheduler.forget(process)
+        self.guard.forget(process)
+        if process not in self.sources:
+            return
+        slot = self.sources.index(process)
+        self.sources[slot] = None
+        self.mixer.remove(process, reset=False)
+        self._wanted[slot] = process.get_session_name().lower()
+        self._evicted_source = True
+
+    def _restore_journal(self):
+        from .journal import restore
+        try:
+            restored = restore(self.journal, self.backend)
+        except Exception:
+            traceback.print_exc()
+            return
+        if restored:
+            print(f"Restored the volume of {restored} session(s) left changed by a previous run", flush=True)
+
+    def _on_health_changed(self, process, degraded):
+        if degraded:
+            print(f"{process.get_readable_process_key()} is not responding, pausing its volume changes")
+            # An exited session fails every call, so look for it in a fresh scan
+            self.dispatcher.post(self.refresh)
+        self.dispatcher.post(self._notify, "health")
+
+    def _on_profile_matched(self, profile):
+        if self._matched_profile is None:
+            self._matched_profile = profile
+
+    def _on_sessions_changed(self):
+        evicted, self._evicted_source = self._evicted_source, False
+        self._bind_wanted()
+        if evicted:
+            self._notify("sources")
+
+        profile, self._matched_profile = self._matched_profile, None
+        if profile is not None and self.sources == [None, None]:
+            self.apply_profile(profile)
+        self._notify("sessions")
+
+    def _notify(self, event):
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                traceback.print_exc()
@@ -0,0 +1,124 @@
+import math
+import time
+
+from array import array
+
+
+class BalanceCurve:
+    """Gain law sampled into a lookup table.
+
+    ``function`` maps the attenuation amount (0.0 = the balance is on the
+    channel's side, 1.0 = fully away from it) to a gain in [0, 1].
+    """
+
+    def __init__(self, name, function, size=1025):
+        self.name = name
+        self.scale = size - 1
+        # Rounding keeps float noise such as cos(pi / 2) out of the table
+        self.table = array("d", [round(min(max(function(i / self.scale), 0.0), 1.0), 12) for i in range(size)])
+
+    def __call__(self, amount):
+        return self.table[int(min(max(amount, 0.0), 1.0) * self.scale + 0.5)]
+
+    def __repr__(self):
+        return f"BalanceCurve({self.name!r})"
+
+
+CURVES = {
+    "linear": BalanceCurve("linear", lambda x: 1.0 - x),
+    "equal_power": BalanceCurve("equal_power", lambda x: math.cos(x * math.pi / 2)),
+}
+
+
+def get_curve(curve):
+    if isinstance(curve, BalanceCurve):
+        return curve
+    if callable(curve):
+        return BalanceCurve("custom", curve)
+    try:
+        return CURVES[curve]
+    except KeyError:
+        raise ValueError(f"Unknown balance curve: {curve}") from None
+
+
+class Crossfader:
+    """Ramps the balance to a target over ``duration`` seconds.
+
+    Ticks run every ``interval`` seconds on the dispatcher, scheduled
+    against the start time so the cadence does not drift, and each tick
+    hands the interpolated position to ``apply``. Nothing blocks between
+    ticks, so the UI loop stays free.
+    """
+
+    def __init__(self, dispatcher, apply, duration=0.3, interval=1 / 60):
+        self.duration = duration
+        self.interval = interval
+        self.position = 0.0
+        self.applying = False
+
+        self._dispatcher = dispatcher
+        self._apply = apply
+        self._start = 0.0
+        self._target = 0.0
+        self._started = 0.0
+        self._fade_duration = 0.0
+        self._ticks = 0
+        self._timer = None
+
+    @property
+    def active(self):
+        return self._timer is not None
+
+    @property
+    def target(self):
+        return self._target if self.active else self.position
+
+    def fade_to(self, target, duration=None):
+        self.cancel()
+        duration = self.duration if duration is None else duration
+        if duration <= 0 or target == self.position:
+            self._set(target)
+            return
+
+        self._start = self.position
+        self._target = target
+        self._started = time.perf_counter()
+        self._fade_duration = duration
+        self._ticks = 0
+        self._tick()
+
+    def jump_to(self, position):
+        # The balance was moved from elsewhere; stop fading and track it
+        self.cancel()
+        self.position = position
+
+    def finish(self):
+        if self.active:
+            self.cancel()
+            self._set(self._target)
+
+    def cancel(self):
+        if self._timer is not None:
+            self._dispatcher.cancel(self._timer)
+            self._timer = None
+
+    def _tick(self):
+        self._timer = None
+        progress = (time.perf_counter() - self._started) / self._fade_duration
+
+        if progress >= 1.0:
+            self._set(self._target)
+            return
+
+        self._set(self._start + (self._target - self._start) * progress)
+        self._ticks += 1
+        delay = self._started + self._ticks * self.interval - time.perf_counter()
+        self._timer = self._dispatcher.call_later(max(delay, 0.0), self._tick)
+
+    def _set(self, position):
+        self.position = position
+        self.applying = True
+        try:
+            self._apply(position)
+        finally:
+            self.applying = False
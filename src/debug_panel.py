@@ -0,0 +1,39 @@
+import tkinter as tk
+
+
+def format_metrics(snapshot):
+    lines = [f"{'operation':<18}{'calls':>8}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+    for name, row in snapshot.items():
+        lines.append(
+            f"{name:<18}{row['count']:>8}{row['errors']:>8}"
+            f"{row.get('p50_ms', 0.0):>9.3f}{row.get('p99_ms', 0.0):>9.3f}{row.get('max_ms', 0.0):>9.3f}"
+        )
+    return "\n".join(lines)
+
+
+class MetricsPanel:
+    """Small window showing the live latency metrics."""
+
+    def __init__(self, root, metrics, interval_ms=500):
+        self.metrics = metrics
+        self.interval_ms = interval_ms
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Volume Balancer Metrics")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.label = tk.Label(self.window, font=("Courier", 9), justify=tk.LEFT, anchor=tk.W)
+        self.label.pack(padx=10, pady=10)
+
+        self._after_id = None
+        self.update()
+
+    def update(self):
+        self.label.config(text=format_metrics(self.metrics.snapshot()))
+        self._after_id = self.window.after(self.interval_ms, self.update)
+
+    def close(self):
+        if self._after_id is not None:
+            self.window.after_cancel(self._after_id)
+            self._after_id = None
+        self.window.destroy()
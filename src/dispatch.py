@@ -0,0 +1,133 @@
+import collections
+import heapq
+import itertools
+import queue
+import threading
+import time
+import traceback
+
+
+class TkDispatcher:
+    """Runs callables posted from any thread on the Tk main loop.
+
+    Tk must only be touched from the thread running ``mainloop``, so worker
+    threads ``post`` their results here and the queue is drained from a
+    periodic ``after`` callback.
+    """
+
+    def __init__(self, root, interval=20):
+        self._root = root
+        self._interval = interval
+        self._queue = queue.SimpleQueue()
+        self._after_id = root.after(interval, self._poll)
+
+    def post(self, callback, *args):
+        self._queue.put((callback, args))
+
+    def call_later(self, delay, callback, *args):
+        return self._root.after(int(delay * 1000), callback, *args)
+
+    def cancel(self, handle):
+        self._root.after_cancel(handle)
+
+    def drain(self):
+        while True:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                callback(*args)
+            except Exception:
+                traceback.print_exc()
+
+    def close(self):
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _poll(self):
+        self.drain()
+        self._after_id = self._root.after(self._interval, self._poll)
+
+
+class LoopDispatcher:
+    """Dispatcher for running without Tk.
+
+    Posted callbacks and timers run on whichever thread calls ``run`` (or
+    ``drain``), mirroring what ``TkDispatcher`` does on the Tk main loop.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._ready = collections.deque()
+        self._timers = []
+        self._active = set()
+        self._handles = itertools.count()
+        self._running = False
+
+    def post(self, callback, *args):
+        with self._condition:
+            self._ready.append((callback, args))
+            self._condition.notify()
+
+    def call_later(self, delay, callback, *args):
+        with self._condition:
+            handle = next(self._handles)
+            heapq.heappush(self._timers, (time.monotonic() + delay, handle, callback, args))
+            self._active.add(handle)
+            self._condition.notify()
+        return handle
+
+    def cancel(self, handle):
+        with self._condition:
+            self._active.discard(handle)
+
+    def drain(self):
+        for callback, args in self._take_due():
+            self._invoke(callback, args)
+
+    def run(self):
+        self._running = True
+        while self._running:
+            with self._condition:
+                # A timer added while waiting may be due sooner than the one waited for
+                while not self._has_due():
+                    self._condition.wait(self._next_timeout())
+            self.drain()
+
+    def stop(self):
+        self._running = False
+        with self._condition:
+            self._condition.notify()
+
+    def close(self):
+        self.stop()
+
+    def _has_due(self):
+        if self._ready or not self._running:
+            return True
+        return bool(self._timers) and self._timers[0][0] <= time.monotonic()
+
+    def _next_timeout(self):
+        if not self._timers:
+            return None
+        return max(self._timers[0][0] - time.monotonic(), 0)
+
+    def _take_due(self):
+        now = time.monotonic()
+        with self._condition:
+            due = list(self._ready)
+            self._ready.clear()
+            while self._timers and self._timers[0][0] <= now:
+                _, handle, callback, args = heapq.heappop(self._timers)
+                if handle in self._active:
+                    self._active.discard(handle)
+                    due.append((callback, args))
+        return due
+
+    def _invoke(self, callback, args):
+        try:
+            callback(*args)
+        except Exception:
+            traceback.print_exc()
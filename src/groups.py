@@ -0,0 +1,89 @@
+GROUP_KEY_PREFIX = "All "
+GROUP_KEY_SUFFIX = " sessions"
+
+
+def group_key(name):
+    return f"{GROUP_KEY_PREFIX}{name}{GROUP_KEY_SUFFIX}"
+
+
+def parse_group_key(key):
+    if key.startswith(GROUP_KEY_PREFIX) and key.endswith(GROUP_KEY_SUFFIX):
+        return key[len(GROUP_KEY_PREFIX):-len(GROUP_KEY_SUFFIX)] or None
+    return None
+
+
+class SourceGroup:
+    """A balance source made of every session of one executable.
+
+    Stands in for an ``AudioProcess`` wherever the UI shows a source; the
+    sessions themselves are in ``members``, keyed by readable key.
+    """
+
+    __slots__ = ("name", "members")
+
+    def __init__(self, name):
+        self.name = name
+        self.members = {}
+
+    def matches(self, process):
+        return process.get_session_name().lower() == self.name.lower()
+
+    def get_session_name(self):
+        return self.name
+
+    def get_readable_process_key(self):
+        return group_key(self.name)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __repr__(self):
+        return f"SourceGroup({self.name!r}, {len(self.members)} sessions)"
+
+
+class GroupMembership:
+    """Keeps the members of active groups in step with the session registry.
+
+    Attached to a ``SessionRegistry``, it sees every key as it is added or
+    removed and looks up the group by executable name, so a session change
+    costs one dict lookup no matter how many sessions or groups exist.
+    """
+
+    def __init__(self, registry, on_joined, on_left):
+        self._registry = registry
+        self._on_joined = on_joined
+        self._on_left = on_left
+        self._groups = {}
+        self._member_of = {}
+
+    def add_group(self, group):
+        """Starts tracking ``group`` and returns its current members."""
+        self._groups[group.name.lower()] = group
+        for process in self._registry.values():
+            if group.matches(process):
+                key = process.get_readable_process_key()
+                group.members[key] = process
+                self._member_of[key] = group
+        return list(group.members.values())
+
+    def remove_group(self, group):
+        if self._groups.get(group.name.lower()) is group:
+            del self._groups[group.name.lower()]
+        for key in group.members:
+            self._member_of.pop(key, None)
+        members = list(group.members.values())
+        group.members.clear()
+        return members
+
+    def add(self, key):
+        process = self._registry[key]
+        group = self._groups.get(process.get_session_name().lower())
+        if group is not None:
+            group.members[key] = process
+            self._member_of[key] = group
+            self._on_joined(group, process)
+
+    def remove(self, key):
+        group = self._member_of.pop(key, None)
+        if group is not None:
+            self._on_left(group, group.members.pop(key))
@@ -0,0 +1,161 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class SessionUnavailableError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one session.
+
+    ``failures`` errors or timeouts in a row open it for ``cooldown``
+    seconds. After that a single trial call is let through: success closes
+    it, another failure opens it again for twice as long, up to
+    ``max_cooldown``.
+    """
+
+    __slots__ = ("state", "failures", "opened_at", "cooldown")
+
+    def __init__(self, cooldown):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.cooldown = cooldown
+
+    def allow(self, now):
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now >= self.opened_at + self.cooldown:
+            self.state = HALF_OPEN
+            return True
+        return False
+
+    def retry_in(self, now):
+        if self.state == OPEN:
+            return max(self.opened_at + self.cooldown - now, 0.0)
+        return 0.0
+
+
+class SessionGuard:
+    """Runs per-session backend calls on a bounded worker pool.
+
+    Calls are waited on for at most ``timeout`` seconds. Each session has a
+    ``CircuitBreaker``; while it is not closed the session counts as
+    degraded and its calls fail fast with ``SessionUnavailableError``
+    instead of reaching the backend. A session whose last call timed out
+    and is still running gets no new calls either, so a hung session ties
+    up one worker at most. ``on_change(key, degraded)`` is called, from
+    whichever thread noticed, when a session becomes degraded or recovers.
+    """
+
+    def __init__(self, backend, workers=4, timeout=0.5, failures=3, cooldown=2.0, max_cooldown=60.0, on_change=None):
+        self.timeout = timeout
+        self.failures = failures
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.on_change = on_change
+
+        self._executor = ThreadPoolExecutor(workers, "session-call", initializer=backend.thread_init)
+        self._lock = threading.Lock()
+        self._breakers = {}
+        self._hung = {}
+
+    def submit(self, key, function, *args):
+        with self._lock:
+            if key in self._hung:
+                raise SessionUnavailableError("Session is not responding")
+            breaker = self._breakers.get(key)
+            if breaker is not None and not breaker.allow(time.monotonic()):
+                raise SessionUnavailableError("Session is paused after repeated failures")
+            return self._executor.submit(self._run, key, function, args)
+
+    def call(self, key, function, *args):
+        future = self.submit(key, function, *args)
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            self.expire(key, future)
+            raise SessionUnavailableError("Session call timed out") from None
+
+    def expire(self, key, future):
+        """Gives up on a call that ran past the timeout, counting it as a failure."""
+        with self._lock:
+            if future.done():
+                return
+            self._hung[key] = future
+        self._record(key, False)
+
+    def degraded(self, key):
+        breaker = self._breakers.get(key)
+        return breaker is not None and breaker.state != CLOSED
+
+    def retry_in(self, key):
+        """Seconds until ``key`` takes calls again, 0.0 if it does now."""
+        with self._lock:
+            if key in self._hung:
+                return self.timeout
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                return 0.0
+            if breaker.state == HALF_OPEN:
+                return self.timeout
+            return breaker.retry_in(time.monotonic())
+
+    def forget(self, key):
+        with self._lock:
+            self._breakers.pop(key, None)
+            self._hung.pop(key, None)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, key, function, args):
+        # The outcome is recorded before the caller sees the result
+        try:
+            result = function(*args)
+        except BaseException:
+            self._finish(key, False)
+            raise
+        self._finish(key, True)
+        return result
+
+    def _finish(self, key, succeeded):
+        with self._lock:
+            hung = self._hung.pop(key, None)
+        # A call that ran past its timeout was already counted as a failure
+        if hung is None:
+            self._record(key, succeeded)
+
+    def _record(self, key, succeeded):
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                if succeeded:
+                    return
+                breaker = self._breakers[key] = CircuitBreaker(self.cooldown)
+            was_closed = breaker.state == CLOSED
+
+            if succeeded:
+                breaker.state = CLOSED
+            else:
+                breaker.failures += 1
+                if breaker.state == HALF_OPEN:
+                    breaker.cooldown = min(breaker.cooldown * 2, self.max_cooldown)
+                if breaker.state == HALF_OPEN or breaker.failures >= self.failures:
+                    breaker.state = OPEN
+                    breaker.opened_at = time.monotonic()
+
+            changed = was_closed != (breaker.state == CLOSED)
+            if succeeded:
+                # Healthy sessions keep no breaker around
+                del self._breakers[key]
+
+        if changed and self.on_change is not None:
+            self.on_change(key, not succeeded)
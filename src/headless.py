@@ -0,0 +1,80 @@
+import signal
+import sys
+import time
+
+from .core import BalancerCore
+from .dispatch import LoopDispatcher
+
+
+def resident_memory():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run_headless(backend, curve="linear", sources=(None, None), hotkeys=True, started=None, exit_after=None, control=None, metrics=None, profiles=None, duck=None, level=False, journal=None, record=None, play=None):
+    started = time.perf_counter() if started is None else started
+    dispatcher = LoopDispatcher()
+    core = BalancerCore(backend, dispatcher, curve, metrics=metrics)
+    if journal is not None:
+        core.use_journal(journal)
+    if profiles is not None:
+        core.use_profiles(profiles)
+    if duck is not None:
+        core.enable_ducking(depth=duck)
+    if level:
+        core.enable_leveling()
+
+    for slot, name in enumerate(sources):
+        core.bind_source(slot, name)
+
+    if hotkeys:
+        from .hotkeys import remove_hotkeys, setup_hotkeys
+        setup_hotkeys(core)
+
+    core.start()
+    if record is not None:
+        core.start_recording()
+    if play is not None:
+        core.play(play)
+
+    server = None
+    if control is not None:
+        from .control import ControlServer
+        server = ControlServer(core, control)
+        server.start()
+        print(f"Control API listening on {server.address}", flush=True)
+
+    startup_ms = (time.perf_counter() - started) * 1000
+    print(f"Headless balancer ready in {startup_ms:.1f} ms, resident memory {resident_memory() / 2**20:.1f} MB", flush=True)
+
+    def stop(*args):
+        dispatcher.post(dispatcher.stop)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    if exit_after is not None:
+        dispatcher.call_later(exit_after, dispatcher.stop)
+
+    try:
+        dispatcher.run()
+    finally:
+        if server is not None:
+            server.stop()
+        if hotkeys:
+            remove_hotkeys()
+        if profiles is not None:
+            from .profiles import save_last_profile
+            save_last_profile(core)
+        if record is not None:
+            from .timeline import save_recording
+            save_recording(core, record)
+        if play is not None:
+            print(core.player.summary(), flush=True)
+        core.close()
+    return core
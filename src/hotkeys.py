@@ -0,0 +1,25 @@
+import keyboard
+import traceback
+
+from .commands import CommandQueue
+
+NUDGE_STEP = 0.1
+
+
+def setup_hotkeys(core, acceleration=0.0):
+    # Callbacks run on the keyboard hook thread and only queue commands
+    commands = CommandQueue(core, acceleration)
+    keyboard.add_hotkey('ctrl+alt+left', lambda: commands.nudge(-NUDGE_STEP))
+    keyboard.add_hotkey('ctrl+alt+right', lambda: commands.nudge(NUDGE_STEP))
+    keyboard.add_hotkey('ctrl+shift+left', lambda: commands.fade_to(-1.0))
+    keyboard.add_hotkey('ctrl+shift+right', lambda: commands.fade_to(1.0))
+    keyboard.add_hotkey('ctrl+shift+down', lambda: commands.fade_to(0.0))
+    keyboard.add_hotkey('ctrl+shift+up', lambda: commands.fade_to(0.0))
+    return commands
+
+
+def remove_hotkeys():
+    try:
+        keyboard.unhook_all()
+    except:
+        traceback.print_exc()
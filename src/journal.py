@@ -0,0 +1,180 @@
+import mmap
+import os
+import struct
+import threading
+
+from .profiles import config_dir
+
+INITIAL = 1
+APPLIED = 2
+RELEASED = 3
+
+# kind, pid, volume, executable name (UTF-8, truncated)
+RECORD = struct.Struct("<B3xIf52s")
+
+
+def default_path():
+    return os.path.join(config_dir(), "volumes.journal")
+
+
+def _name(name):
+    return name.encode("utf-8", "replace")[:52]
+
+
+class SessionState:
+    __slots__ = ("name", "initial", "applied", "released")
+
+    def __init__(self, name):
+        self.name = name
+        self.initial = None
+        self.applied = None
+        self.released = False
+
+
+class VolumeJournal:
+    """Append-only, memory-mapped log of the volumes the balancer touched.
+
+    Every session gets an ``INITIAL`` record with the volume it had before
+    its first write, then ``APPLIED`` records for the writes and a
+    ``RELEASED`` record once it is back at its initial volume. Appending is
+    a copy into the mapping, so it costs next to nothing on the write path;
+    the pages reach the disk through the OS even if the process dies. A
+    zero kind byte marks the end of the log. When the file fills up it is
+    compacted down to the sessions still touched, and grown if that is not
+    enough.
+    """
+
+    def __init__(self, path=None, capacity=1024):
+        self.path = path or default_path()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a+b")
+        size = max(os.path.getsize(self.path), capacity * RECORD.size)
+        self._file.truncate(size - size % RECORD.size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._open = set()
+        self._offset = self._find_end()
+
+    @property
+    def capacity(self):
+        return len(self._map) // RECORD.size
+
+    def __len__(self):
+        return self._offset // RECORD.size
+
+    def record(self, writes):
+        """Journals a batch of completed writes, ``{process: volume}``."""
+        with self._lock:
+            for process, volume in writes.items():
+                pid = process.get_session_pid()
+                name = _name(process.get_session_name())
+                initial = process.get_initial_volume()
+                if pid not in self._open:
+                    self._open.add(pid)
+                    self._append(INITIAL, pid, initial, name)
+                if volume == initial:
+                    self._open.discard(pid)
+                    self._append(RELEASED, pid, volume, name)
+                else:
+                    self._append(APPLIED, pid, volume, name)
+
+    def replay(self):
+        """Latest state per PID, ``{pid: SessionState}``."""
+        with self._lock:
+            return self._replay()
+
+    def pending(self):
+        """Sessions left away from their initial volume, ``{pid: SessionState}``."""
+        return {pid: state for pid, state in self.replay().items() if not state.released and state.initial is not None}
+
+    def release(self, states):
+        """Marks sessions as back at their initial volume, ``{pid: SessionState}``."""
+        with self._lock:
+            for pid, state in states.items():
+                self._open.discard(pid)
+                self._append(RELEASED, pid, state.initial, state.name)
+
+    def reset(self):
+        with self._lock:
+            self._open.clear()
+            self._offset = 0
+            self._map[0] = 0
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def close(self):
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+    def _append(self, kind, pid, volume, name):
+        if self._offset + RECORD.size > len(self._map):
+            self._compact()
+        RECORD.pack_into(self._map, self._offset, kind, pid, volume, name)
+        self._offset += RECORD.size
+        if self._offset < len(self._map):
+            self._map[self._offset] = 0
+
+    def _compact(self):
+        pending = [(pid, state) for pid, state in self._replay().items() if not state.released and state.initial is not None]
+        needed = (2 * len(pending) + 1) * RECORD.size
+        if needed * 2 > len(self._map):
+            # Still mostly full after compaction, so give it room to grow
+            self._map.resize(len(self._map) * 2)
+
+        self._offset = 0
+        self._map[0] = 0
+        for pid, state in pending:
+            self._append(INITIAL, pid, state.initial, state.name)
+            if state.applied is not None:
+                self._append(APPLIED, pid, state.applied, state.name)
+
+    def _replay(self):
+        states = {}
+        for offset in range(0, self._offset, RECORD.size):
+            kind, pid, volume, name = RECORD.unpack_from(self._map, offset)
+            name = name.rstrip(b"\0")
+            state = states.get(pid)
+            if state is None or kind == INITIAL and (state.released or state.name != name):
+                state = states[pid] = SessionState(name)
+            if kind == INITIAL:
+                state.initial = volume
+            elif kind == APPLIED:
+                state.applied = volume
+            elif kind == RELEASED:
+                state.released = True
+        return states
+
+    def _find_end(self):
+        for offset in range(0, len(self._map), RECORD.size):
+            if self._map[offset] == 0:
+                return offset
+        return len(self._map)
+
+
+def restore(journal, backend):
+    """Puts every session the journal left changed back to its initial volume.
+
+    Sessions are matched by PID and executable name, so a reused PID is left
+    alone. Only the sessions restored are released in the journal; the
+    others stay pending. Returns the number of sessions restored.
+    """
+    pending = journal.pending()
+    restored = {}
+    if pending:
+        for session in backend.list_sessions():
+            pid = backend.get_session_pid(session)
+            state = pending.get(pid)
+            if state is None or _name(backend.get_session_name(session)) != state.name:
+                continue
+            try:
+                backend.set_volume(backend.open_volume(session), state.initial)
+                restored[pid] = state
+            except Exception:
+                pass
+    if restored:
+        journal.release(restored)
+    return len(restored)
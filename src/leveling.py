@@ -0,0 +1,129 @@
+import math
+import operator
+
+from .groups import SourceGroup
+from .metering import PeakMeter
+
+
+def rms(values):
+    if not values:
+        return 0.0
+    return math.sqrt(sum(map(operator.mul, values, values)) / len(values))
+
+
+def to_db(ratio):
+    return 20.0 * math.log10(ratio)
+
+
+def from_db(db):
+    return 10.0 ** (db / 20.0)
+
+
+class Leveler:
+    """Evens out the loudness of the two sources on top of the balance.
+
+    Peak levels of every balanced session are sampled into ring buffers and,
+    every ``interval`` seconds, each source's loudness is taken as the RMS
+    over the last ``window`` seconds, divided by the volume it was played
+    at. The louder source is trimmed through its mixer weight so that it
+    sits ``target_db`` above the other; trims move by at most ``max_step_db``
+    per update and are only applied when they change by ``min_change_db``,
+    which keeps volume writes rare. Silent sources keep their trim.
+    """
+
+    def __init__(self, core, window=3.0, interval=0.5, target_db=0.0, max_step_db=1.0,
+                 min_change_db=0.5, min_trim_db=-20.0, silence=0.01, rate=20):
+        self.window = window
+        self.interval = interval
+        self.target_db = target_db
+        self.max_step_db = max_step_db
+        self.min_change_db = min_change_db
+        self.min_trim_db = min_trim_db
+        self.silence = silence
+        self.trims_db = [0.0, 0.0]
+
+        self._core = core
+        self._samples = max(int(window * rate), 1)
+        self._timer = None
+        self.meter = PeakMeter(core.backend, rate, history=window)
+
+        core.add_listener(self._on_core_changed)
+        self._watch_sources()
+
+    def start(self):
+        self.meter.start()
+        self._schedule()
+
+    def close(self):
+        if self._timer is not None:
+            self._core.dispatcher.cancel(self._timer)
+            self._timer = None
+        self.meter.close()
+
+    def members(self, slot):
+        source = self._core.sources[slot]
+        if isinstance(source, SourceGroup):
+            return list(source.members.values())
+        return [source] if source is not None else []
+
+    def loudness(self, slot):
+        """Loudness of a source before its volume, or None while it is silent or muted."""
+        mixer = self._core.mixer
+        loudest = None
+        for process in self.members(slot):
+            history = self.meter.history(process)
+            if history is None or process not in mixer:
+                continue
+            level = rms(history.latest(self._samples))
+            gain = mixer.get_gain(process)
+            if level < self.silence or not gain > 0.05:
+                continue
+            level /= gain
+            loudest = level if loudest is None else max(loudest, level)
+        return loudest
+
+    def update(self):
+        levels = [self.loudness(0), self.loudness(1)]
+        if None in levels:
+            return False
+
+        # Positive when source 1 is louder than wanted relative to source 2
+        excess = to_db(levels[0]) - to_db(levels[1]) - self.target_db
+        targets = [-max(excess, 0.0), -max(-excess, 0.0)]
+
+        changed = False
+        for slot, target in enumerate(targets):
+            current = self.trims_db[slot]
+            if abs(target - current) < self.min_change_db:
+                continue
+            step = min(max(target - current, -self.max_step_db), self.max_step_db)
+            self.trims_db[slot] = max(current + step, self.min_trim_db)
+            changed = True
+
+        if changed:
+            self._apply()
+        return changed
+
+    def _apply(self):
+        weights = {}
+        for slot in (0, 1):
+            weight = from_db(self.trims_db[slot])
+            for process in self.members(slot):
+                weights[process] = weight
+        self._core.mixer.set_weights(weights)
+
+    def _schedule(self):
+        self._timer = self._core.dispatcher.call_later(self.interval, self._on_timer)
+
+    def _on_timer(self):
+        self.update()
+        self._schedule()
+
+    def _watch_sources(self):
+        self.meter.watch(self.members(0) + self.members(1))
+
+    def _on_core_changed(self, event):
+        if event in ("sources", "sessions"):
+            self._watch_sources()
+            # New members start at full weight, so bring them in line with their source
+            self._apply()
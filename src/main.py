@@ -1,67 +1,86 @@
-import tkinter as tk
-import keyboard
+import time
 import traceback
+import tkinter as tk
 
-from tkinter import ttk
-from pycaw.pycaw import AudioUtilities
+from tkinter import simpledialog, ttk
 from .__version__ import __version__
-
-
-class AudioProcess:
-    def __init__(self, session = None):
-        self._session = session
-        self._initial_vol = session.SimpleAudioVolume.GetMasterVolume()
-    
-    def get_session(self):
-        return self._session
-
-    def get_initial_volume(self):
-        return self._initial_vol
-
-    def get_volume(self):
-        return self._session.SimpleAudioVolume.GetMasterVolume()
-
-    def set_volume(self, volume):
-        try:
-            self._session.SimpleAudioVolume.SetMasterVolume(volume, None)
-        except Exception:
-            traceback.print_exc()
-
-    def reset_volume(self):
-        self.set_volume(self._initial_vol)
-
-    def get_session_name(self):
-        return self._session.Process.name()
-
-    def get_session_pid(self):
-        return self._session.Process.pid
-
-    def get_readable_process_key(self):
-        return f"{self.get_session_name()} (PID: {self.get_session_pid()})"
-
+from .backends import create_backend
+from .catalog import SessionCatalog
+from .core import BalancerCore, SelectionConflictError
+from .crossfade import CURVES
+from .dispatch import TkDispatcher
+from .picker import SessionPicker
+from .profiles import save_last_profile
+from .snapshot import StartupSnapshot
+from .view import RenderQueue
 
 
 class VolumeBalancer:
-    def __init__(self, root):
+    def __init__(self, root, backend=None, curve="linear", hotkeys=True, metrics=None, profiles=None, snapshot=None, journal=None):
         self.root = root
+        self.snapshot_path = snapshot
+        self.hotkeys = hotkeys
+        self.dispatcher = TkDispatcher(root)
+        self.core = BalancerCore(backend if backend is not None else create_backend(), self.dispatcher, curve, metrics=metrics)
+        self.catalog = SessionCatalog(groups=True)
+        self.core.audio_sessions.attach(self.catalog)
+        self.metrics_panel = None
         self.root.title(f"Volume Balancer v{__version__}")
         self.root.geometry("500x325")
         self.root.minsize(500, 325)
-        
-        self.process1 = None
-        self.process2 = None
-        self.audio_sessions = {}
+
+        self.view = RenderQueue(root)
+        self._catalog_changes = []
+        self._snapshot_keys = ()
+        self._placeholders = (None, None)
 
         self.balance_var = tk.DoubleVar(value=0.0)
         self.balance_var.trace_add("write", self.update_volumes)
         
         self._create_widgets()
-        self.setup_hotkeys()
-        self.refresh_processes()
+        if profiles is not None:
+            self.core.use_profiles(profiles)
+            self._create_profile_menu()
+        self.core.add_listener(self.on_core_changed)
+        if hotkeys:
+            self.setup_hotkeys()
+        if journal is not None:
+            self.core.use_journal(journal)
+        warm = snapshot is not None and self.show_snapshot(StartupSnapshot.load(snapshot))
+        self.core.start()
+        if warm:
+            # The first live scan replaces whatever the snapshot claimed
+            self.core.refresh().add_done_callback(lambda scan: self.dispatcher.post(self._drop_snapshot))
         self.update_balance_labels()
+        if metrics is not None:
+            self.root.bind("<F12>", self.show_metrics)
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    @property
+    def process1(self):
+        return self.core.sources[0]
+
+    @property
+    def process2(self):
+        return self.core.sources[1]
+
+    @property
+    def audio_sessions(self):
+        return self.core.audio_sessions
+
+    @property
+    def scheduler(self):
+        return self.core.scheduler
+
+    @property
+    def mixer(self):
+        return self.core.mixer
+
+    @property
+    def crossfader(self):
+        return self.core.crossfader
+
     def _create_widgets(self):
         # Process 1 selection
         process1_frame = tk.Frame(self.root)
@@ -73,11 +92,11 @@ class VolumeBalancer:
         self.process1_combo = ttk.Combobox(
             process1_frame,
             textvariable=self.process1_var,
-            width=40,
-            state="readonly"
+            width=40
         )
         self.process1_combo.bind("<<ComboboxSelected>>", self.on_process1_selected)
         self.process1_combo.grid(row=1, column=0)
+        self.picker1 = SessionPicker(self.process1_combo, self.process1_var, self.catalog)
         
         self.unset1 = tk.Button(process1_frame, text="unset", command=lambda: self.clear_process1())
         self.unset1.grid(row=1, column=1, padx=(10, 0))
@@ -92,11 +111,11 @@ class VolumeBalancer:
         self.process2_combo = ttk.Combobox(
             process2_frame, 
             textvariable=self.process2_var,
-            width=40,
-            state="readonly"
+            width=40
         )
         self.process2_combo.grid(row=1, column=0)
         self.process2_combo.bind("<<ComboboxSelected>>", self.on_process2_selected)
+        self.picker2 = SessionPicker(self.process2_combo, self.process2_var, self.catalog)
 
         self.unset2 = tk.Button(process2_frame, text="unset", command=lambda: self.clear_process2())
         self.unset2.grid(row=1, column=1, padx=(10, 0))
@@ -112,13 +131,13 @@ class VolumeBalancer:
         slider_frame.pack()
         
         tk.Label(slider_frame, text="v", font=("Arial", 10)).pack(side=tk.TOP)
-        tk.Button(slider_frame, text="<<", command=lambda: self.balance_var.set(-1.0), height=1, width=2).pack(side=tk.LEFT, padx=5)
+        tk.Button(slider_frame, text="<<", command=lambda: self.fade_balance(-1.0), height=1, width=2).pack(side=tk.LEFT, padx=5)
 
         self.balance_slider = tk.Scale(
             slider_frame,
             from_=-1.0,
             to=1.0,
-            resolution=0.1,
+            resolution=0.01,
             orient=tk.HORIZONTAL,
             variable=self.balance_var,
             length=400,
@@ -126,7 +145,7 @@ class VolumeBalancer:
         )
         self.balance_slider.pack(side=tk.LEFT, padx=5)
 
-        tk.Button(slider_frame, text=">>", command=lambda: self.balance_var.set(1.0), height=1, width=2).pack(side=tk.LEFT, padx=5)
+        tk.Button(slider_frame, text=">>", command=lambda: self.fade_balance(1.0), height=1, width=2).pack(side=tk.LEFT, padx=5)
         
         ## Balance labels
         balance_label_frame = tk.Frame(balancer_frame)
@@ -153,129 +172,242 @@ class VolumeBalancer:
         help_text = f"Hotkeys: Ctrl + Alt + Left/Right adjust balance | Ctrl + Shift + Left/Right/Down set extremes"
         tk.Label(self.root, text=help_text, font=("Arial", 7), fg="gray").pack(pady=5)
     
+    def _create_profile_menu(self):
+        menubar = tk.Menu(self.root)
+        self.profile_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Profiles", menu=self.profile_menu)
+        self.root.config(menu=menubar)
+        self.update_profile_menu()
+
+    def update_profile_menu(self):
+        self.profile_menu.delete(0, tk.END)
+        self.profile_menu.add_command(label="Save current as...", command=self.save_profile)
+        if self.core.profiles:
+            self.profile_menu.add_separator()
+        for name in self.core.profiles.profiles:
+            self.profile_menu.add_command(label=name, command=lambda name=name: self.apply_profile(name))
+
+    def save_profile(self, name=None):
+        if name is None:
+            name = simpledialog.askstring("Save profile", "Profile name:", parent=self.root)
+        if not name:
+            return
+        self.core.profiles.put(self.core.capture_profile(name))
+        self.core.profiles.save()
+        self.update_profile_menu()
+
+    def apply_profile(self, name):
+        profile = self.core.profiles.get(name)
+        if profile is not None:
+            self.core.apply_profile(profile)
+
     def setup_hotkeys(self):
-        keyboard.add_hotkey('ctrl+alt+left', lambda: self.reduce_balance())
-        keyboard.add_hotkey('ctrl+alt+right', lambda: self.increase_balance())
-        keyboard.add_hotkey('ctrl+shift+left', lambda: self.balance_var.set(-1.0))
-        keyboard.add_hotkey('ctrl+shift+right', lambda: self.balance_var.set(1.0))
-        keyboard.add_hotkey('ctrl+shift+down', lambda: self.balance_var.set(0.0))
-        keyboard.add_hotkey('ctrl+shift+up', lambda: self.balance_var.set(0.0))
+        # Imported here so the keyboard hook is not loaded before the window
+        from .hotkeys import setup_hotkeys
+        setup_hotkeys(self.core)
+
+    def show_snapshot(self, snapshot):
+        """Fills the window from a ``StartupSnapshot`` while the backend is still starting.
+
+        Snapshot sessions are listed until the first live scan, and the
+        sources it names are bound as soon as live sessions of them appear.
+        Returns whether there was a snapshot to show.
+        """
+        if snapshot is None:
+            return False
+        self._snapshot_keys = snapshot.sessions
+        for key in snapshot.sessions:
+            self.catalog.add(key)
+        self._catalog_changes.extend(self.catalog.take_changes())
+        self.view.call("pickers", self._render_pickers)
+
+        profile = snapshot.profile
+        self._placeholders = tuple(rule["exe"] if rule else None for rule in profile.sources)
+        if profile.curve in CURVES:
+            self.core.set_curve(profile.curve)
+        for slot, rule in enumerate(profile.sources):
+            if rule is None:
+                continue
+            if rule["group"]:
+                try:
+                    self.core.select_group(slot, rule["exe"])
+                except SelectionConflictError as e:
+                    print(f"Skipping a snapshot source: {e}")
+            else:
+                self.core.bind_source(slot, rule["exe"])
+        self.balance_var.set(profile.balance)
+        return True
+
+    def _drop_snapshot(self):
+        for key in self._snapshot_keys:
+            if key not in self.core.audio_sessions:
+                self.catalog.remove(key)
+        self._snapshot_keys = ()
+        self._placeholders = (None, None)
+        self._catalog_changes.extend(self.catalog.take_changes())
+        self.view.call("pickers", self._render_pickers)
+        self.update_balance_labels()
     
+    def show_metrics(self, event=None):
+        from .debug_panel import MetricsPanel
+        if self.metrics_panel is not None:
+            self.metrics_panel.close()
+        self.metrics_panel = MetricsPanel(self.root, self.core.metrics)
+
     def on_closing(self):
-        try:
-            keyboard.unhook_all()
-        except:
-            traceback.print_exc()
-        
-        if self.process1 is not None:
-            self.process1.reset_volume()
-        if self.process2 is not None:
-            self.process2.reset_volume()
+        if self.metrics_panel is not None:
+            self.metrics_panel.close()
+        self.view.close()
+        if self.hotkeys:
+            from .hotkeys import remove_hotkeys
+            remove_hotkeys()
+        save_last_profile(self.core)
+        if self.snapshot_path is not None:
+            try:
+                StartupSnapshot.capture(self.core).save(self.snapshot_path)
+            except OSError:
+                traceback.print_exc()
+        self.core.close()
+        self.dispatcher.close()
 
         self.root.destroy()
+
+    def on_core_changed(self, event):
+        if event == "balance":
+            if self.balance_var.get() != self.core.balance:
+                self.balance_var.set(self.core.balance)
+        elif event == "sources":
+            self.view.call("pickers", self._render_pickers)
+            self.update_balance_labels()
+        elif event == "sessions":
+            self._catalog_changes.extend(self.catalog.take_changes())
+            self.view.call("pickers", self._render_pickers)
+        elif event == "health":
+            self.update_balance_labels()
         
-    def get_audio_processes(self):
-        processes = {}
-        try:
-            sessions = AudioUtilities.GetAllSessions()
-            for session in sessions:
-                if session.Process:
-                    audioProcess = AudioProcess(session)
-                    key = audioProcess.get_readable_process_key()
-                    if key not in processes:
-                        processes[key] = audioProcess
-        except Exception as e:
-            print(f"Error getting audio processes:", traceback.format_exc())
-        return processes
-    
-    def refresh_processes(self):
-        self.audio_sessions = self.get_audio_processes()
-        self.update_combobox_values()
-        
-    def update_combobox_values(self):
-        process_list = self.audio_sessions.keys()
-        key1, key2 = "", ""
+    def refresh_processes(self, wait=False):
+        scan = self.core.refresh(wait)
+        if wait:
+            self.view.flush()
+        return scan
+
+    def _render_pickers(self):
+        changes, self._catalog_changes = self._catalog_changes, []
+        self.update_combobox_values(changes)
+
+    def update_combobox_values(self, changes=()):
+        key1, key2 = None, None
 
         if self.process1:
             key1 = self.process1.get_readable_process_key()
         if self.process2:
             key2 = self.process2.get_readable_process_key()
 
-        self.process1_combo['values'] = [el for el in process_list if el != key2]
-        self.process2_combo['values'] = [el for el in process_list if el != key1]
+        self.picker1.update(key2, changes)
+        self.picker2.update(key1, changes)
     
     def update_balance_labels(self):
-        process1_name = self.process1.get_session_name() if self.process1 else "None selected"
-        process2_name = self.process2.get_session_name() if self.process2 else "None selected"
-
-        if len(process1_name) > 20:
-            process1_name = f"{process1_name[:20]}..."
-
-        if len(process2_name) > 20:
-            process2_name = f"{process2_name[:20]}..."
-
-        self.process1_label.config(text=process1_name)
-        self.process2_label.config(text=process2_name)
-
+        for slot, label in enumerate((self.process1_label, self.process2_label)):
+            source = self.core.sources[slot]
+            # Until the first scan, a source named by the snapshot is shown in gray
+            name = source.get_session_name() if source else self._placeholders[slot] or "None selected"
+            if len(name) > 20:
+                name = f"{name[:20]}..."
+
+            if self.core.is_degraded(slot):
+                self.view.set(label, text=f"{name} (not responding)", fg="red")
+            elif source is None and self._placeholders[slot]:
+                self.view.set(label, text=name, fg="gray")
+            else:
+                self.view.set(label, text=name, fg="black")
+
+    # Direct input is rendered at once; the queue batches model-driven updates
     def on_process1_selected(self, event=None):
-        if self.process1 is not None:
-            self.process1.reset_volume()
-
-        selected = self.process1_var.get()
-        if selected in self.audio_sessions:
-            self.process1 = self.audio_sessions[selected]
-            self.update_combobox_values()
-            self.update_balance_labels()
-            self.update_volumes()
+        self.picker1.clear_query()
+        self._select(0, self.process1_var)
+        self.view.flush()
     
     def on_process2_selected(self, event=None):
-        selected = self.process2_var.get()
+        self.picker2.clear_query()
+        self._select(1, self.process2_var)
+        self.view.flush()
 
-        if self.process2 is not None:
-            self.process2.reset_volume()
-
-        if selected in self.audio_sessions:
-            self.process2 = self.audio_sessions[selected]
-            self.update_combobox_values()
-            self.update_balance_labels()
-            self.update_volumes()
+    def _select(self, slot, var):
+        try:
+            self.core.select(slot, var.get())
+        except SelectionConflictError as e:
+            print(e)
+            source = self.core.sources[slot]
+            var.set(source.get_readable_process_key() if source else "")
 
     def clear_process1(self):
         if self.process1:
             self.process1_var.set("")
-            self.process1.reset_volume()
-            self.process1 = None
-            self.update_balance_labels()
-            self.update_combobox_values()
+            self.core.clear(0)
+            self.view.flush()
 
     def clear_process2(self):
         if self.process2:
             self.process2_var.set("")
-            self.process2.reset_volume()
-            self.process2 = None
-            self.update_balance_labels()
-            self.update_combobox_values()
+            self.core.clear(1)
+            self.view.flush()
     
     def update_volumes(self, *args):
-        if self.process1:
-            self.process1.set_volume(1.0 - max(self.balance_var.get(), 0))
-        
-        if self.process2:
-            self.process2.set_volume(1.0 + min(self.balance_var.get(), 0))
+        self.core.set_balance(self.balance_var.get())
+
+    def fade_balance(self, target, duration=None):
+        self.core.fade_balance(target, duration)
+
+    def set_curve(self, curve):
+        self.core.set_curve(curve)
     
     def reduce_balance(self, by=0.1):
-        self.balance_var.set(max(-1.0, self.balance_var.get() - by))
+        self.core.nudge(-by)
 
     def increase_balance(self, by=0.1):
-        self.balance_var.set(min(1.0, self.balance_var.get() + by))
+        self.core.nudge(by)
 
-def main():
+def main(backend=None, curve="linear", sources=(None, None), hotkeys=True, control=None, metrics=None, profiles=None, duck=None, level=False, journal=None, snapshot=None, started=None, exit_after=None, record=None, play=None):
+    started = time.perf_counter() if started is None else started
     root = tk.Tk()
-    VolumeBalancer(root)
+    app = VolumeBalancer(root, backend, curve, hotkeys, metrics, profiles, snapshot, journal)
+    if duck is not None:
+        app.core.enable_ducking(depth=duck)
+    if level:
+        app.core.enable_leveling()
+    for slot, name in enumerate(sources):
+        app.core.bind_source(slot, name)
+    if record is not None:
+        app.core.start_recording()
+    if play is not None:
+        app.core.play(play)
+
+    server = None
+    if control is not None:
+        from .control import ControlServer
+        server = ControlServer(app.core, control)
+        server.start()
+
+    def ready():
+        startup_ms = (time.perf_counter() - started) * 1000
+        print(f"Window ready in {startup_ms:.1f} ms listing {len(app.picker1.visible)} sessions", flush=True)
+
+    root.after_idle(ready)
+    if exit_after is not None:
+        root.after(int(exit_after * 1000), app.on_closing)
+
     root.iconbitmap("./assets/app.ico")
     root.mainloop()
 
+    if server is not None:
+        server.stop()
+    if record is not None:
+        from .timeline import save_recording
+        save_recording(app.core, record)
+    if play is not None:
+        print(app.core.player.summary())
+    return app
+
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,188 @@
+import math
+import threading
+import time
+import traceback
+
+from array import array
+
+from .groups import SourceGroup
+
+
+class RingBuffer:
+    """Fixed-size float history backed by a flat array."""
+
+    __slots__ = ("_values", "_index", "_count")
+
+    def __init__(self, size):
+        self._values = array("f", bytes(4 * size))
+        self._index = 0
+        self._count = 0
+
+    def append(self, value):
+        values = self._values
+        values[self._index] = value
+        self._index = (self._index + 1) % len(values)
+        if self._count < len(values):
+            self._count += 1
+
+    def latest(self, count=1):
+        """The last ``count`` values, oldest first."""
+        values = self._values
+        count = min(count, self._count)
+        start = self._index - count
+        if start >= 0:
+            return values[start:self._index].tolist()
+        return values[start:].tolist() + values[:self._index].tolist()
+
+    def peak(self, count=1):
+        return max(self.latest(count), default=0.0)
+
+    def __len__(self):
+        return self._count
+
+
+class _Meter:
+    __slots__ = ("process", "handle", "history")
+
+    def __init__(self, process, history):
+        self.process = process
+        self.handle = None
+        self.history = history
+
+
+class PeakMeter:
+    """Samples the peak level of a set of sessions at a fixed rate.
+
+    Sampling runs on its own thread against a schedule anchored to the
+    start time, so the cadence does not drift, and sleeps between ticks.
+    Each session keeps ``history`` seconds of samples in a ring buffer.
+    ``on_sample`` is called from the sampling thread with the loudest peak
+    of the tick.
+    """
+
+    def __init__(self, backend, rate=50, history=2.0, on_sample=None):
+        self.rate = rate
+        self.interval = 1.0 / rate
+        self.on_sample = on_sample
+
+        self._backend = backend
+        self._size = max(int(rate * history), 1)
+        self._meters = ()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, processes):
+        # The tuple is swapped whole, so the sampling thread never sees a partial update
+        known = {meter.process: meter for meter in self._meters}
+        self._meters = tuple(known.get(process) or _Meter(process, RingBuffer(self._size)) for process in processes)
+
+    def history(self, process):
+        for meter in self._meters:
+            if meter.process is process:
+                return meter.history
+        return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="peak-meter", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def sample(self):
+        backend = self._backend
+        loudest = 0.0
+        for meter in self._meters:
+            try:
+                if meter.handle is None:
+                    meter.handle = backend.open_meter(meter.process.get_session())
+                peak = backend.get_peak(meter.handle)
+            except Exception:
+                peak = 0.0
+            meter.history.append(peak)
+            if peak > loudest:
+                loudest = peak
+        return loudest
+
+    def _run(self):
+        self._backend.thread_init()
+        try:
+            started = time.perf_counter()
+            ticks = 0
+            while not self._stop.is_set():
+                loudest = self.sample()
+                if self.on_sample is not None:
+                    try:
+                        self.on_sample(loudest)
+                    except Exception:
+                        traceback.print_exc()
+
+                ticks += 1
+                delay = started + ticks * self.interval - time.perf_counter()
+                if delay < -self.interval:
+                    # Fell behind (e.g. the machine slept), skip the missed ticks
+                    ticks += int(-delay / self.interval)
+                    delay = 0.0
+                self._stop.wait(max(delay, 0.0))
+        finally:
+            self._backend.thread_exit()
+
+
+class Ducker:
+    """Lowers source 2 while source 1 is loud by offsetting the balance.
+
+    Source 1's peak level opens a gate above ``threshold``; the gate is
+    smoothed by one-pole attack and release envelopes evaluated per sample,
+    and the mixer's balance offset pulls the volumes ``depth * envelope``
+    towards source 1. The balance the user set, its fades and what profiles
+    and snapshots save are left alone. Envelope math runs on the sampling
+    thread; offset changes of at least ``step`` are posted to the dispatcher.
+    """
+
+    def __init__(self, core, depth=0.5, threshold=0.05, attack=0.05, release=0.8, rate=50, step=0.01):
+        self.depth = depth
+        self.threshold = threshold
+        self.step = step
+        self.envelope = 0.0
+
+        self._core = core
+        self._attack = math.exp(-1.0 / (rate * attack)) if attack > 0 else 0.0
+        self._release = math.exp(-1.0 / (rate * release)) if release > 0 else 0.0
+        self._posted = 0.0
+        self.meter = PeakMeter(core.backend, rate, on_sample=self._on_sample)
+
+        core.add_listener(self._on_core_changed)
+        self._watch_sources()
+
+    def start(self):
+        self.meter.start()
+
+    def close(self):
+        self.meter.close()
+
+    def _watch_sources(self):
+        source = self._core.sources[0]
+        if isinstance(source, SourceGroup):
+            self.meter.watch(list(source.members.values()))
+        else:
+            self.meter.watch([source] if source is not None else [])
+
+    def _on_sample(self, peak):
+        gate = 1.0 if peak >= self.threshold else 0.0
+        coefficient = self._attack if gate > self.envelope else self._release
+        self.envelope = gate + (self.envelope - gate) * coefficient
+        if self.envelope < 1e-3 and gate == 0.0:
+            self.envelope = 0.0
+
+        if abs(self.envelope - self._posted) >= self.step or (self.envelope == 0.0 and self._posted):
+            self._posted = self.envelope
+            self._core.dispatcher.post(self._apply, self.envelope)
+
+    def _apply(self, envelope):
+        self._core.mixer.set_offset(-self.depth * envelope)
+
+    def _on_core_changed(self, event):
+        if event in ("sources", "sessions"):
+            self._watch_sources()
@@ -0,0 +1,207 @@
+import bisect
+import json
+import threading
+import time
+
+from .backends import AudioBackend
+
+# Bucket bounds in seconds: 1 us doubling up to ~17 s
+BUCKETS = tuple(1e-6 * 2 ** i for i in range(25))
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum", "max", "_lock")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding the requested rank
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "errors": 0,
+            "mean_ms": self.sum / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class Metrics:
+    """Latency histograms and error counts for the hot paths.
+
+    Instrumentation is opt-in: when a ``Metrics`` instance is not passed to
+    the core nothing is wrapped and the hot paths are untouched.
+    """
+
+    def __init__(self, input_timeout=1.0):
+        self.input_timeout = input_timeout
+        self.histograms = {}
+        self.errors = {}
+
+        self._input_mark = None
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def observe(self, name, seconds):
+        self.histogram(name).observe(seconds)
+
+    def error(self, name):
+        with self._lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def mark_input(self):
+        # Keeps the oldest unanswered input so the measured latency is the worst case
+        with self._lock:
+            if self._input_mark is None:
+                self._input_mark = time.perf_counter()
+
+    def cancel_input(self):
+        """Drops the pending mark of an input that did not lead to a write."""
+        with self._lock:
+            self._input_mark = None
+
+    def complete_input(self):
+        with self._lock:
+            mark, self._input_mark = self._input_mark, None
+        if mark is not None:
+            elapsed = time.perf_counter() - mark
+            if elapsed <= self.input_timeout:
+                self.observe("hotkey_to_write", elapsed)
+
+    def snapshot(self):
+        histograms, errors = self._copy()
+        result = {}
+        for name, histogram in sorted(histograms.items()):
+            result[name] = histogram.snapshot()
+            result[name]["errors"] = errors.get(name, 0)
+        for name, count in errors.items():
+            result.setdefault(name, {"count": 0, "errors": count})
+        return result
+
+    def _copy(self):
+        # Other threads add histograms and errors while these are read
+        with self._lock:
+            return dict(self.histograms), dict(self.errors)
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP volume_balancer_latency_seconds Latency of backend calls and hotkey to write.",
+            "# TYPE volume_balancer_latency_seconds histogram",
+        ]
+        histograms, errors = self._copy()
+        for name, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                lines.append(f'volume_balancer_latency_seconds_bucket{{op="{name}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'volume_balancer_latency_seconds_bucket{{op="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'volume_balancer_latency_seconds_sum{{op="{name}"}} {histogram.sum:.9f}')
+            lines.append(f'volume_balancer_latency_seconds_count{{op="{name}"}} {histogram.count}')
+
+        lines.append("# HELP volume_balancer_errors_total Failed backend calls.")
+        lines.append("# TYPE volume_balancer_errors_total counter")
+        for name, count in sorted(errors.items()):
+            lines.append(f'volume_balancer_errors_total{{op="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_prometheus() if path.endswith(".prom") else self.to_json())
+
+
+class InstrumentedBackend(AudioBackend):
+    """Times every call into the wrapped backend."""
+
+    def __init__(self, backend, metrics):
+        self.backend = backend
+        self.metrics = metrics
+        self.name = backend.name
+
+    def _timed(self, name, function, *args):
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        except Exception:
+            self.metrics.error(name)
+            raise
+        finally:
+            self.metrics.observe(name, time.perf_counter() - started)
+
+    def thread_init(self):
+        self.backend.thread_init()
+
+    def thread_exit(self):
+        self.backend.thread_exit()
+
+    def list_endpoints(self):
+        return self._timed("list_endpoints", self.backend.list_endpoints)
+
+    def get_endpoint_name(self, endpoint):
+        return self.backend.get_endpoint_name(endpoint)
+
+    def list_sessions(self, endpoint=None):
+        if endpoint is None:
+            return self._timed("list_sessions", self.backend.list_sessions)
+        return self._timed("list_sessions", self.backend.list_sessions, endpoint)
+
+    def watch_sessions(self, on_added, on_removed):
+        return self.backend.watch_sessions(on_added, on_removed)
+
+    def watch_volume(self, session, on_changed):
+        return self.backend.watch_volume(session, on_changed)
+
+    def get_session_pid(self, session):
+        return self._timed("get_session_pid", self.backend.get_session_pid, session)
+
+    def get_session_name(self, session):
+        return self._timed("get_session_name", self.backend.get_session_name, session)
+
+    def get_session_device(self, session):
+        return self.backend.get_session_device(session)
+
+    def open_volume(self, session):
+        return self._timed("open_volume", self.backend.open_volume, session)
+
+    def get_volume(self, volume):
+        return self._timed("get_volume", self.backend.get_volume, volume)
+
+    def set_volume(self, volume, value):
+        return self._timed("set_volume", self.backend.set_volume, volume, value)
+
+    def open_meter(self, session):
+        return self._timed("open_meter", self.backend.open_meter, session)
+
+    def get_peak(self, meter):
+        return self._timed("get_peak", self.backend.get_peak, meter)
@@ -0,0 +1,155 @@
+from array import array
+
+from .crossfade import get_curve
+
+
+class MixingEngine:
+    """Balances any number of sources against each other.
+
+    Every channel has a position on the balance axis (-1.0 is the left end,
+    1.0 the right end) and a weight. Moving the balance away from a channel
+    attenuates it along the balance curve, so at balance ``b`` a channel at
+    position ``p`` plays at ``weight * curve(clamp(-b * p, 0, 1))``. Gains
+    are computed in one pass over flat arrays against the curve's lookup
+    table, which quantizes them, and only the ones that changed are handed
+    to the write scheduler, held so they are written as one batch.
+
+    A volume set from outside the balancer is taken over with ``rebase``,
+    which scales the channel's weight so the session stays where it was put.
+    That scale is kept apart from the weights given to ``set_weights``.
+
+    ``set_offset`` shifts the balance the gains are computed at without
+    changing ``balance`` itself, for adjustments such as ducking that sit
+    on top of the position the user chose.
+    """
+
+    MIN_SCALE = 1e-3
+
+    def __init__(self, scheduler, curve="linear", epsilon=0.005):
+        self.epsilon = epsilon
+        self.balance = 0.0
+        self.offset = 0.0
+        self.curve = get_curve(curve)
+
+        self._scheduler = scheduler
+        self._processes = []
+        self._positions = array("d")
+        self._weights = array("d")
+        self._scales = array("d")
+        self._gains = array("d")
+
+    @property
+    def processes(self):
+        return list(self._processes)
+
+    def __contains__(self, process):
+        return process in self._processes
+
+    def __len__(self):
+        return len(self._processes)
+
+    def add(self, process, position, weight=1.0):
+        if process in self._processes:
+            self.remove(process, reset=False)
+
+        self._processes.append(process)
+        self._positions.append(position)
+        self._weights.append(weight)
+        self._scales.append(1.0)
+        # NaN never compares equal, so the first update always writes
+        self._gains.append(float("nan"))
+        self.update()
+
+    def extend(self, processes, position, weight=1.0):
+        """Adds several channels at one position with a single update."""
+        for process in processes:
+            if process in self._processes:
+                self.remove(process, reset=False)
+            self._processes.append(process)
+            self._positions.append(position)
+            self._weights.append(weight)
+            self._scales.append(1.0)
+            self._gains.append(float("nan"))
+        self.update()
+
+    def remove(self, process, reset=True):
+        index = self._processes.index(process)
+        del self._processes[index]
+        del self._positions[index]
+        del self._weights[index]
+        del self._scales[index]
+        del self._gains[index]
+
+        if reset:
+            self._scheduler.reset(process)
+
+    def clear(self, reset=True):
+        for process in list(self._processes):
+            self.remove(process, reset)
+
+    def set_weights(self, weights):
+        """Changes the weight of several channels with a single update."""
+        indexes = {process: index for index, process in enumerate(self._processes)}
+        for process, weight in weights.items():
+            index = indexes.get(process)
+            if index is not None:
+                self._weights[index] = weight * self._scales[index]
+        self.update()
+
+    def rebase(self, process, volume):
+        """Takes over a volume set from outside without writing it back."""
+        index = self._processes.index(process)
+        table = self.curve.table
+        attenuation = table[int(min(max(-self._effective_balance() * self._positions[index], 0.0), 1.0) * self.curve.scale + 0.5)]
+        scale = self._scales[index]
+        base = self._weights[index] / scale
+        if attenuation > self.epsilon and base > 0.0:
+            # Weights above 1.0 would ask for more than full volume at the centre, and a
+            # floor on the scale keeps the set_weights weight recoverable after a mute
+            scale = max(min(volume / attenuation, 1.0) / base, self.MIN_SCALE)
+            self._scales[index] = scale
+            self._weights[index] = base * scale
+        self._gains[index] = volume
+
+    def set_balance(self, balance):
+        self.balance = balance
+        self.update()
+
+    def set_offset(self, offset):
+        self.offset = offset
+        self.update()
+
+    def set_curve(self, curve):
+        self.curve = get_curve(curve)
+        self.update()
+
+    def compute_gains(self, balance):
+        table = self.curve.table
+        scale = self.curve.scale
+        return array("d", [
+            weight * table[int(min(max(-balance * position, 0.0), 1.0) * scale + 0.5)]
+            for position, weight in zip(self._positions, self._weights)
+        ])
+
+    def get_gain(self, process):
+        return self._gains[self._processes.index(process)]
+
+    def update(self):
+        gains = self.compute_gains(self._effective_balance())
+        epsilon = self.epsilon
+        submit = self._scheduler.submit
+
+        last_gains = self._gains
+
+        with self._scheduler.hold():
+            for index, process in enumerate(self._processes):
+                # Skipped gains keep the last pushed value so small steps still add up
+                if abs(gains[index] - last_gains[index]) <= epsilon:
+                    gains[index] = last_gains[index]
+                else:
+                    submit(process, gains[index])
+
+        self._gains = gains
+
+    def _effective_balance(self):
+        return min(max(self.balance + self.offset, -1.0), 1.0)
@@ -0,0 +1,65 @@
+NAVIGATION_KEYS = {"Up", "Down", "Left", "Right", "Return", "Escape", "Tab", "Home", "End"}
+
+
+class SessionPicker:
+    """Search-as-you-type behaviour for a session combobox.
+
+    Typing filters the dropdown through a ``SessionCatalog`` and Return
+    picks the first match. Only the first ``limit`` matches are shown, and
+    the combobox is only reconfigured when a change to the catalog, the
+    query or the excluded key actually alters them.
+    """
+
+    def __init__(self, combobox, variable, catalog, limit=100):
+        self.combobox = combobox
+        self.variable = variable
+        self.catalog = catalog
+        self.limit = limit
+
+        self.query = ""
+        self.exclude = None
+        self.visible = []
+
+        self._stale = True
+        self._visible_set = set()
+
+        combobox.config(state="normal")
+        combobox.bind("<KeyRelease>", self._on_key)
+        combobox.bind("<Return>", self._on_return)
+
+    def update(self, exclude=None, changes=()):
+        """Re-filters if the excluded key changed or ``changes`` touch the visible matches."""
+        if exclude != self.exclude:
+            self.exclude = exclude
+            self._stale = True
+        elif not self._stale:
+            self._stale = any(key in self._visible_set or self.catalog.matches(key, self.query) for key in changes)
+
+        if self._stale:
+            self._show()
+
+    def filter(self, query):
+        if query != self.query:
+            self.query = query
+            self._show()
+
+    def clear_query(self):
+        self.filter("")
+
+    def _show(self):
+        self._stale = False
+        exclude = (self.exclude,) if self.exclude else ()
+        visible = self.catalog.search(self.query, self.limit, exclude)
+        if visible != self.visible:
+            self.visible = visible
+            self._visible_set = set(visible)
+            self.combobox["values"] = visible
+
+    def _on_key(self, event):
+        if getattr(event, "keysym", None) not in NAVIGATION_KEYS:
+            self.filter(self.variable.get())
+
+    def _on_return(self, event=None):
+        if self.visible and self.variable.get() not in self.catalog:
+            self.variable.set(self.visible[0])
+        self.combobox.event_generate("<<ComboboxSelected>>")
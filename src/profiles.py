@@ -0,0 +1,165 @@
+import json
+import os
+import traceback
+
+LAST_PROFILE = "Last session"
+FORMAT_VERSION = 1
+
+
+def config_dir():
+    base = os.environ.get("APPDATA") or os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "volume-balancer")
+
+
+def default_path():
+    return os.path.join(config_dir(), "profiles.json")
+
+
+class Profile:
+    """Saved balance setup: a rule per source slot, the balance and the curve.
+
+    A rule is ``{"exe": name, "group": bool}``: the first session of the
+    executable, or all of them as a group. ``None`` leaves the slot alone.
+    """
+
+    __slots__ = ("name", "sources", "balance", "curve")
+
+    def __init__(self, name, sources=(None, None), balance=0.0, curve="linear"):
+        self.name = name
+        self.sources = tuple(sources)
+        self.balance = balance
+        self.curve = curve
+
+    def executables(self):
+        return {rule["exe"].lower() for rule in self.sources if rule}
+
+    def to_dict(self):
+        return {"name": self.name, "sources": list(self.sources), "balance": self.balance, "curve": self.curve}
+
+    @classmethod
+    def from_dict(cls, data):
+        sources = [
+            {"exe": str(rule["exe"]), "group": bool(rule.get("group", False))} if rule else None
+            for rule in data.get("sources", (None, None))
+        ]
+        if len(sources) != 2:
+            raise ValueError(f"Profile {data.get('name')!r} needs two source rules")
+        return cls(str(data["name"]), sources, min(max(float(data.get("balance", 0.0)), -1.0), 1.0), data.get("curve", "linear"))
+
+    def __repr__(self):
+        return f"Profile({self.name!r})"
+
+
+class ProfileStore:
+    """Profiles saved in one compact JSON file.
+
+    Profiles are indexed by executable name so ``match`` is a single dict
+    lookup. When several profiles name the same executable, the most
+    recently saved one wins, except that the ``LAST_PROFILE`` only matches
+    executables no named profile claims.
+
+    ``load`` skips entries it cannot read and keeps them as they were for
+    the next ``save``; a file that cannot be read at all raises, and
+    ``set_aside`` moves it out of the way before anything is saved.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        self.profiles = {}
+        self._by_exe = {}
+        self._invalid = []
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self
+
+        entries = data.get("profiles", []) if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            raise ValueError("expected an object with a list of profiles")
+
+        for entry in entries:
+            try:
+                profile = Profile.from_dict(entry)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                print(f"Skipping invalid profile in {self.path}: {e!r}")
+                self._invalid.append(entry)
+                continue
+            self.put(profile)
+        return self
+
+    def set_aside(self):
+        """Renames an unreadable profile file to ``.bad`` and returns the new path."""
+        bad = f"{self.path}.bad"
+        os.replace(self.path, bad)
+        return bad
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        profiles = [profile.to_dict() for profile in self.profiles.values()] + self._invalid
+        data = {"version": FORMAT_VERSION, "profiles": profiles}
+        temp = f"{self.path}.tmp"
+        with open(temp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp, self.path)
+
+    def get(self, name):
+        return self.profiles.get(name)
+
+    def put(self, profile):
+        self.remove(profile.name)
+        self.profiles[profile.name] = profile
+        for exe in profile.executables():
+            current = self._by_exe.get(exe)
+            if current is None or current.name == LAST_PROFILE or profile.name != LAST_PROFILE:
+                self._by_exe[exe] = profile
+
+    def remove(self, name):
+        profile = self.profiles.pop(name, None)
+        if profile is None:
+            return None
+
+        # Hand the executables back to the newest remaining profile naming them
+        for exe in profile.executables():
+            if self._by_exe.get(exe) is profile:
+                del self._by_exe[exe]
+                claims = [other for other in reversed(self.profiles.values()) if exe in other.executables()]
+                if claims:
+                    self._by_exe[exe] = min(claims, key=lambda other: other.name == LAST_PROFILE)
+        return profile
+
+    def match(self, name):
+        return self._by_exe.get(name.lower())
+
+    def __len__(self):
+        return len(self.profiles)
+
+
+class ProfileTrigger:
+    """Registry observer reporting profiles whose executable just appeared."""
+
+    def __init__(self, registry, store, on_match):
+        self._registry = registry
+        self._store = store
+        self._on_match = on_match
+
+    def add(self, key):
+        profile = self._store.match(self._registry[key].get_session_name())
+        if profile is not None:
+            self._on_match(profile)
+
+    def remove(self, key):
+        pass
+
+
+def save_last_profile(core):
+    """Stores the current setup as the ``LAST_PROFILE`` so the next launch picks it up."""
+    if core.profiles is None or core.sources == [None, None]:
+        return
+    core.profiles.put(core.capture_profile(LAST_PROFILE))
+    try:
+        core.profiles.save()
+    except OSError:
+        traceback.print_exc()
@@ -0,0 +1,142 @@
+import functools
+import threading
+import traceback
+
+from .guard import SessionUnavailableError
+
+
+class VolumeReconciler:
+    """Takes over volumes changed outside the balancer instead of overwriting them.
+
+    The volume of every balanced session is compared against its shadow,
+    the last volume the balancer put there: when the backend reports a
+    change or, for sessions the backend cannot watch, by reading them every
+    ``interval`` seconds on a background thread. That thread is only
+    started once such a session is balanced. A difference of more than
+    ``tolerance`` while no write of ours is pending means the user or the
+    application moved it. The mixer then scales the session's weight so
+    the new volume holds at the current balance, and the volume restored
+    on release is scaled along with it. Watches are set up and removed
+    through the ``SessionGuard`` on the session watcher's worker, never on
+    the dispatcher.
+    """
+
+    def __init__(self, core, interval=2.0, tolerance=0.01):
+        self.interval = interval
+        self.tolerance = tolerance
+        self.changes = 0
+
+        self._core = core
+        self._watches = {}
+        self._processes = ()
+        self._unwatched = ()
+        self._started = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        core.add_listener(self._on_core_changed)
+
+    def start(self):
+        self._started = True
+        self._start_polling()
+
+    def close(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        try:
+            self._core.watcher.submit(self._watch, ()).result(timeout)
+        except Exception:
+            traceback.print_exc()
+
+    def check(self, process, volume=None):
+        """Compares ``process`` against its shadow, reading its volume unless given.
+
+        Safe to call from any thread; a change is taken over on the
+        dispatcher. Returns whether one was found.
+        """
+        scheduler = self._core.scheduler
+        expected = process.shadow
+        if expected is None or scheduler.is_pending(process):
+            return False
+        if volume is None:
+            try:
+                volume = self._core.guard.call(process, process.read_volume)
+            except Exception:
+                return False
+            # A write that started during the read makes the reading stale
+            if process.shadow != expected or scheduler.is_pending(process):
+                return False
+        if abs(volume - expected) <= self.tolerance:
+            return False
+
+        self._core.dispatcher.post(self._accept, process, expected, volume)
+        return True
+
+    def check_all(self):
+        return sum(self.check(process) for process in self._processes)
+
+    def _accept(self, process, expected, volume):
+        core = self._core
+        if process not in core.mixer or process.shadow != expected or core.scheduler.is_pending(process):
+            return
+        process.rebase(volume)
+        core.mixer.rebase(process, volume)
+        core.scheduler.rebase(process, volume)
+        self.changes += 1
+
+    def _watch(self, processes):
+        # Runs on the watcher's worker, one call at a time and in the order they were submitted
+        guard = self._core.guard
+        watches = {}
+        for process in processes:
+            session = process.get_session()
+            # A session that moved to another device is watched anew
+            if process in self._watches and self._watches[process][0] is session:
+                watches[process] = self._watches.pop(process)
+                continue
+            try:
+                unsubscribe = guard.call(
+                    process, self._core.backend.watch_volume,
+                    session, functools.partial(self.check, process))
+            except Exception:
+                # Polling still covers sessions that cannot be watched
+                unsubscribe = None
+            watches[process] = (session, unsubscribe)
+
+        for process, (session, unsubscribe) in self._watches.items():
+            if unsubscribe is not None:
+                try:
+                    guard.call(process, unsubscribe)
+                except SessionUnavailableError:
+                    # Its notifications are ignored once it is no longer mixed
+                    pass
+                except Exception:
+                    traceback.print_exc()
+
+        self._watches = watches
+        # The polling thread only ever sees a whole tuple
+        self._processes = tuple(processes)
+        self._unwatched = tuple(process for process, (session, unsubscribe) in watches.items() if unsubscribe is None)
+        self._start_polling()
+
+    def _start_polling(self):
+        with self._lock:
+            if self._started and self.interval and self._unwatched and self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name="volume-reconciler", daemon=True)
+                self._thread.start()
+
+    def _on_core_changed(self, event):
+        if event in ("sources", "sessions") and not self._stop.is_set():
+            self._core.watcher.submit(self._watch, tuple(self._core.mixer.processes))
+
+    def _run(self):
+        backend = self._core.backend
+        backend.thread_init()
+        try:
+            while not self._stop.wait(self.interval):
+                for process in self._unwatched:
+                    self.check(process)
+        finally:
+            backend.thread_exit()
@@ -0,0 +1,236 @@
+import threading
+import traceback
+
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .session import AudioProcess
+
+
+class SessionDiff:
+    """Changes between two enumerations, keyed by PID."""
+
+    __slots__ = ("added", "removed", "changed")
+
+    def __init__(self, added=None, removed=None, changed=None):
+        self.added = added or {}
+        self.removed = removed or []
+        self.changed = changed or {}
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return f"SessionDiff(added={list(self.added)}, removed={self.removed}, changed={list(self.changed)})"
+
+
+class SessionEnumerator:
+    """Enumerates backend sessions and diffs them against the previous scan.
+
+    Meant to run on a worker thread: ``AudioProcess`` records are only built
+    for new or changed PIDs, so sessions that are still alive keep their
+    cached metadata and captured initial volume. Pushed session events go through
+    ``session_added`` / ``session_removed`` so scans and notifications share
+    the same view of known sessions; a removal pushed while a scan is
+    listing is not undone by that scan's stale listing.
+
+    Backends with several endpoints have each one listed concurrently on a
+    small thread pool. A scan waits at most ``endpoint_timeout`` seconds;
+    an endpoint that has not answered by then contributes its previous
+    listing and is not asked again until it does. A PID playing on several
+    endpoints is taken from the first one listed, and a PID that moves to
+    another device shows up as changed.
+    """
+
+    def __init__(self, backend, endpoint_timeout=1.0, max_workers=4):
+        self.endpoint_timeout = endpoint_timeout
+        self.max_workers = max_workers
+
+        self._backend = backend
+        self._known = {}
+        self._devices = {}
+        self._removed = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._listings = {}
+        self._listed = {}
+
+    def scan(self):
+        with self._lock:
+            self._removed = set()
+        endpoints = self._backend.list_endpoints()
+        if endpoints == [None]:
+            sessions = self._backend.list_sessions()
+        else:
+            sessions = self._list_endpoints(endpoints)
+        with self._lock:
+            return self._diff(sessions)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def session_added(self, session):
+        backend = self._backend
+        pid = backend.get_session_pid(session)
+        name = backend.get_session_name(session)
+        device = backend.get_session_device(session)
+
+        with self._lock:
+            self._removed.discard(pid)
+            known = self._known.get(pid)
+            if known == name and not self._moved(pid, device):
+                return SessionDiff()
+
+            self._known[pid] = name
+            self._devices[pid] = device
+            process = AudioProcess(session, backend, name, pid, device)
+            if known is None:
+                return SessionDiff(added={pid: process})
+            return SessionDiff(changed={pid: process})
+
+    def session_removed(self, pid):
+        with self._lock:
+            self._removed.add(pid)
+            self._devices.pop(pid, None)
+            if self._known.pop(pid, None) is None:
+                return SessionDiff()
+            return SessionDiff(removed=[pid])
+
+    def _list_endpoints(self, endpoints):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, "endpoint-enum", initializer=self._backend.thread_init)
+
+        listings = {}
+        for endpoint in endpoints:
+            listing = self._listings.get(endpoint)
+            if listing is None or listing.done():
+                listing = self._executor.submit(self._backend.list_sessions, endpoint)
+            listings[endpoint] = listing
+        self._listings = listings
+        wait(listings.values(), self.endpoint_timeout)
+
+        sessions = []
+        for endpoint, listing in listings.items():
+            if listing.done():
+                try:
+                    self._listed[endpoint] = listing.result()
+                except Exception:
+                    name = self._backend.get_endpoint_name(endpoint)
+                    print(f"Error listing sessions on {name}:", traceback.format_exc())
+                    self._listed[endpoint] = []
+            sessions.extend(self._listed.get(endpoint, ()))
+
+        for endpoint in list(self._listed):
+            if endpoint not in listings:
+                del self._listed[endpoint]
+        return sessions
+
+    def _moved(self, pid, device):
+        known = self._devices.get(pid)
+        return known is not None and device is not None and known != device
+
+    def _diff(self, sessions):
+        backend = self._backend
+        known = self._known
+        current = {}
+        devices = {}
+        diff = SessionDiff()
+
+        for session in sessions:
+            pid = backend.get_session_pid(session)
+            # Sessions reported gone since the listing started are stale in it
+            if pid in current or pid in self._removed:
+                continue
+
+            # Names are only looked up for PIDs not seen before; a reused PID
+            # shows up as removed in the scan between exit and reuse
+            name = known.get(pid)
+            device = backend.get_session_device(session)
+            if name is None:
+                name = backend.get_session_name(session)
+                diff.added[pid] = AudioProcess(session, backend, name, pid, device)
+            elif self._moved(pid, device):
+                diff.changed[pid] = AudioProcess(session, backend, name, pid, device)
+            current[pid] = name
+            devices[pid] = device if device is not None else self._devices.get(pid)
+
+        diff.removed = [pid for pid in known if pid not in current]
+        self._known = current
+        self._devices = devices
+        return diff
+
+
+class SessionRegistry:
+    """Sessions known to the UI, addressable by PID and by readable key.
+
+    Attached observers, such as a ``SessionCatalog``, get ``add(key)`` and
+    ``remove(key)`` calls for every key an applied diff touches. Sessions
+    that leave the registry are handed to ``on_evict`` and then release
+    their backend handles, so nothing keeps an exited session alive. A
+    session that moved to another device keeps its ``AudioProcess``, so its
+    slot and initial volume stay as they were.
+    """
+
+    def __init__(self, on_evict=None):
+        self._by_pid = {}
+        self._by_key = {}
+        self._observers = []
+        self._on_evict = on_evict
+
+    def attach(self, observer):
+        for key in self._by_key:
+            observer.add(key)
+        self._observers.append(observer)
+
+    def apply(self, diff):
+        for pid in diff.removed:
+            self._remove(pid)
+
+        for pid, changed in diff.changed.items():
+            process = self._by_pid.get(pid)
+            if process is not None and process.get_session_name() == changed.get_session_name():
+                process.move(changed.get_session(), changed.get_device())
+            else:
+                # A reused PID is a different session altogether
+                self._remove(pid)
+                self._add(pid, changed)
+
+        for pid, process in diff.added.items():
+            self._remove(pid)
+            self._add(pid, process)
+
+    def get_by_pid(self, pid):
+        return self._by_pid.get(pid)
+
+    def keys(self):
+        return self._by_key.keys()
+
+    def values(self):
+        return self._by_key.values()
+
+    def _add(self, pid, process):
+        key = process.get_readable_process_key()
+        self._by_pid[pid] = process
+        self._by_key[key] = process
+        for observer in self._observers:
+            observer.add(key)
+
+    def _remove(self, pid):
+        process = self._by_pid.pop(pid, None)
+        if process is not None:
+            key = process.get_readable_process_key()
+            del self._by_key[key]
+            for observer in self._observers:
+                observer.remove(key)
+            if self._on_evict is not None:
+                self._on_evict(process)
+            process.release()
+
+    def __getitem__(self, key):
+        return self._by_key[key]
+
+    def __contains__(self, key):
+        return key in self._by_key
+
+    def __len__(self):
+        return len(self._by_key)
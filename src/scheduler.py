@@ -0,0 +1,239 @@
+import contextlib
+import threading
+import time
+import traceback
+
+from concurrent.futures import wait
+
+from .guard import SessionUnavailableError
+
+# Pending value that restores a process to its initial volume
+RESET = None
+
+
+class VolumeWriteScheduler:
+    """Applies volume writes on a background thread.
+
+    Pending writes are kept per process so only the latest requested volume
+    is ever written. Requests within ``epsilon`` of the last written volume,
+    or of the one being written, are dropped, and write batches are spaced
+    at least ``1 / max_rate`` seconds apart. Writes submitted inside ``hold()`` are released together
+    when the outermost hold ends. With ``metrics`` set, every finished batch
+    completes a pending hotkey latency measurement; with ``journal`` set,
+    it is recorded in the volume journal. ``submitted`` counts the writes
+    queued so far.
+
+    With a ``SessionGuard``, the writes of a batch run concurrently on its
+    pool and the batch waits at most the guard's timeout, so one session
+    that hangs or keeps failing does not hold up the others. Writes the
+    guard turns away are kept and retried once the session takes calls
+    again, unless a newer request replaces them.
+    """
+
+    def __init__(self, backend, epsilon=0.005, max_rate=60, metrics=None, guard=None):
+        self.epsilon = epsilon
+        self.min_interval = 1.0 / max_rate if max_rate else 0.0
+
+        self._backend = backend
+        self._metrics = metrics
+        self._guard = guard
+        self.journal = None
+        self.submitted = 0
+        self._pending = {}
+        self._deferred = {}
+        self._written = {}
+        self._batch = {}
+        self._busy = False
+        self._held = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="volume-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, process, volume):
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Volume write scheduler is closed")
+
+            last = self._latest(process)
+            if last is not None and abs(last - volume) <= self.epsilon:
+                self._pending.pop(process, None)
+                self._deferred.pop(process, None)
+                return
+
+            self._pending[process] = volume
+            self._deferred.pop(process, None)
+            self.submitted += 1
+            self._condition.notify()
+
+    def reset(self, process):
+        """Restores ``process`` to its initial volume, if anything was written to it."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Volume write scheduler is closed")
+
+            last = self._latest(process)
+            if last is not None and process.is_active() and abs(last - process.get_initial_volume()) <= self.epsilon:
+                self._pending.pop(process, None)
+                self._deferred.pop(process, None)
+                return
+
+            self._pending[process] = RESET
+            self._deferred.pop(process, None)
+            self.submitted += 1
+            self._condition.notify()
+
+    @contextlib.contextmanager
+    def hold(self):
+        with self._condition:
+            self._held += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._held -= 1
+                self._condition.notify()
+
+    def last_written(self, process):
+        with self._condition:
+            return self._written.get(process)
+
+    def is_pending(self, process):
+        """Whether a write to ``process`` is queued, in flight or waiting to be retried."""
+        with self._condition:
+            return process in self._pending or process in self._batch or process in self._deferred
+
+    def rebase(self, process, volume):
+        # Somebody else set the volume, so that is the one later requests are compared against
+        with self._condition:
+            if process in self._written:
+                self._written[process] = volume
+
+    def forget(self, process):
+        with self._condition:
+            self._pending.pop(process, None)
+            self._deferred.pop(process, None)
+            self._written.pop(process, None)
+
+    def flush(self, timeout=None):
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout=None):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            self._backend.thread_init()
+        except Exception:
+            # Writes may still work, and the ones that do not are reported per call
+            print("Volume writer could not initialise the audio backend:", traceback.format_exc())
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: (self._pending and not self._held) or self._closed, self._retry_delay())
+                    batch = self._take_deferred()
+                    if not self._held or self._closed:
+                        batch.update(self._pending)
+                        self._pending = {}
+                    if not batch:
+                        if self._closed:
+                            return
+                        continue
+                    self._batch = batch
+                    self._busy = True
+
+                started = time.perf_counter()
+                written = self._write(batch)
+                if self._metrics is not None:
+                    self._metrics.complete_input()
+                if self.journal is not None and written:
+                    self.journal.record(written)
+
+                with self._condition:
+                    self._written.update(written)
+                    self._batch = {}
+                    self._busy = False
+                    self._condition.notify_all()
+
+                remaining = self.min_interval - (time.perf_counter() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+        finally:
+            self._backend.thread_exit()
+
+    def _write(self, batch):
+        if self._guard is None:
+            written = {}
+            for process, volume in batch.items():
+                try:
+                    volume = self._write_one(process, volume)
+                except Exception:
+                    traceback.print_exc()
+                    continue
+                if volume is not None:
+                    written[process] = volume
+            return written
+
+        guard = self._guard
+        futures = {}
+        deferred = {}
+        for process, volume in batch.items():
+            try:
+                futures[process] = guard.submit(process, self._write_one, process, volume)
+            except SessionUnavailableError:
+                deferred[process] = volume
+        if futures:
+            wait(futures.values(), guard.timeout)
+
+        written = {}
+        for process, future in futures.items():
+            if not future.done():
+                guard.expire(process, future)
+                deferred[process] = batch[process]
+            elif future.exception() is None:
+                if future.result() is not None:
+                    written[process] = future.result()
+
+        if deferred:
+            with self._condition:
+                for process, volume in deferred.items():
+                    # A request submitted meanwhile supersedes the one that could not be written
+                    if process not in self._pending:
+                        self._deferred[process] = volume
+        return written
+
+    @staticmethod
+    def _write_one(process, volume):
+        if volume is RESET:
+            if not process.is_active():
+                # Nothing was ever written, so there is nothing to restore
+                return None
+            volume = process.get_initial_volume()
+        process.write_volume(volume)
+        return volume
+
+    def _latest(self, process):
+        # A write in flight is what the session will be at, not the one before it
+        if process in self._batch:
+            volume = self._batch[process]
+            if volume is not RESET:
+                return volume
+            return process.get_initial_volume() if process.is_active() else None
+        return self._written.get(process)
+
+    def _retry_delay(self):
+        if not self._deferred:
+            return None
+        return min(self._guard.retry_in(process) for process in self._deferred)
+
+    def _take_deferred(self):
+        if not self._deferred:
+            return {}
+        due = {process: volume for process, volume in self._deferred.items() if self._guard.retry_in(process) == 0.0}
+        for process in due:
+            del self._deferred[process]
+        return due
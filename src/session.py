@@ -0,0 +1,121 @@
+import traceback
+
+from .backends.base import SessionExpiredError
+
+
+class AudioProcess:
+    """Compact record of one audio session.
+
+    Name, PID and output device are looked up once per session lifetime.
+    The volume interface is only opened, and the initial volume only
+    captured, when the process is activated for balancing. The last volume known to be on
+    the session is kept as a shadow, so reading it back costs no backend
+    call; ``read_volume`` asks the backend. A session that moves to another
+    device keeps its record and initial volume; its volume interface is
+    reopened on the new session by the next call that needs it.
+    """
+
+    __slots__ = ("_session", "_backend", "_name", "_pid", "_volume", "_initial_vol", "_shadow", "_device")
+
+    def __init__(self, session, backend, name=None, pid=None, device=None):
+        self._session = session
+        self._backend = backend
+        self._name = name if name is not None else backend.get_session_name(session)
+        self._pid = pid if pid is not None else backend.get_session_pid(session)
+        self._volume = None
+        self._initial_vol = None
+        self._shadow = None
+        self._device = device
+
+    def get_session(self):
+        return self._session
+
+    def is_active(self):
+        return self._initial_vol is not None and self._session is not None
+
+    def activate(self):
+        if self._volume is None:
+            if self._session is None:
+                raise SessionExpiredError(f"Session of PID {self._pid} was released")
+            volume = self._backend.open_volume(self._session)
+            if self._initial_vol is None:
+                self._initial_vol = self._shadow = self._backend.get_volume(volume)
+            self._volume = volume
+
+    def get_initial_volume(self):
+        if self._initial_vol is None:
+            self.activate()
+        return self._initial_vol
+
+    def get_volume(self):
+        self.activate()
+        if self._shadow is None:
+            self._shadow = self._backend.get_volume(self._volume)
+        return self._shadow
+
+    def read_volume(self):
+        self.activate()
+        return self._backend.get_volume(self._volume)
+
+    @property
+    def shadow(self):
+        return self._shadow
+
+    def write_volume(self, volume):
+        self.activate()
+        # Set before the write so a concurrent read never mistakes it for someone else's change
+        self._shadow = volume
+        try:
+            self._backend.set_volume(self._volume, volume)
+        except Exception:
+            self._shadow = None
+            raise
+
+    def set_volume(self, volume):
+        try:
+            self.write_volume(volume)
+            return True
+        except Exception:
+            traceback.print_exc()
+            return False
+
+    def rebase(self, volume):
+        """Accepts a volume somebody else set, scaling the initial volume along with it."""
+        expected = self._shadow
+        if expected:
+            self._initial_vol = min(self._initial_vol * volume / expected, 1.0)
+        else:
+            self._initial_vol = volume
+        self._shadow = volume
+
+    def move(self, session, device):
+        """Follows the session to another output device."""
+        self._device = device
+        if session is not self._session:
+            self._session = session
+            self._volume = None
+            self._shadow = None
+
+    def release(self):
+        """Drops the backend handles once the session has gone away."""
+        self._session = None
+        self._volume = None
+
+    def is_released(self):
+        return self._session is None
+
+    def reset_volume(self):
+        if self.is_active():
+            self.set_volume(self._initial_vol)
+
+    def get_session_name(self):
+        return self._name
+
+    def get_session_pid(self):
+        return self._pid
+
+    def get_device(self):
+        return self._device
+
+    def get_readable_process_key(self):
+        return f"{self._name} (PID: {self._pid})"
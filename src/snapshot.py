@@ -0,0 +1,54 @@
+import json
+import os
+
+from .profiles import Profile, config_dir
+
+FORMAT_VERSION = 1
+
+
+def default_path():
+    return os.path.join(config_dir(), "snapshot.json")
+
+
+class StartupSnapshot:
+    """What the window showed when it was closed: the session keys and a
+    profile holding the selected sources, balance and curve.
+
+    The next launch draws the window from it before the backend has listed
+    anything, then lets the first live scan correct it.
+    """
+
+    __slots__ = ("sessions", "profile")
+
+    def __init__(self, sessions=(), profile=None):
+        self.sessions = list(sessions)
+        self.profile = profile if profile is not None else Profile("")
+
+    @classmethod
+    def capture(cls, core):
+        return cls(core.audio_sessions.keys(), core.capture_profile(""))
+
+    @classmethod
+    def load(cls, path=None):
+        """Reads the snapshot at ``path``, or returns ``None`` if there is no usable one."""
+        path = path or default_path()
+        try:
+            with open(path, "rb") as f:
+                data = json.load(f)
+            if data.get("version") != FORMAT_VERSION:
+                return None
+            return cls([str(key) for key in data["sessions"]], Profile.from_dict(data["profile"]))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable snapshot {path}: {e}")
+            return None
+
+    def save(self, path=None):
+        path = path or default_path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {"version": FORMAT_VERSION, "sessions": self.sessions, "profile": self.profile.to_dict()}
+        temp = f"{path}.tmp"
+        with open(temp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp, path)
@@ -0,0 +1,207 @@
+import bisect
+import struct
+import sys
+import threading
+import time
+
+from array import array
+
+from .metrics import Histogram
+
+MAGIC = b"VBTL"
+FORMAT_VERSION = 1
+
+# magic, version, point count; followed by the offsets (float64) and the positions (float32)
+HEADER = struct.Struct("<4sHxxI")
+
+
+class Timeline:
+    """Balance positions with their offsets in seconds, kept in two parallel arrays."""
+
+    __slots__ = ("times", "values")
+
+    def __init__(self):
+        self.times = array("d")
+        self.values = array("f")
+
+    def append(self, offset, value):
+        self.times.append(offset)
+        self.values.append(value)
+
+    @property
+    def duration(self):
+        return self.times[-1] if self.times else 0.0
+
+    def __len__(self):
+        return len(self.times)
+
+    def save(self, path):
+        times, values = self.times, self.values
+        if sys.byteorder == "big":
+            times, values = array("d", times), array("f", values)
+            times.byteswap()
+            values.byteswap()
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(times)))
+            times.tofile(f)
+            values.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        timeline = cls()
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is not a balance timeline")
+            magic, version, count = HEADER.unpack(header)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a balance timeline")
+            try:
+                timeline.times.fromfile(f, count)
+                timeline.values.fromfile(f, count)
+            except EOFError:
+                raise ValueError(f"{path} is truncated") from None
+        if sys.byteorder == "big":
+            timeline.times.byteswap()
+            timeline.values.byteswap()
+        return timeline
+
+
+class TimelineRecorder:
+    """Records every balance change of a core, timed from ``start``."""
+
+    def __init__(self, core):
+        self.timeline = Timeline()
+
+        self._core = core
+        self._started = None
+
+        core.add_listener(self._on_core_changed)
+
+    @property
+    def recording(self):
+        return self._started is not None
+
+    def start(self):
+        self.timeline = Timeline()
+        self._started = time.perf_counter()
+        self.timeline.append(0.0, self._core.balance)
+
+    def stop(self):
+        self._started = None
+        return self.timeline
+
+    def _on_core_changed(self, event):
+        if event == "balance" and self._started is not None:
+            self.timeline.append(time.perf_counter() - self._started, self._core.balance)
+
+
+class TimelinePlayer:
+    """Plays a ``Timeline`` back into a core from its own thread.
+
+    Every point is due at its offset from the start of playback, so a late
+    wake-up never pushes the points after it back. The thread sleeps until
+    ``spin`` seconds before a point and busy-waits the rest, since sleeps
+    alone are only accurate to a few milliseconds. Points already overtaken
+    by a later one when the thread wakes are dropped, and the dispatcher
+    only ever holds one pending position: a newer point replaces it rather
+    than queueing behind it. How late the thread woke for each point is
+    kept in ``jitter`` and how late it reached the core in ``delay``.
+    """
+
+    def __init__(self, core, timeline, spin=0.001):
+        self.timeline = timeline
+        self.spin = spin
+        self.dropped = 0
+
+        metrics = core.metrics
+        self.jitter = metrics.histogram("playback_jitter") if metrics is not None else Histogram()
+        self.delay = metrics.histogram("playback_delay") if metrics is not None else Histogram()
+
+        self._core = core
+        self._lock = threading.Lock()
+        self._pending = None
+        self._stop = threading.Event()
+        self._finished = threading.Event()
+        self._thread = None
+
+    @property
+    def playing(self):
+        return self._thread is not None and not self._finished.is_set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="timeline-player", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    def close(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def summary(self):
+        jitter = self.jitter.snapshot()
+        return (f"Played {len(self.timeline) - self.dropped} of {len(self.timeline)} balance points, "
+                f"timing jitter p50 {jitter['p50_ms']:.3f} ms, p99 {jitter['p99_ms']:.3f} ms, max {jitter['max_ms']:.3f} ms")
+
+    def stats(self):
+        return {
+            "points": len(self.timeline),
+            "dropped": self.dropped,
+            "jitter": self.jitter.snapshot(),
+            "delay": self.delay.snapshot(),
+        }
+
+    def _run(self):
+        times, values = self.timeline.times, self.timeline.values
+        started = time.perf_counter()
+        index = 0
+        try:
+            while index < len(times):
+                due = started + times[index]
+                remaining = due - time.perf_counter()
+                if remaining > self.spin and self._stop.wait(remaining - self.spin):
+                    return
+                while time.perf_counter() < due:
+                    pass
+                if self._stop.is_set():
+                    return
+
+                now = time.perf_counter()
+                self.jitter.observe(now - due)
+                # Only the newest point that is due gets applied
+                latest = max(bisect.bisect_right(times, now - started, index) - 1, index)
+                self.dropped += latest - index
+                self._submit(values[latest], started + times[latest])
+                index = latest + 1
+        finally:
+            self._finished.set()
+
+    def _submit(self, value, due):
+        with self._lock:
+            waiting = self._pending is not None
+            self._pending = (value, due)
+        if waiting:
+            self.dropped += 1
+        else:
+            self._core.dispatcher.post(self._apply)
+
+    def _apply(self):
+        with self._lock:
+            value, due = self._pending
+            self._pending = None
+        self.delay.observe(max(time.perf_counter() - due, 0.0))
+        self._core.set_balance(value)
+
+
+def save_recording(core, path):
+    """Stops the core's recording and writes it to ``path``, reporting what was recorded."""
+    timeline = core.stop_recording()
+    try:
+        timeline.save(path)
+    except OSError as e:
+        print(f"Cannot write timeline {path}: {e}")
+        return
+    print(f"Recorded {len(timeline)} balance changes over {timeline.duration:.1f} s to {path}")
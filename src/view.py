@@ -0,0 +1,74 @@
+import time
+
+
+class RenderQueue:
+    """Coalesces widget updates into one flush per frame.
+
+    ``set(widget, **options)`` records the options a widget should have;
+    a flush passes only those that differ from what was last rendered to
+    ``config``. ``call(key, function, *args)`` defers any other update,
+    keeping only the latest one per key. Flushes run from ``after_idle``,
+    and at most once every ``frame`` seconds, so a burst of model changes
+    costs a single redraw.
+    """
+
+    def __init__(self, root, frame=1 / 60):
+        self.frame = frame
+
+        self._root = root
+        self._options = {}
+        self._calls = {}
+        self._rendered = {}
+        self._handle = None
+        self._last_flush = 0.0
+
+    def set(self, widget, **options):
+        self._options.setdefault(widget, {}).update(options)
+        self._schedule()
+
+    def call(self, key, function, *args):
+        self._calls[key] = (function, args)
+        self._schedule()
+
+    def rendered(self, widget, option):
+        return self._rendered.get(widget, {}).get(option)
+
+    def flush(self):
+        if self._handle is not None:
+            self._root.after_cancel(self._handle)
+            self._handle = None
+        self._last_flush = time.perf_counter()
+
+        # Deferred calls go first, since they may set widget options themselves
+        while self._calls:
+            calls, self._calls = self._calls, {}
+            for function, args in calls.values():
+                function(*args)
+
+        options, self._options = self._options, {}
+        for widget, wanted in options.items():
+            rendered = self._rendered.setdefault(widget, {})
+            changed = {name: value for name, value in wanted.items() if rendered.get(name, self) != value}
+            if changed:
+                widget.config(**changed)
+                rendered.update(changed)
+
+    def close(self):
+        if self._handle is not None:
+            self._root.after_cancel(self._handle)
+            self._handle = None
+        self._options.clear()
+        self._calls.clear()
+
+    def _schedule(self):
+        if self._handle is not None:
+            return
+        delay = self.frame - (time.perf_counter() - self._last_flush)
+        if delay > 0:
+            self._handle = self._root.after(int(delay * 1000) + 1, self._on_frame)
+        else:
+            self._handle = self._root.after_idle(self._on_frame)
+
+    def _on_frame(self):
+        self._handle = None
+        self.flush()
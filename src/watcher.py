@@ -0,0 +1,130 @@
+import queue
+import traceback
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .registry import SessionDiff, SessionEnumerator
+
+
+class SessionWatcher:
+    """Keeps a ``SessionRegistry`` in sync with the backend.
+
+    Backends that push session notifications feed the registry directly and
+    are only re-enumerated every ``reconcile_interval`` seconds to catch
+    missed events. Other backends are polled every ``poll_interval``
+    seconds. Scans run on a worker thread; the resulting diffs are applied
+    in order on the dispatcher thread, followed by a single ``on_change``.
+    """
+
+    def __init__(self, backend, dispatcher, registry, on_change, poll_interval=2.0, reconcile_interval=15.0):
+        self.poll_interval = poll_interval
+        self.reconcile_interval = reconcile_interval
+        self.enumerator = SessionEnumerator(backend)
+
+        self._backend = backend
+        self._dispatcher = dispatcher
+        self._registry = registry
+        self._on_change = on_change
+        self._executor = ThreadPoolExecutor(1, "session-enum", initializer=backend.thread_init)
+        self._diffs = queue.SimpleQueue()
+        self._scan = None
+        self._timer = None
+        self._unsubscribe = None
+        self._closed = False
+
+    @property
+    def is_push(self):
+        return self._unsubscribe is not None
+
+    def start(self):
+        # Subscribing happens on the worker so COM callbacks join its apartment
+        self._executor.submit(self._subscribe)
+        self.refresh()
+        self._schedule()
+
+    def refresh(self, wait=False):
+        # A scan that has not started yet already covers this request
+        if self._scan is None or self._scan.running() or self._scan.done():
+            self._scan = self._executor.submit(self._scan_sessions)
+
+        if wait:
+            self._scan.result()
+            self.apply_pending()
+        return self._scan
+
+    def submit(self, function, *args):
+        """Runs ``function`` on the enumeration worker, in order with the scans."""
+        return self._executor.submit(function, *args)
+
+    def apply_pending(self):
+        changed = False
+        while True:
+            try:
+                diff = self._diffs.get_nowait()
+            except queue.Empty:
+                break
+            if diff:
+                self._registry.apply(diff)
+                changed = True
+
+        if changed:
+            self._on_change()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._timer is not None:
+            self._dispatcher.cancel(self._timer)
+            self._timer = None
+        if self._scan is not None:
+            self._scan.cancel()
+        # Cancelling futures on shutdown would drop the unsubscribe along with the scans
+        self._executor.submit(self._unsubscribe_all)
+        self._executor.shutdown(wait=False)
+        self.enumerator.close()
+
+    def _subscribe(self):
+        try:
+            self._unsubscribe = self._backend.watch_sessions(self._on_session_added, self._on_session_removed)
+        except Exception:
+            print("Session notifications unavailable, polling instead:", traceback.format_exc())
+
+    def _unsubscribe_all(self):
+        # Runs after _subscribe on the worker, so a subscription still being set up is covered too
+        if self._unsubscribe is not None:
+            try:
+                self._unsubscribe()
+            except Exception:
+                traceback.print_exc()
+            self._unsubscribe = None
+
+    def _schedule(self):
+        interval = self.reconcile_interval if self.is_push else self.poll_interval
+        self._timer = self._dispatcher.call_later(interval, self._on_timer)
+
+    def _on_timer(self):
+        self.refresh()
+        self._schedule()
+
+    def _scan_sessions(self):
+        try:
+            diff = self.enumerator.scan()
+        except Exception:
+            print("Error getting audio processes:", traceback.format_exc())
+            diff = SessionDiff()
+        self._push(diff)
+
+    def _on_session_added(self, session):
+        try:
+            self._push(self.enumerator.session_added(session))
+        except Exception:
+            traceback.print_exc()
+
+    def _on_session_removed(self, pid):
+        self._push(self.enumerator.session_removed(pid))
+
+    def _push(self, diff):
+        if diff:
+            self._diffs.put(diff)
+            self._dispatcher.post(self.apply_pending)
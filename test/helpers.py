@@ -0,0 +1,27 @@
+from src.backends import create_backend
+from src.core import BalancerCore
+from src.dispatch import LoopDispatcher
+
+
+def make_core(*sessions, start=False, **options):
+    """Builds a core on a simulated backend holding only ``sessions`` and scans them once.
+
+    Each session is an executable name or a tuple of ``add_session``
+    arguments, e.g. ``("game.exe", 5, 0.3)``; their handles are in
+    ``backend.sessions`` in the same order. Options go to ``BalancerCore``,
+    with fades off unless ``fade_duration`` is given. Returns the backend
+    and the core; the core's ``LoopDispatcher`` is ``core.dispatcher``.
+    """
+    backend = create_backend("simulated", session_count=0)
+    for session in sessions:
+        if isinstance(session, str):
+            backend.add_session(session)
+        else:
+            backend.add_session(*session)
+
+    options.setdefault("fade_duration", 0)
+    core = BalancerCore(backend, LoopDispatcher(), **options)
+    if start:
+        core.start()
+    core.refresh(wait=True)
+    return backend, core
@@ -0,0 +1,65 @@
+import time
+import unittest
+
+from src.backends import create_backend, SessionExpiredError
+from src.session import AudioProcess
+
+class SimulatedBackendTest(unittest.TestCase):
+    def test_enumeration(self):
+        backend = create_backend("simulated", session_count=5000, seed=1)
+        sessions = backend.list_sessions()
+
+        self.assertEqual(len(sessions), 5000)
+        self.assertEqual(len({backend.get_session_pid(s) for s in sessions}), 5000)
+        self.assertIn(backend.get_session_name(sessions[0]), backend.names)
+
+    def test_volume_roundtrip(self):
+        backend = create_backend("simulated", session_count=1)
+        process = AudioProcess(backend.list_sessions()[0], backend)
+
+        process.set_volume(0.25)
+        self.assertEqual(process.get_volume(), 0.25)
+        self.assertEqual(process.get_initial_volume(), 1.0)
+
+        process.reset_volume()
+        self.assertEqual(process.get_volume(), 1.0)
+
+    def test_churn(self):
+        backend = create_backend("simulated", session_count=100, churn=0.1, seed=1)
+        before = {s.pid for s in backend.list_sessions()}
+        after = {s.pid for s in backend.list_sessions()}
+
+        self.assertEqual(len(after), 100)
+        self.assertEqual(len(before - after), 10)
+
+    def test_expired_session(self):
+        backend = create_backend("simulated", session_count=1)
+        session = backend.list_sessions()[0]
+        backend.remove_session(session.pid)
+
+        with self.assertRaises(SessionExpiredError):
+            backend.set_volume(backend.open_volume(session), 0.5)
+
+    def test_latency(self):
+        backend = create_backend("simulated", session_count=1, call_latency=0.01)
+        session = backend.list_sessions()[0]
+
+        start = time.perf_counter()
+        backend.get_volume(backend.open_volume(session))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.01)
+        self.assertEqual(backend.call_counts["get_volume"], 1)
+
+    def test_lazy_backend_is_created_on_first_use(self):
+        backend = create_backend("simulated", lazy=True, session_count=3)
+        self.assertEqual(backend.name, "simulated")
+        self.assertIsNone(backend._backend)
+
+        self.assertEqual(len(backend.list_sessions()), 3)
+        self.assertEqual(backend.backend.call_counts["list_sessions"], 1)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_backend("alsa")
+
+if __name__ == "__main__":
+    unittest.main()
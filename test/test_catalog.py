@@ -0,0 +1,101 @@
+import unittest
+
+from src.catalog import SessionCatalog
+from src.picker import SessionPicker
+
+KEYS = [
+    "chrome.exe (PID: 11)",
+    "chrome.exe (PID: 12)",
+    "Discord.exe (PID: 20)",
+    "game.exe (PID: 30)",
+    "spotify.exe (PID: 40)",
+]
+
+class SessionCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = SessionCatalog(KEYS)
+
+    def test_prefix_before_substring(self):
+        self.assertEqual(self.catalog.search("d")[0], "Discord.exe (PID: 20)")
+        self.assertEqual(self.catalog.search("dis"), ["Discord.exe (PID: 20)"])
+        self.assertEqual(self.catalog.search("s")[0], "spotify.exe (PID: 40)")
+        self.assertEqual(self.catalog.search("cord"), ["Discord.exe (PID: 20)"])
+        self.assertEqual(self.catalog.search("PID: 1"), KEYS[:2])
+        self.assertEqual(self.catalog.search("xyz"), [])
+
+    def test_limit_and_exclude(self):
+        self.assertEqual(self.catalog.search("", limit=2), KEYS[:2])
+        self.assertEqual(self.catalog.search("chrome", exclude={KEYS[0]}), [KEYS[1]])
+        self.assertEqual(self.catalog.search(".exe", limit=3, exclude={KEYS[1]}), [KEYS[0], KEYS[2], KEYS[3]])
+
+    def test_incremental_updates(self):
+        self.catalog.take_changes()
+        self.catalog.remove(KEYS[0])
+        self.catalog.add("chromium.exe (PID: 50)")
+
+        self.assertEqual(self.catalog.search("chrom"), [KEYS[1], "chromium.exe (PID: 50)"])
+        self.assertEqual(self.catalog.search("mium"), ["chromium.exe (PID: 50)"])
+        self.assertEqual(self.catalog.take_changes(), {KEYS[0], "chromium.exe (PID: 50)"})
+        self.assertEqual(len(self.catalog), 5)
+        self.assertNotIn(KEYS[0], self.catalog)
+
+class FakeCombobox(dict):
+    def config(self, **options):
+        self.update(options)
+
+    def bind(self, sequence, callback):
+        self[sequence] = callback
+
+    def event_generate(self, sequence):
+        self.setdefault("events", []).append(sequence)
+
+    def __setitem__(self, key, value):
+        if key == "values":
+            self["configured"] = self.get("configured", 0) + 1
+        super().__setitem__(key, value)
+
+class FakeVariable:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+class SessionPickerTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = SessionCatalog(KEYS)
+        self.combobox = FakeCombobox()
+        self.variable = FakeVariable()
+        self.picker = SessionPicker(self.combobox, self.variable, self.catalog, limit=3)
+        self.picker.update()
+
+    def test_filter_and_limit(self):
+        self.assertEqual(self.combobox["values"], KEYS[:3])
+
+        self.variable.set("spot")
+        self.combobox["<KeyRelease>"](None)
+        self.assertEqual(self.combobox["values"], ["spotify.exe (PID: 40)"])
+
+        self.combobox["<Return>"]()
+        self.assertEqual(self.variable.get(), "spotify.exe (PID: 40)")
+        self.assertEqual(self.combobox["events"], ["<<ComboboxSelected>>"])
+
+    def test_only_reconfigures_when_visible_matches_change(self):
+        configured = self.combobox["configured"]
+        self.picker.update(changes=set())
+        self.catalog.add("zoom.exe (PID: 60)")
+        self.picker.update(changes=self.catalog.take_changes())
+        self.assertEqual(self.combobox["configured"], configured)
+
+        self.picker.update(exclude=KEYS[0])
+        self.assertEqual(self.combobox["values"], KEYS[1:4])
+
+        self.catalog.remove(KEYS[2])
+        self.picker.update(exclude=KEYS[0], changes=self.catalog.take_changes())
+        self.assertEqual(self.combobox["values"], [KEYS[1], KEYS[3], KEYS[4]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import threading
+import unittest
+
+from src.commands import CommandQueue
+from src.metrics import Metrics
+from test.helpers import make_core
+
+class CommandQueueTest(unittest.TestCase):
+    def setUp(self):
+        _, self.core = make_core()
+        self.dispatcher = self.core.dispatcher
+        self.fades = []
+        fade_balance = self.core.fade_balance
+        self.core.fade_balance = lambda target, duration=None: (self.fades.append(target), fade_balance(target, duration))
+
+    def tearDown(self):
+        self.core.close()
+
+    def test_repeats_collapse_into_one_fade(self):
+        commands = CommandQueue(self.core)
+        for _ in range(5):
+            commands.nudge(0.1)
+        commands.nudge(-0.1)
+        self.dispatcher.drain()
+
+        self.assertEqual(len(self.fades), 1)
+        self.assertAlmostEqual(self.core.balance, 0.4)
+
+    def test_collapsing_respects_bounds_in_order(self):
+        commands = CommandQueue(self.core)
+        commands.fade_to(-1.0)
+        commands.nudge(-0.1)
+        commands.nudge(0.1)
+        self.dispatcher.drain()
+
+        self.assertAlmostEqual(self.core.balance, -0.9)
+
+    def test_acceleration(self):
+        commands = CommandQueue(self.core, acceleration=1.0, max_step=0.3)
+        for _ in range(4):
+            commands.nudge(0.1)
+        self.dispatcher.drain()
+
+        # 0.1 + 0.2 + 0.3 + 0.3
+        self.assertAlmostEqual(self.core.balance, 0.9)
+
+    def test_foreign_threads(self):
+        commands = CommandQueue(self.core)
+        threads = [threading.Thread(target=lambda: [commands.nudge(0.001) for _ in range(100)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.dispatcher.drain()
+
+        self.assertAlmostEqual(self.core.balance, 0.4)
+        self.assertFalse(commands._events)
+
+    def test_nudge_without_write_drops_its_mark(self):
+        metrics = Metrics()
+        _, core = make_core(("discord.exe", 10), metrics=metrics)
+        try:
+            core.select(0, "discord.exe (PID: 10)")
+            core.set_balance(1.0)
+            core.scheduler.flush()
+
+            # Already at the end, so the nudge changes nothing
+            commands = CommandQueue(core)
+            commands.nudge(0.1)
+            core.dispatcher.drain()
+            self.assertIsNone(metrics._input_mark)
+
+            commands.nudge(-0.5)
+            core.dispatcher.drain()
+            core.scheduler.flush()
+            self.assertEqual(metrics.histograms["hotkey_to_write"].count, 1)
+        finally:
+            core.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from src.control import ControlClient, ControlError, ControlServer, default_token_path, execute_batch
+from test.helpers import make_core
+
+SESSIONS = (("discord.exe", 10), ("game.exe", 20))
+
+class ExecuteBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.backend, self.core = make_core(*SESSIONS, start=True)
+
+    def tearDown(self):
+        self.core.close()
+
+    def test_batch_applies_in_order(self):
+        results = execute_batch(self.core, [
+            {"cmd": "select", "slot": 1, "name": "discord.exe"},
+            {"cmd": "select", "slot": 2, "key": "game.exe (PID: 20)"},
+            {"cmd": "set_balance", "value": 0.5},
+            {"cmd": "nudge", "delta": 0.25},
+            {"cmd": "state"},
+        ])
+
+        self.assertEqual(results[-1]["balance"], 0.75)
+        self.assertEqual(results[-1]["sources"], ["discord.exe (PID: 10)", "game.exe (PID: 20)"])
+
+        self.core.scheduler.flush()
+        self.assertEqual(self.backend.sessions[0].volume, 0.25)
+
+    def test_invalid_batch_applies_nothing(self):
+        with self.assertRaises(ControlError):
+            execute_batch(self.core, [
+                {"cmd": "set_balance", "value": 0.5},
+                {"cmd": "select", "slot": 1, "name": "missing.exe"},
+            ])
+        self.assertEqual(self.core.balance, 0.0)
+
+        for command in ({"cmd": "set_balance", "value": 2}, {"cmd": "clear", "slot": 3}, {"cmd": "jump"}):
+            with self.assertRaises(ControlError):
+                execute_batch(self.core, [command])
+
+    def test_conflicting_batch_is_rolled_back(self):
+        self.core.select(1, "game.exe (PID: 20)")
+        self.core.scheduler.flush()
+        writes = self.backend.call_counts["set_volume"]
+
+        # Both selects pass validation, but the second finds discord.exe taken by the first
+        with self.assertRaises(ControlError):
+            execute_batch(self.core, [
+                {"cmd": "select", "slot": 1, "name": "discord.exe"},
+                {"cmd": "set_balance", "value": 0.5},
+                {"cmd": "clear", "slot": 2},
+                {"cmd": "select", "slot": 2, "name": "discord.exe"},
+            ])
+        self.core.scheduler.flush()
+
+        self.assertEqual(self.core.sources[0], None)
+        self.assertEqual(self.core.sources[1].get_readable_process_key(), "game.exe (PID: 20)")
+        self.assertEqual(self.core.balance, 0.0)
+        self.assertEqual(self.backend.call_counts["set_volume"], writes)
+
+    def test_overlapping_group_is_rejected(self):
+        execute_batch(self.core, [{"cmd": "select", "slot": 1, "group": "discord.exe"}])
+        for command in ({"cmd": "select", "slot": 2, "group": "discord.exe"},
+                        {"cmd": "select", "slot": 2, "key": "discord.exe (PID: 10)"}):
+            with self.assertRaises(ControlError):
+                execute_batch(self.core, [command])
+
+        self.assertEqual(self.core.sources[1], None)
+        self.assertEqual(len(self.core.sources[0]), 1)
+
+class ControlServerTest(unittest.TestCase):
+    def setUp(self):
+        self.backend, self.core = make_core(*SESSIONS, start=True)
+        self.dispatcher = self.core.dispatcher
+        self.thread = threading.Thread(target=self.dispatcher.run, daemon=True)
+        self.thread.start()
+        self.server = ControlServer(self.core, "tcp:127.0.0.1:0", os.path.join(tempfile.mkdtemp(), "control.token"))
+        self.server.start()
+        self.client = ControlClient(self.server.address, token=self.server.token)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        self.dispatcher.post(self.dispatcher.stop)
+        self.thread.join()
+        self.core.close()
+
+    def test_commands(self):
+        self.client.select(1, name="discord.exe")
+        self.client.set_balance(-0.5)
+        self.client.nudge(-0.25)
+
+        state = self.client.state()
+        self.assertEqual(state["balance"], -0.75)
+        self.assertEqual(state["sources"], ["discord.exe (PID: 10)", None])
+        self.assertEqual(state["sessions"], 2)
+        self.assertEqual(state["keys"], list(self.core.audio_sessions.keys()))
+
+    def test_pipelined_batches(self):
+        batches = [[{"cmd": "set_balance", "value": i / 10}, {"cmd": "state"}] for i in range(10)]
+        results = self.client.pipeline(batches)
+
+        self.assertEqual([r[1]["balance"] for r in results], [i / 10 for i in range(10)])
+
+    def test_error_response(self):
+        with self.assertRaises(ControlError):
+            self.client.select(2, name="missing.exe")
+        self.assertEqual(self.client.state()["sources"], [None, None])
+
+    def test_connections_need_the_token(self):
+        with self.assertRaises(ControlError):
+            ControlClient(self.server.address, token="guess")
+
+        # A browser posting to the port gets nothing done
+        host, port = self.server.address[len("tcp:"):].rsplit(":", 1)
+        with socket.create_connection((host, int(port)), timeout=5.0) as connection:
+            connection.sendall(b'POST / HTTP/1.1\r\nHost: localhost\r\n\r\n{"cmd":"set_balance","value":1}\n')
+            reply = connection.makefile("rb").read()
+        self.assertEqual(json.loads(reply.splitlines()[0])["ok"], False)
+        self.assertEqual(self.client.state()["balance"], 0.0)
+
+        with open(self.server.token_path) as f:
+            self.assertEqual(f.read(), self.server.token)
+
+    def _connect(self):
+        host, port = self.server.address[len("tcp:"):].rsplit(":", 1)
+        return socket.create_connection((host, int(port)), timeout=5.0)
+
+    def test_silent_connections_time_out(self):
+        self.server.auth_timeout = 0.1
+        with self._connect() as connection:
+            reply = connection.makefile("rb").read()
+        self.assertEqual(json.loads(reply)["error"], "Timed out waiting for the token")
+
+    def test_long_lines_close_the_connection(self):
+        with self._connect() as connection:
+            connection.sendall(json.dumps({"auth": self.server.token}).encode() + b"\n")
+            connection.sendall(b'{"cmd":"state"}\n' + b"x" * 100000 + b"\n")
+            replies = connection.makefile("rb").read().splitlines()
+        self.assertEqual([json.loads(r)["ok"] for r in replies], [True, True, False])
+        self.assertEqual(json.loads(replies[-1])["error"], "Line too long")
+        self.assertEqual(self.client.state()["balance"], 0.0)
+
+
+class TokenPathTest(unittest.TestCase):
+    def test_each_address_has_its_own_token(self):
+        paths = {default_token_path(a) for a in ("tcp:127.0.0.1:5000", "tcp:127.0.0.1:5001", "unix:/tmp/a.sock", "unix:/tmp/b.sock")}
+        self.assertEqual(len(paths), 4)
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs unix sockets")
+class UnixSocketTest(unittest.TestCase):
+    def setUp(self):
+        self.backend, self.core = make_core(*SESSIONS)
+        self.directory = tempfile.mkdtemp()
+        self.address = "unix:" + os.path.join(self.directory, "control.sock")
+
+    def tearDown(self):
+        self.core.close()
+
+    def _server(self):
+        return ControlServer(self.core, self.address, os.path.join(self.directory, "control.token"))
+
+    def test_stale_socket_is_replaced(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.address[len("unix:"):])
+        stale.close()
+
+        server = self._server()
+        server.start()
+        server.stop()
+
+    def test_live_socket_is_left_alone(self):
+        first = self._server()
+        first.start()
+        try:
+            with self.assertRaises(OSError):
+                self._server().start()
+            with open(first.token_path) as f:
+                self.assertEqual(f.read(), first.token)
+            self.assertTrue(os.path.exists(self.address[len("unix:"):]))
+        finally:
+            first.stop()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.session import AudioProcess
+from test.helpers import make_core
+
+class BalancerCoreTest(unittest.TestCase):
+    def setUp(self):
+        self.backend, self.core = make_core(("discord.exe", 10), ("game.exe", 20), start=True)
+        self.chat, self.game = self.backend.sessions
+        self.dispatcher = self.core.dispatcher
+        self.events = []
+        self.core.add_listener(self.events.append)
+
+    def tearDown(self):
+        self.core.close()
+
+    def test_select_and_balance(self):
+        self.assertTrue(self.core.select(0, "discord.exe (PID: 10)"))
+        self.assertTrue(self.core.select(1, "game.exe (PID: 20)"))
+        self.assertFalse(self.core.select(1, "missing.exe (PID: 1)"))
+
+        self.core.set_balance(0.5)
+        self.core.scheduler.flush()
+        self.assertEqual(self.chat.volume, 0.5)
+        self.assertEqual(self.game.volume, 1.0)
+        self.assertIn("sources", self.events)
+        self.assertIn("balance", self.events)
+
+    def test_nudge_is_clamped(self):
+        for _ in range(15):
+            self.core.nudge(-0.1)
+        self.assertEqual(self.core.balance, -1.0)
+
+    def test_clear_resets_volume(self):
+        self.core.select(1, "game.exe (PID: 20)")
+        self.core.set_balance(-1.0)
+        self.core.clear(1)
+        self.core.scheduler.flush()
+
+        self.assertIsNone(self.core.sources[1])
+        self.assertEqual(self.game.volume, 1.0)
+
+    def test_bind_source_when_session_appears(self):
+        self.core.bind_source(0, "Spotify.exe")
+        self.assertIsNone(self.core.sources[0])
+
+        self.backend.add_session("spotify.exe", pid=30)
+        self.dispatcher.drain()
+
+        self.assertEqual(self.core.sources[0].get_session_pid(), 30)
+
+    def test_exited_source_is_released_and_rebound(self):
+        self.core.select(0, "discord.exe (PID: 10)")
+        self.core.set_balance(0.5)
+        self.core.scheduler.flush()
+        old = self.core.sources[0]
+
+        self.backend.remove_session(10)
+        self.core.refresh(wait=True)
+        self.assertIsNone(self.core.sources[0])
+        self.assertTrue(old.is_released())
+        self.assertIsNone(self.core.scheduler.last_written(old))
+
+        restarted = self.backend.add_session("discord.exe", pid=11)
+        self.core.refresh(wait=True)
+        self.assertEqual(self.core.sources[0].get_session_pid(), 11)
+        self.core.scheduler.flush()
+        self.assertEqual(restarted.volume, 0.5)
+
+    def test_restarts_keep_memory_flat(self):
+        self.core.select(0, "discord.exe (PID: 10)")
+        self.core.select(1, "game.exe (PID: 20)")
+        gc.collect()
+        before = sum(isinstance(obj, AudioProcess) for obj in gc.get_objects())
+        pid = 10
+        for step in range(50):
+            self.backend.remove_session(pid)
+            pid = 1000 + step
+            self.backend.add_session("discord.exe", pid=pid)
+            self.core.refresh(wait=True)
+            self.core.set_balance(0.25 if step % 2 else 0.75)
+            self.core.scheduler.flush()
+
+        self.assertEqual(self.core.sources[0].get_session_pid(), pid)
+        self.assertEqual(len(self.core.audio_sessions), 2)
+        gc.collect()
+        alive = sum(isinstance(obj, AudioProcess) for obj in gc.get_objects())
+        self.assertLessEqual(alive, before + 1)
+
+class HeadlessTest(unittest.TestCase):
+    def test_headless_run_without_tkinter(self):
+        code = (
+            "import sys; from src.__main__ import main; "
+            "main(['--headless', '--backend', 'simulated', '--no-hotkeys', '--exit-after', '0.1']); "
+            "print('tkinter' in sys.modules)"
+        )
+        # Keep the run away from the user's journal, profiles and control token
+        config = tempfile.mkdtemp()
+        environment = dict(os.environ, APPDATA=config, XDG_CONFIG_HOME=config)
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=environment, timeout=30)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("Headless balancer ready in", result.stdout)
+        self.assertTrue(result.stdout.strip().endswith("False"))
+        # Simulated runs do not journal unless asked to
+        self.assertFalse(os.path.exists(os.path.join(config, "volume-balancer", "volumes.journal")))
+
+if __name__ == "__main__":
+    unittest.main()
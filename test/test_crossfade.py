@@ -0,0 +1,97 @@
+import math
+import time
+import unittest
+
+from src.backends import create_backend
+from src.crossfade import Crossfader, get_curve
+from src.mixer import MixingEngine
+from src.session import AudioProcess
+from src.scheduler import VolumeWriteScheduler
+
+class SleepingDispatcher:
+    def __init__(self):
+        self.timers = []
+
+    def call_later(self, delay, callback, *args):
+        self.timers.append((time.perf_counter() + delay, callback, args))
+        return len(self.timers)
+
+    def cancel(self, handle):
+        self.timers.clear()
+
+    def run(self):
+        while self.timers:
+            deadline, callback, args = self.timers.pop(0)
+            time.sleep(max(deadline - time.perf_counter(), 0))
+            callback(*args)
+
+class BalanceCurveTest(unittest.TestCase):
+    def test_linear(self):
+        curve = get_curve("linear")
+        self.assertEqual(curve(0.0), 1.0)
+        self.assertEqual(curve(0.5), 0.5)
+        self.assertEqual(curve(1.0), 0.0)
+
+    def test_equal_power(self):
+        curve = get_curve("equal_power")
+        self.assertEqual(curve(0.0), 1.0)
+        self.assertAlmostEqual(curve(0.5), math.sqrt(0.5), places=3)
+        self.assertEqual(curve(1.0), 0.0)
+
+    def test_custom(self):
+        curve = get_curve(lambda x: 1.0 - x * x)
+        self.assertAlmostEqual(curve(0.5), 0.75, places=3)
+        self.assertEqual(curve(2.0), 0.0)
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            get_curve("logarithmic")
+
+class CrossfaderTest(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = SleepingDispatcher()
+        self.applied = []
+        self.crossfader = Crossfader(self.dispatcher, self.applied.append, duration=0.1, interval=0.01)
+
+    def test_fade_reaches_target(self):
+        self.crossfader.fade_to(1.0)
+        self.assertTrue(self.crossfader.active)
+        self.dispatcher.run()
+
+        self.assertFalse(self.crossfader.active)
+        self.assertEqual(self.applied[-1], 1.0)
+        self.assertGreater(len(self.applied), 3)
+        self.assertEqual(self.applied, sorted(self.applied))
+
+    def test_zero_duration_jumps(self):
+        self.crossfader.fade_to(-1.0, duration=0)
+        self.assertEqual(self.applied, [-1.0])
+        self.assertFalse(self.crossfader.active)
+
+    def test_retarget_and_finish(self):
+        self.crossfader.fade_to(1.0)
+        self.crossfader.fade_to(-1.0)
+        self.assertEqual(self.crossfader.target, -1.0)
+
+        self.crossfader.finish()
+        self.assertEqual(self.applied[-1], -1.0)
+        self.assertEqual(self.dispatcher.timers, [])
+
+    def test_unchanged_frames_skip_writes(self):
+        backend = create_backend("simulated", session_count=1)
+        process = AudioProcess(backend.list_sessions()[0], backend)
+        scheduler = VolumeWriteScheduler(backend, max_rate=0)
+        mixer = MixingEngine(scheduler, curve="equal_power")
+        mixer.add(process, 1.0)
+        scheduler.flush()
+        writes = backend.call_counts["set_volume"]
+
+        crossfader = Crossfader(self.dispatcher, mixer.set_balance, duration=0.1, interval=0.01)
+        crossfader.fade_to(-0.05)
+        self.dispatcher.run()
+        scheduler.close()
+
+        self.assertEqual(backend.call_counts["set_volume"], writes)
+
+if __name__ == "__main__":
+    unittest.main()
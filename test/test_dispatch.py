@@ -0,0 +1,34 @@
+import threading
+import time
+import unittest
+
+from src.dispatch import LoopDispatcher
+
+class LoopDispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = LoopDispatcher()
+        self.thread = threading.Thread(target=self.dispatcher.run, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.dispatcher.stop()
+        self.thread.join()
+
+    def test_earlier_timer_wakes_the_loop(self):
+        fired = threading.Event()
+        self.dispatcher.call_later(60, lambda: None)
+        time.sleep(0.05)
+
+        started = time.monotonic()
+        self.dispatcher.call_later(0.05, fired.set)
+        self.assertTrue(fired.wait(5.0))
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_cancelled_timer_does_not_run(self):
+        fired = threading.Event()
+        handle = self.dispatcher.call_later(0.01, fired.set)
+        self.dispatcher.cancel(handle)
+        self.assertFalse(fired.wait(0.1))
+
+if __name__ == "__main__":
+    unittest.main()
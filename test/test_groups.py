@@ -0,0 +1,95 @@
+import unittest
+
+from src.catalog import SessionCatalog
+from src.core import SelectionConflictError
+from src.groups import SourceGroup, group_key, parse_group_key
+from test.helpers import make_core
+
+class GroupKeyTest(unittest.TestCase):
+    def test_round_trip(self):
+        self.assertEqual(parse_group_key(group_key("chrome.exe")), "chrome.exe")
+        self.assertIsNone(parse_group_key("chrome.exe (PID: 1)"))
+
+    def test_catalog_lists_executables_with_several_sessions(self):
+        catalog = SessionCatalog(["chrome.exe (PID: 1)", "game.exe (PID: 2)"], groups=True)
+        self.assertNotIn(group_key("chrome.exe"), catalog)
+
+        catalog.add("chrome.exe (PID: 3)")
+        self.assertIn(group_key("chrome.exe"), catalog)
+        self.assertEqual(catalog.search("chrome")[-1], group_key("chrome.exe"))
+
+        catalog.remove("chrome.exe (PID: 1)")
+        self.assertNotIn(group_key("chrome.exe"), catalog)
+
+class GroupSourceTest(unittest.TestCase):
+    def setUp(self):
+        self.backend, self.core = make_core(("chrome.exe", 10), ("chrome.exe", 11), ("game.exe", 20))
+        *self.chrome, self.game = self.backend.sessions
+
+    def tearDown(self):
+        self.core.close()
+
+    def volumes(self):
+        self.core.scheduler.flush()
+        return [session.volume for session in self.chrome]
+
+    def test_group_balances_every_session(self):
+        self.assertTrue(self.core.select(0, group_key("chrome.exe")))
+        self.core.select(1, "game.exe (PID: 20)")
+        self.assertIsInstance(self.core.sources[0], SourceGroup)
+        self.assertEqual(len(self.core.sources[0]), 2)
+
+        self.core.set_balance(0.5)
+        self.assertEqual(self.volumes(), [0.5, 0.5])
+        self.core.scheduler.flush()
+        self.assertEqual(self.game.volume, 1.0)
+
+    def test_membership_follows_sessions(self):
+        group = self.core.select_group(0, "chrome.exe")
+        self.core.set_balance(1.0)
+        self.core.scheduler.flush()
+
+        self.chrome.append(self.backend.add_session("chrome.exe", pid=12))
+        self.backend.remove_session(10)
+        self.core.refresh(wait=True)
+
+        self.assertEqual(sorted(p.get_session_pid() for p in group.members.values()), [11, 12])
+        self.assertEqual(len(self.core.mixer), 2)
+        self.assertEqual(self.volumes()[1:], [0.0, 0.0])
+
+    def test_clear_restores_members(self):
+        self.core.select_group(0, "chrome.exe")
+        self.core.set_balance(1.0)
+        self.assertEqual(self.volumes(), [0.0, 0.0])
+
+        self.core.clear(0)
+        self.assertEqual(self.volumes(), [1.0, 1.0])
+        self.assertEqual(len(self.core.mixer), 0)
+
+        self.backend.add_session("chrome.exe", pid=13)
+        self.core.refresh(wait=True)
+        self.assertEqual(len(self.core.mixer), 0)
+
+    def test_overlapping_selections_are_rejected(self):
+        group = self.core.select_group(0, "chrome.exe")
+        with self.assertRaises(SelectionConflictError):
+            self.core.select(1, group_key("chrome.exe"))
+        with self.assertRaises(SelectionConflictError):
+            self.core.select(1, "chrome.exe (PID: 10)")
+        self.assertEqual(self.core.sources, [group, None])
+        self.assertEqual(len(self.core.mixer), 2)
+
+        # A source waiting for the executable does not take a member either
+        self.core.bind_source(1, "chrome.exe")
+        self.assertIsNone(self.core.sources[1])
+
+        self.core.clear(0)
+        self.core.clear(1)
+        self.core.select(1, "chrome.exe (PID: 11)")
+        with self.assertRaises(SelectionConflictError):
+            self.core.select_group(0, "Chrome.exe")
+        self.assertEqual(self.core.sources[0], None)
+        self.assertEqual(self.core.sources[1].get_session_pid(), 11)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import threading
+import time
+import unittest
+
+from src.backends import create_backend
+from src.backends.simulated import SimulatedBackend
+from src.guard import SessionGuard, SessionUnavailableError
+from src.scheduler import VolumeWriteScheduler
+from src.session import AudioProcess
+from test.helpers import make_core
+
+def fail():
+    raise RuntimeError("session is gone")
+
+class HangingBackend(SimulatedBackend):
+    """Simulated backend whose writes to ``hung`` PIDs block until released."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.hung = set()
+        self.release = threading.Event()
+
+    def set_volume(self, volume, value):
+        if volume.pid in self.hung:
+            self.release.wait()
+        super().set_volume(volume, value)
+
+class SessionGuardTest(unittest.TestCase):
+    def setUp(self):
+        self.changes = []
+        self.guard = SessionGuard(create_backend("simulated", session_count=0), timeout=0.05,
+                                  failures=2, cooldown=0.05, on_change=lambda key, degraded: self.changes.append((key, degraded)))
+
+    def tearDown(self):
+        self.guard.close()
+
+    def test_repeated_failures_open_the_breaker(self):
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                self.guard.call("chat", fail)
+        self.assertTrue(self.guard.degraded("chat"))
+        self.assertEqual(self.changes, [("chat", True)])
+
+        with self.assertRaises(SessionUnavailableError):
+            self.guard.call("chat", lambda: 1)
+        self.assertEqual(self.guard.call("game", lambda: 2), 2)
+
+        # After the cooldown a trial call goes through and closes it again
+        time.sleep(0.06)
+        self.assertEqual(self.guard.retry_in("chat"), 0.0)
+        self.assertEqual(self.guard.call("chat", lambda: 3), 3)
+        self.assertFalse(self.guard.degraded("chat"))
+        self.assertEqual(self.changes[-1], ("chat", False))
+
+    def test_failed_trial_doubles_the_cooldown(self):
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                self.guard.call("chat", fail)
+        time.sleep(0.06)
+        with self.assertRaises(RuntimeError):
+            self.guard.call("chat", fail)
+        self.assertGreater(self.guard.retry_in("chat"), 0.05)
+
+    def test_hung_call_times_out_and_blocks_further_calls(self):
+        release = threading.Event()
+        started = time.perf_counter()
+        with self.assertRaises(SessionUnavailableError):
+            self.guard.call("chat", release.wait)
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+        with self.assertRaises(SessionUnavailableError):
+            self.guard.submit("chat", lambda: 1)
+        release.set()
+
+class GuardedSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = HangingBackend(session_count=0)
+        self.chat = self.backend.add_session("chat.exe", pid=1)
+        self.game = self.backend.add_session("game.exe", pid=2)
+        self.processes = [AudioProcess(session, self.backend) for session in (self.chat, self.game)]
+        self.guard = SessionGuard(self.backend, timeout=0.05, failures=2, cooldown=0.05)
+        self.scheduler = VolumeWriteScheduler(self.backend, max_rate=0, guard=self.guard)
+
+    def tearDown(self):
+        self.backend.release.set()
+        self.scheduler.close()
+        self.guard.close()
+
+    def test_hung_session_does_not_hold_up_the_others(self):
+        self.backend.hung.add(1)
+        started = time.perf_counter()
+        with self.scheduler.hold():
+            self.scheduler.submit(self.processes[0], 0.2)
+            self.scheduler.submit(self.processes[1], 0.4)
+        self.scheduler.flush()
+
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(self.game.volume, 0.4)
+        self.assertIsNone(self.scheduler.last_written(self.processes[0]))
+        self.assertTrue(self.scheduler.is_pending(self.processes[0]))
+
+        # Once the session answers again, the latest request is retried
+        self.backend.hung.clear()
+        self.backend.release.set()
+        self.scheduler.submit(self.processes[0], 0.3)
+        deadline = time.monotonic() + 2.0
+        while self.scheduler.last_written(self.processes[0]) != 0.3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.chat.volume, 0.3)
+
+class CoreHealthTest(unittest.TestCase):
+    def test_failing_source_is_degraded(self):
+        backend, core = make_core(("chat.exe", 1), ("game.exe", 2))
+        events = []
+        core.add_listener(events.append)
+        core.select(0, "chat.exe (PID: 1)")
+        core.select(1, "game.exe (PID: 2)")
+        core.scheduler.flush()
+
+        # The session expires without the registry noticing yet
+        backend._sessions[1].alive = False
+        for balance in (0.2, 0.4, 0.6):
+            core.set_balance(balance)
+            core.scheduler.flush()
+        core.dispatcher.drain()
+
+        self.assertTrue(core.is_degraded(0))
+        self.assertFalse(core.is_degraded(1))
+        self.assertIn("health", events)
+        core.close()
+
+if __name__ == "__main__":
+    unittest.main()
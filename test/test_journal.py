@@ -0,0 +1,120 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from src.backends import create_backend
+from src.core import BalancerCore
+from src.dispatch import LoopDispatcher
+from src.journal import VolumeJournal, restore
+from test.helpers import make_core
+
+class FakeProcess:
+    def __init__(self, pid, name, initial=1.0):
+        self.pid = pid
+        self.name = name
+        self.initial = initial
+
+    def get_session_pid(self):
+        return self.pid
+
+    def get_session_name(self):
+        return self.name
+
+    def get_initial_volume(self):
+        return self.initial
+
+def pending(path):
+    journal = VolumeJournal(path)
+    try:
+        return journal.pending()
+    finally:
+        journal.close()
+
+class VolumeJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "volumes.journal")
+
+    def test_replay_after_reopen(self):
+        journal = VolumeJournal(self.path)
+        game, chat = FakeProcess(5, "game.exe", 0.8), FakeProcess(6, "chat.exe")
+        journal.record({game: 0.5, chat: 0.25})
+        journal.record({game: 0.4})
+        journal.record({chat: 1.0})
+        journal.close()
+
+        journal = VolumeJournal(self.path)
+        self.assertEqual(len(journal), 6)
+        pending = journal.pending()
+        self.assertEqual(list(pending), [5])
+        self.assertEqual(pending[5].name, b"game.exe")
+        self.assertAlmostEqual(pending[5].initial, 0.8, places=6)
+        self.assertAlmostEqual(pending[5].applied, 0.4, places=6)
+        journal.close()
+
+    def test_full_journal_compacts_then_grows(self):
+        journal = VolumeJournal(self.path, capacity=8)
+        game = FakeProcess(5, "game.exe")
+        for step in range(20):
+            journal.record({game: step / 40})
+        # Only the open session survives compaction
+        self.assertEqual(journal.capacity, 8)
+        self.assertAlmostEqual(journal.pending()[5].applied, 19 / 40, places=6)
+
+        for pid in range(10, 20):
+            journal.record({FakeProcess(pid, "app.exe"): 0.5})
+        self.assertGreater(journal.capacity, 8)
+        self.assertEqual(len(journal.pending()), 11)
+        journal.close()
+
+class RestoreTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "volumes.journal")
+        self.backend = create_backend("simulated", session_count=0)
+
+    def test_restores_matching_sessions_only(self):
+        game = self.backend.add_session("game.exe", pid=5, volume=0.3)
+        reused = self.backend.add_session("other.exe", pid=6, volume=0.3)
+
+        journal = VolumeJournal(self.path)
+        journal.record({FakeProcess(5, "game.exe", 0.9): 0.3, FakeProcess(6, "chat.exe", 0.9): 0.3})
+
+        self.assertEqual(restore(journal, self.backend), 1)
+        self.assertAlmostEqual(game.volume, 0.9, places=6)
+        self.assertEqual(reused.volume, 0.3)
+        # The unmatched session is left for a later restore
+        self.assertEqual(list(journal.pending()), [6])
+        journal.close()
+
+    def test_core_writes_are_journaled(self):
+        _, core = make_core(("game.exe", 5, 0.8))
+        journal = VolumeJournal(self.path)
+        core.use_journal(journal)
+        core.select(0, "game.exe (PID: 5)")
+        core.set_balance(1.0)
+        core.scheduler.flush()
+
+        # A crash at this point leaves the session to be restored on the next start
+        self.assertIn(5, pending(self.path))
+
+        core.close()
+        self.assertEqual(pending(self.path), {})
+
+    def test_core_restores_before_the_first_scan(self):
+        game = self.backend.add_session("game.exe", pid=5, volume=0.3)
+        journal = VolumeJournal(self.path)
+        journal.record({FakeProcess(5, "game.exe", 0.9): 0.3})
+
+        core = BalancerCore(self.backend, LoopDispatcher(), fade_duration=0)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            core.use_journal(journal)
+            core.refresh(wait=True)
+
+        self.assertAlmostEqual(game.volume, 0.9, places=6)
+        self.assertIn("Restored the volume of 1 session", output.getvalue())
+        self.assertEqual(pending(self.path), {})
+        core.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from src.leveling import Leveler, rms
+from test.helpers import make_core
+
+class LevelerTest(unittest.TestCase):
+    def setUp(self):
+        self.backend, self.core = make_core(("game.exe", 1), ("discord.exe", 2))
+        self.loud, self.quiet = self.backend.sessions
+        self.loud.signal = lambda t: 0.8
+        self.quiet.signal = lambda t: 0.2
+
+        self.core.select(0, "game.exe (PID: 1)")
+        self.core.select(1, "discord.exe (PID: 2)")
+        self.leveler = Leveler(self.core, window=0.25, rate=20)
+
+    def tearDown(self):
+        self.core.close()
+
+    def run_updates(self, count):
+        for _ in range(count):
+            self.core.scheduler.flush()
+            for _ in range(5):
+                self.leveler.meter.sample()
+            self.leveler.update()
+        self.core.scheduler.flush()
+
+    def test_rms(self):
+        self.assertEqual(rms([]), 0.0)
+        self.assertAlmostEqual(rms([3.0, 4.0, 3.0, 4.0]), 3.5355, places=3)
+
+    def test_trims_louder_source_in_rate_limited_steps(self):
+        self.run_updates(1)
+        self.assertEqual(self.leveler.trims_db, [-1.0, 0.0])
+
+        self.run_updates(20)
+        self.assertAlmostEqual(self.leveler.trims_db[0], -12.0, delta=0.5)
+        self.assertEqual(self.leveler.trims_db[1], 0.0)
+        self.assertAlmostEqual(self.loud.volume, 0.25, delta=0.02)
+        self.assertEqual(self.quiet.volume, 1.0)
+
+        # Settled: no more writes
+        self.assertFalse(self.leveler.update())
+
+    def test_sits_on_top_of_balance(self):
+        self.run_updates(20)
+        self.core.set_balance(0.5)
+        self.core.scheduler.flush()
+        self.assertAlmostEqual(self.loud.volume, 0.125, delta=0.02)
+
+    def test_silent_source_keeps_trim(self):
+        self.run_updates(3)
+        trims = list(self.leveler.trims_db)
+        self.quiet.signal = lambda t: 0.0
+        self.run_updates(3)
+        self.assertEqual(self.leveler.trims_db, trims)
+
+if __name__ == "__main__":
+    unittest.main()
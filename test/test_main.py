@@ -11,6 +11,7 @@ def setup():
     root = tk.Tk()
     root.withdraw()
     app = VolumeBalancer(root)
+    app.refresh_processes(wait=True)
 
     return root, app
 
@@ -96,6 +97,7 @@ class GUIBaseTest(unittest.TestCase):
         self.app.process1_combo.event_generate("<<ComboboxSelected>>")
         self.app.balance_slider.set(-0.5)
         self.root.update()
+        self.app.scheduler.flush()
 
         self.assertIsNotNone(self.app.process1)
         self.assertEqual(self.app.process1.get_volume(), 1)
@@ -105,12 +107,14 @@ class GUIBaseTest(unittest.TestCase):
         self.app.process2_combo.set(p2[0]["val"])
         self.app.process2_combo.event_generate("<<ComboboxSelected>>")
         self.root.update()
+        self.app.scheduler.flush()
 
         self.assertIsNotNone(self.app.process2)
         self.assertEqual(self.app.process2.get_volume(), 0.5)
         
         self.app.balance_slider.set(0.5)
         self.root.update()
+        self.app.scheduler.flush()
 
         self.assertEqual(self.app.process1.get_volume(), 0.5)
         self.assertEqual(self.app.process2.get_volume(), 1)
@@ -123,7 +127,7 @@ class GUIBaseTest(unittest.TestCase):
 
         test.audio_session_factory.spawn_session(pid=12345)
 
-        self.app.refresh_processes()
+        self.app.refresh_processes(wait=True)
 
         v1, v2 = self.app.process1_combo["values"], self.app.process2_combo["values"]
 
@@ -138,7 +142,7 @@ class HotkeyTest(unittest.TestCase):
     def tearDown(self):
         teardown(self.root)
     
-    @patch('src.main.keyboard')
+    @patch('src.hotkeys.keyboard')
     def test_hotkey_registration(self, mock_keyboard):
         VolumeBalancer(self.root)
         expected_hotkeys = [
@@ -158,9 +162,10 @@ class HotkeyTest(unittest.TestCase):
         for expected_key in expected_hotkeys:
             self.assertIn(expected_key, hotkey_strings)
     
-    @patch('src.main.keyboard')
+    @patch('src.hotkeys.keyboard')
     def test_hotkey_callbacks(self, mock_keyboard):
         app = VolumeBalancer(self.root)
+        app.crossfader.duration = 0
         
         callbacks = {}
         for call in mock_keyboard.add_hotkey.call_args_list:
@@ -171,35 +176,43 @@ class HotkeyTest(unittest.TestCase):
         # ctrl+alt+left
         app.balance_var.set(-0.9)
         callbacks['ctrl+alt+left']()
+        app.dispatcher.drain()
         self.assertEqual(app.balance_var.get(), -1.0)
         callbacks['ctrl+alt+left']()
+        app.dispatcher.drain()
         self.assertEqual(app.balance_var.get(), -1.0)
         
         # ctrl+alt+right
         app.balance_var.set(0.9)
         callbacks['ctrl+alt+right']()
+        app.dispatcher.drain()
         self.assertEqual(app.balance_var.get(), 1.0)
         callbacks['ctrl+alt+right']()
+        app.dispatcher.drain()
         self.assertEqual(app.balance_var.get(), 1.0)
         
         # ctrl+shift+left
         app.balance_var.set(0.5)
         callbacks['ctrl+shift+left']()
+        app.dispatcher.drain()
         self.assertEqual(app.balance_var.get(), -1.0)
         
         # ctrl+shift+right
         app.balance_var.set(-0.5)
         callbacks['ctrl+shift+right']()
+        app.dispatcher.drain()
         self.assertEqual(app.balance_var.get(), 1.0)
         
         # ctrl+shift+down
         app.balance_var.set(0.7)
         callbacks['ctrl+shift+down']()
+        app.dispatcher.drain()
         self.assertEqual(app.balance_var.get(), 0.0)
         
         # ctrl+shift+up
         app.balance_var.set(-0.7)
         callbacks['ctrl+shift+up']()
+        app.dispatcher.drain()
         self.assertEqual(app.balance_var.get(), 0.0)
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+import unittest
+
+from src.backends.simulated import talk_bursts
+from src.metering import PeakMeter, RingBuffer
+from test.helpers import make_core
+
+class RingBufferTest(unittest.TestCase):
+    def test_wraps_around(self):
+        ring = RingBuffer(3)
+        self.assertEqual(ring.peak(3), 0.0)
+        for value in (0.25, 0.5, 0.75, 1.0):
+            ring.append(value)
+
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(ring.latest(3), [0.5, 0.75, 1.0])
+        self.assertEqual(ring.latest(2), [0.75, 1.0])
+        self.assertEqual(ring.peak(3), 1.0)
+
+class PeakMeterTest(unittest.TestCase):
+    def test_sample_records_history(self):
+        backend, core = make_core(("discord.exe", 1), ("game.exe", 2))
+        backend.sessions[0].signal = lambda t: 0.5
+        processes = [core.audio_sessions.get_by_pid(1), core.audio_sessions.get_by_pid(2)]
+
+        meter = PeakMeter(backend, rate=100, history=0.05)
+        meter.watch(processes)
+        self.assertEqual(meter.sample(), 0.5)
+
+        backend.remove_session(2)
+        self.assertEqual(meter.sample(), 0.5)
+        self.assertEqual(meter.history(processes[1]).latest(2), [0.0, 0.0])
+        self.assertEqual(len(meter.history(processes[0])), 2)
+        core.close()
+
+    def test_talk_bursts(self):
+        signal = talk_bursts(on=1.0, off=1.0, level=0.6, floor=0.0)
+        self.assertEqual([signal(t) for t in (0.5, 1.5, 2.5)], [0.6, 0.0, 0.6])
+
+class DuckerTest(unittest.TestCase):
+    def setUp(self):
+        self.backend, self.core = make_core(("discord.exe", 1), ("game.exe", 2))
+        self.dispatcher = self.core.dispatcher
+        self.core.select(0, "discord.exe (PID: 1)")
+        self.core.select(1, "game.exe (PID: 2)")
+        self.core.set_balance(0.2)
+
+        from src.metering import Ducker
+        self.ducker = Ducker(self.core, depth=0.6, attack=0.02, release=0.1, rate=100)
+
+    def tearDown(self):
+        self.core.close()
+
+    def feed(self, peak, samples):
+        for _ in range(samples):
+            self.ducker._on_sample(peak)
+        self.dispatcher.drain()
+
+    def game_gain(self):
+        return self.core.mixer.get_gain(self.core.sources[1])
+
+    def test_attack_and_release(self):
+        self.feed(0.5, 20)
+        # Ducked to balance -0.4, so game.exe plays at 1 - 0.4
+        self.assertAlmostEqual(self.game_gain(), 0.6, delta=0.02)
+
+        self.feed(0.0, 5)
+        self.assertGreater(self.game_gain(), 0.6)
+        self.assertLess(self.game_gain(), 1.0)
+
+        self.feed(0.0, 200)
+        self.assertEqual(self.core.mixer.offset, 0.0)
+        self.assertEqual(self.game_gain(), 1.0)
+
+    def test_user_balance_is_left_alone(self):
+        self.core.fade_balance(-0.2, 10.0)
+        self.feed(0.5, 20)
+
+        self.assertAlmostEqual(self.core.balance, 0.2, delta=0.01)
+        self.assertTrue(self.core.crossfader.active)
+        self.assertEqual(self.core.crossfader.target, -0.2)
+        self.assertEqual(self.core.capture_profile("test").balance, -0.2)
+
+        # The user's balance moves under the ducking
+        self.core.crossfader.finish()
+        self.assertEqual(self.core.balance, -0.2)
+        self.assertAlmostEqual(self.game_gain(), 0.2, delta=0.02)
+
+    def test_watches_source_one(self):
+        self.assertEqual([m.process for m in self.ducker.meter._meters], [self.core.sources[0]])
+        self.core.clear(0)
+        self.assertEqual(self.ducker.meter._meters, ())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import unittest
+
+from src.backends import SessionExpiredError, create_backend
+from src.core import BalancerCore
+from src.dispatch import LoopDispatcher
+from src.metrics import BUCKETS, Histogram, InstrumentedBackend, Metrics
+from test.helpers import make_core
+
+class HistogramTest(unittest.TestCase):
+    def test_observe_and_percentiles(self):
+        histogram = Histogram()
+        for _ in range(99):
+            histogram.observe(0.0001)
+        histogram.observe(0.5)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertLessEqual(histogram.percentile(0.5), 0.000128)
+        self.assertEqual(histogram.percentile(1.0), 0.5)
+        self.assertEqual(sum(histogram.counts), 100)
+
+    def test_overflow_bucket(self):
+        histogram = Histogram()
+        histogram.observe(BUCKETS[-1] * 10)
+        self.assertEqual(histogram.counts[-1], 1)
+
+class MetricsTest(unittest.TestCase):
+    def test_instrumented_backend_counts_calls_and_errors(self):
+        backend = create_backend("simulated", session_count=0)
+        session = backend.add_session("game.exe")
+        metrics = Metrics()
+        instrumented = InstrumentedBackend(backend, metrics)
+
+        instrumented.list_sessions()
+        volume = instrumented.open_volume(session)
+        instrumented.set_volume(volume, 0.5)
+        backend.remove_session(session.pid)
+        with self.assertRaises(SessionExpiredError):
+            instrumented.set_volume(volume, 0.4)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["list_sessions"]["count"], 1)
+        self.assertEqual(snapshot["set_volume"]["count"], 2)
+        self.assertEqual(snapshot["set_volume"]["errors"], 1)
+
+    def test_input_latency(self):
+        metrics = Metrics(input_timeout=1.0)
+        metrics.complete_input()
+        self.assertNotIn("hotkey_to_write", metrics.histograms)
+
+        metrics.mark_input()
+        metrics.mark_input()
+        metrics.complete_input()
+        self.assertEqual(metrics.histograms["hotkey_to_write"].count, 1)
+
+        metrics.mark_input()
+        metrics._input_mark -= 2.0
+        metrics.complete_input()
+        self.assertEqual(metrics.histograms["hotkey_to_write"].count, 1)
+
+    def test_exports(self):
+        metrics = Metrics()
+        metrics.observe("set_volume", 0.002)
+        metrics.error("set_volume")
+
+        self.assertEqual(json.loads(metrics.to_json())["set_volume"]["errors"], 1)
+
+        text = metrics.to_prometheus()
+        self.assertIn('volume_balancer_latency_seconds_bucket{op="set_volume",le="+Inf"} 1', text)
+        self.assertIn('volume_balancer_latency_seconds_count{op="set_volume"} 1', text)
+        self.assertIn('volume_balancer_errors_total{op="set_volume"} 1', text)
+
+    def test_core_records_writes(self):
+        metrics = Metrics()
+        _, core = make_core("discord.exe", metrics=metrics)
+        try:
+            core.select(0, list(core.audio_sessions.keys())[0])
+            metrics.mark_input()
+            core.set_balance(0.5)
+            core.scheduler.flush()
+        finally:
+            core.close()
+
+        self.assertIsInstance(core.backend, InstrumentedBackend)
+        self.assertGreaterEqual(metrics.histograms["set_volume"].count, 1)
+        self.assertEqual(metrics.histograms["hotkey_to_write"].count, 1)
+
+    def test_disabled_leaves_backend_untouched(self):
+        backend = create_backend("simulated", session_count=0)
+        core = BalancerCore(backend, LoopDispatcher())
+        core.close()
+        self.assertIs(core.backend, backend)
+
+if __name__ == "__main__":
+    unittest.main()
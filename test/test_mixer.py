@@ -0,0 +1,85 @@
+import unittest
+
+from src.backends import create_backend
+from src.mixer import MixingEngine
+from src.session import AudioProcess
+from src.scheduler import VolumeWriteScheduler
+
+class MixingEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = create_backend("simulated", session_count=4)
+        self.processes = [AudioProcess(s, self.backend) for s in self.backend.list_sessions()]
+        self.scheduler = VolumeWriteScheduler(self.backend, max_rate=0)
+        self.mixer = MixingEngine(self.scheduler)
+
+    def tearDown(self):
+        self.scheduler.close()
+
+    def _volumes(self):
+        self.scheduler.flush()
+        return [round(p.get_volume(), 3) for p in self.processes]
+
+    def test_two_way_balance(self):
+        chat, game = self.processes[:2]
+        self.mixer.add(chat, -1.0)
+        self.mixer.add(game, 1.0)
+
+        self.mixer.set_balance(0.5)
+        self.assertEqual(self._volumes()[:2], [0.5, 1.0])
+
+        self.mixer.set_balance(-0.25)
+        self.assertEqual(self._volumes()[:2], [1.0, 0.75])
+
+    def test_group_against_one(self):
+        chat, game, music, browser = self.processes
+        self.mixer.add(chat, -1.0)
+        self.mixer.add(game, 1.0)
+        self.mixer.add(music, 1.0, weight=0.5)
+        self.mixer.add(browser, 0.5)
+
+        self.mixer.set_balance(-1.0)
+        self.assertEqual(self._volumes(), [1.0, 0.0, 0.0, 0.5])
+
+    def test_only_changed_gains_written(self):
+        chat, game = self.processes[:2]
+        self.mixer.add(chat, -1.0)
+        self.mixer.add(game, 1.0)
+        self.mixer.set_balance(0.5)
+        self.scheduler.flush()
+        writes = self.backend.call_counts["set_volume"]
+
+        # Moving within the right half only changes the left channel
+        self.mixer.set_balance(0.7)
+        self.scheduler.flush()
+        self.assertEqual(self.backend.call_counts["set_volume"], writes + 1)
+
+        self.mixer.set_balance(0.702)
+        self.scheduler.flush()
+        self.assertEqual(self.backend.call_counts["set_volume"], writes + 1)
+
+    def test_offset_shifts_the_balance(self):
+        chat, game = self.processes[:2]
+        self.mixer.add(chat, -1.0)
+        self.mixer.add(game, 1.0)
+        self.mixer.set_balance(0.5)
+
+        self.mixer.set_offset(-0.75)
+        self.assertEqual(self._volumes()[:2], [1.0, 0.75])
+        self.assertEqual(self.mixer.balance, 0.5)
+
+        # The shifted balance stays within range
+        self.mixer.set_offset(-2.0)
+        self.assertEqual(self._volumes()[:2], [1.0, 0.0])
+
+    def test_remove_resets_volume(self):
+        chat = self.processes[0]
+        self.mixer.add(chat, -1.0)
+        self.mixer.set_balance(1.0)
+        self.assertEqual(self._volumes()[0], 0.0)
+
+        self.mixer.remove(chat)
+        self.assertEqual(self._volumes()[0], 1.0)
+        self.assertNotIn(chat, self.mixer)
+
+if __name__ == "__main__":
+    unittest.main()
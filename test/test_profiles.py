@@ -0,0 +1,134 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from src.groups import SourceGroup
+from src.profiles import LAST_PROFILE, Profile, ProfileStore, save_last_profile
+from test.helpers import make_core
+
+def rule(exe, group=False):
+    return {"exe": exe, "group": group}
+
+class ProfileStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "profiles.json")
+
+    def test_round_trip(self):
+        store = ProfileStore(self.path)
+        store.put(Profile("chat", [rule("Discord.exe"), rule("chrome.exe", True)], -0.4, "equal_power"))
+        store.save()
+
+        loaded = ProfileStore(self.path).load()
+        profile = loaded.get("chat")
+        self.assertEqual(profile.sources, (rule("Discord.exe"), rule("chrome.exe", True)))
+        self.assertEqual((profile.balance, profile.curve), (-0.4, "equal_power"))
+        self.assertIs(loaded.match("discord.EXE"), profile)
+
+    def test_missing_file_loads_empty(self):
+        self.assertEqual(len(ProfileStore(self.path).load()), 0)
+
+    def test_newest_profile_wins_and_falls_back(self):
+        store = ProfileStore(self.path)
+        first = Profile("first", [rule("game.exe"), None])
+        second = Profile("second", [rule("game.exe"), rule("spotify.exe")])
+        store.put(first)
+        store.put(second)
+        self.assertIs(store.match("game.exe"), second)
+
+        store.remove("second")
+        self.assertIs(store.match("game.exe"), first)
+        self.assertIsNone(store.match("spotify.exe"))
+
+    def test_invalid_entries_are_skipped_and_kept(self):
+        bad = {"name": "broken", "sources": [None]}
+        with open(self.path, "w") as f:
+            json.dump({"version": 1, "profiles": [bad, Profile("chat", [rule("discord.exe"), None]).to_dict()]}, f)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            store = ProfileStore(self.path).load()
+        self.assertEqual(list(store.profiles), ["chat"])
+
+        store.save()
+        with open(self.path) as f:
+            self.assertIn(bad, json.load(f)["profiles"])
+
+    def test_unreadable_file_is_set_aside(self):
+        with open(self.path, "w") as f:
+            f.write("{not json")
+
+        store = ProfileStore(self.path)
+        with self.assertRaises(ValueError):
+            store.load()
+        self.assertEqual(store.set_aside(), self.path + ".bad")
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.path + ".bad") as f:
+            self.assertEqual(f.read(), "{not json")
+
+    def test_last_session_ranks_below_named_profiles(self):
+        store = ProfileStore(self.path)
+        named = Profile("gaming", [rule("game.exe"), None])
+        store.put(named)
+        store.put(Profile(LAST_PROFILE, [rule("game.exe"), rule("spotify.exe")]))
+        self.assertIs(store.match("game.exe"), named)
+        self.assertIs(store.match("spotify.exe"), store.get(LAST_PROFILE))
+
+        store.put(Profile("music", [None, rule("spotify.exe")]))
+        store.remove("gaming")
+        self.assertIs(store.match("game.exe"), store.get(LAST_PROFILE))
+        self.assertIs(store.match("spotify.exe"), store.get("music"))
+
+        store.put(Profile("gaming", [rule("game.exe"), None]))
+        store.remove("music")
+        self.assertIs(store.match("spotify.exe"), store.get(LAST_PROFILE))
+
+class ProfileApplyTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ProfileStore(os.path.join(tempfile.mkdtemp(), "profiles.json"))
+        self.store.put(Profile("chat", [rule("discord.exe"), rule("chrome.exe", True)], 0.5, "equal_power"))
+
+        self.backend, self.core = make_core()
+        self.core.use_profiles(self.store)
+
+    def tearDown(self):
+        self.core.close()
+
+    def test_matching_session_applies_profile(self):
+        self.backend.add_session("chrome.exe", pid=10)
+        self.core.refresh(wait=True)
+
+        self.assertIs(self.core.active_profile, self.store.get("chat"))
+        self.assertIsInstance(self.core.sources[1], SourceGroup)
+        self.assertIsNone(self.core.sources[0])
+        self.assertEqual(self.core.balance, 0.5)
+        self.assertEqual(self.core.mixer.curve.name, "equal_power")
+
+        # The other rule binds once its executable shows up
+        self.backend.add_session("discord.exe", pid=20)
+        self.core.refresh(wait=True)
+        self.assertEqual(self.core.sources[0].get_session_pid(), 20)
+
+    def test_selected_sources_are_not_replaced(self):
+        self.backend.add_session("game.exe", pid=5)
+        self.core.refresh(wait=True)
+        self.core.select(0, "game.exe (PID: 5)")
+
+        self.backend.add_session("discord.exe", pid=20)
+        self.core.refresh(wait=True)
+        self.assertIsNone(self.core.active_profile)
+
+    def test_save_last_profile(self):
+        self.backend.add_session("game.exe", pid=5)
+        self.core.refresh(wait=True)
+        self.core.select(1, "game.exe (PID: 5)")
+        self.core.set_balance(-0.25)
+        save_last_profile(self.core)
+
+        profile = ProfileStore(self.store.path).load().get(LAST_PROFILE)
+        self.assertEqual(profile.sources, (None, rule("game.exe")))
+        self.assertEqual(profile.balance, -0.25)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import threading
+import time
+import unittest
+
+from src.backends import create_backend
+from src.core import BalancerCore
+from src.dispatch import LoopDispatcher
+from test.helpers import make_core
+
+class VolumeReconcilerTest(unittest.TestCase):
+    def setUp(self):
+        self.backend, self.core = make_core(("game.exe", 5), ("chat.exe", 6))
+        self.game, self.chat = self.backend.sessions
+        self.core.select(0, "game.exe (PID: 5)")
+        self.core.select(1, "chat.exe (PID: 6)")
+        self.core.set_balance(0.5)
+        self.core.scheduler.flush()
+        self.core.refresh(wait=True)
+        self.process = self.core.sources[0]
+
+    def tearDown(self):
+        self.core.close()
+
+    def settle(self):
+        self.core.dispatcher.drain()
+        self.core.scheduler.flush()
+
+    def test_own_writes_are_not_changes(self):
+        self.assertEqual(self.core.reconciler.check_all(), 0)
+        self.assertAlmostEqual(self.process.get_volume(), 0.5, places=2)
+
+    def test_notified_change_is_taken_over(self):
+        writes = self.backend.call_counts["set_volume"]
+        self.backend.change_volume(5, 0.25)
+        self.settle()
+
+        self.assertEqual(self.core.reconciler.changes, 1)
+        self.assertEqual(self.backend.call_counts["set_volume"], writes)
+        self.assertEqual(self.game.volume, 0.25)
+        self.assertAlmostEqual(self.core.mixer.get_gain(self.process), 0.25)
+        self.assertAlmostEqual(self.process.get_initial_volume(), 0.5, places=2)
+
+        # The session keeps its new level relative to the balance
+        self.core.set_balance(0.0)
+        self.core.scheduler.flush()
+        self.assertAlmostEqual(self.game.volume, 0.5, places=2)
+
+        self.core.clear(0)
+        self.core.scheduler.flush()
+        self.assertAlmostEqual(self.game.volume, 0.5, places=2)
+
+    def test_polling_finds_unreported_changes(self):
+        self.game.volume = 0.1
+        self.assertEqual(self.core.reconciler.check_all(), 1)
+        self.settle()
+
+        self.assertEqual(self.game.volume, 0.1)
+        self.assertAlmostEqual(self.process.get_volume(), 0.1)
+        self.assertEqual(self.core.reconciler.check_all(), 0)
+
+    def test_raise_past_full_volume_is_capped(self):
+        self.backend.change_volume(5, 1.0)
+        self.settle()
+
+        self.core.set_balance(0.0)
+        self.core.scheduler.flush()
+        self.assertAlmostEqual(self.game.volume, 1.0, places=2)
+
+    def test_released_sessions_are_not_watched(self):
+        self.core.clear(0)
+        self.core.scheduler.flush()
+        self.backend.change_volume(5, 0.3)
+        self.settle()
+        self.assertEqual(self.core.reconciler.changes, 0)
+
+    def test_watches_go_through_the_guard(self):
+        threads = []
+        watch_volume = self.backend.watch_volume
+
+        def recording_watch_volume(session, on_changed):
+            threads.append(threading.current_thread().name)
+            unsubscribe = watch_volume(session, on_changed)
+            return lambda: (threads.append(threading.current_thread().name), unsubscribe())
+
+        self.backend.watch_volume = recording_watch_volume
+        self.core.clear(0)
+        self.core.select(0, "game.exe (PID: 5)")
+        self.core.clear(0)
+        self.core.refresh(wait=True)
+
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith("session-call") for name in threads))
+
+    def test_polls_only_without_notifications(self):
+        self.core.start()
+        self.assertIsNone(self.core.reconciler._thread)
+        self.core.close()
+
+        backend = create_backend("simulated", session_count=0)
+        backend.watch_volume = lambda session, on_changed: None
+        game = backend.add_session("game.exe", pid=5)
+        self.core = BalancerCore(backend, LoopDispatcher(), fade_duration=0)
+        self.core.reconciler.interval = 0.01
+        self.core.start()
+        self.core.refresh(wait=True)
+        self.assertIsNone(self.core.reconciler._thread)
+
+        self.core.select(0, "game.exe (PID: 5)")
+        self.core.scheduler.flush()
+        # Watches are set up on the watcher's worker, ahead of this scan
+        self.core.refresh(wait=True)
+        self.assertIsNotNone(self.core.reconciler._thread)
+
+        game.volume = 0.4
+        deadline = time.monotonic() + 5.0
+        while self.core.reconciler.changes == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            self.core.dispatcher.drain()
+        self.assertEqual(self.core.reconciler.changes, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import time
+import unittest
+
+from src.backends import create_backend
+from src.registry import SessionEnumerator, SessionRegistry
+
+class SessionEnumeratorTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = create_backend("simulated", session_count=3)
+        self.enumerator = SessionEnumerator(self.backend)
+        self.registry = SessionRegistry()
+        self.registry.apply(self.enumerator.scan())
+
+    def test_initial_scan(self):
+        self.assertEqual(len(self.registry), 3)
+        for session in self.backend.sessions:
+            self.assertIn(f"{session.name} (PID: {session.pid})", self.registry)
+
+    def test_unchanged_scan_is_empty(self):
+        self.assertFalse(self.enumerator.scan())
+
+    def test_added_and_removed(self):
+        removed = self.backend.sessions[0]
+        self.backend.remove_session(removed.pid)
+        added = self.backend.add_session("discord.exe", pid=4242)
+
+        diff = self.enumerator.scan()
+        self.assertEqual(list(diff.added), [added.pid])
+        self.assertIs(diff.added[added.pid].get_session(), added)
+        self.assertEqual(diff.removed, [removed.pid])
+        self.assertEqual(diff.changed, {})
+
+        self.registry.apply(diff)
+        self.assertIn("discord.exe (PID: 4242)", self.registry)
+        self.assertIsNone(self.registry.get_by_pid(removed.pid))
+        self.assertEqual(len(self.registry), 3)
+
+    def test_existing_processes_kept(self):
+        session = self.backend.sessions[0]
+        process = self.registry.get_by_pid(session.pid)
+        process.activate()
+        session.volume = 0.3
+
+        self.registry.apply(self.enumerator.scan())
+        self.assertIs(self.registry.get_by_pid(session.pid), process)
+        self.assertEqual(process.get_initial_volume(), 1.0)
+
+    def test_reused_pid_is_changed(self):
+        session = self.backend.sessions[0]
+        self.backend.remove_session(session.pid)
+        reused = self.backend.add_session("vlc.exe" if session.name != "vlc.exe" else "obs64.exe", pid=session.pid)
+
+        diff = self.enumerator.session_added(reused)
+        self.assertEqual(list(diff.changed), [session.pid])
+
+        self.registry.apply(diff)
+        self.assertNotIn(f"{session.name} (PID: {session.pid})", self.registry)
+        self.assertEqual(len(self.registry), 3)
+
+    def test_lazy_records(self):
+        process = self.registry.get_by_pid(self.backend.sessions[0].pid)
+        self.assertFalse(process.is_active())
+        self.assertEqual(self.backend.call_counts["get_volume"], 0)
+
+        process.activate()
+        self.assertTrue(process.is_active())
+        self.assertEqual(process.get_initial_volume(), 1.0)
+        self.assertEqual(self.backend.call_counts["get_volume"], 1)
+
+    def test_names_looked_up_once(self):
+        lookups = self.backend.call_counts["get_session_name"]
+        for _ in range(5):
+            self.enumerator.scan()
+        list(self.registry.keys())
+
+        self.assertEqual(self.backend.call_counts["get_session_name"], lookups)
+
+class MultiEndpointTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = create_backend("simulated", session_count=0, endpoints=("Speakers", "Headset"))
+        self.game = self.backend.add_session("game.exe", pid=1, device="Speakers")
+        self.chat = self.backend.add_session("discord.exe", pid=2, device="Headset")
+        self.enumerator = SessionEnumerator(self.backend, endpoint_timeout=0.05)
+        self.registry = SessionRegistry()
+
+    def tearDown(self):
+        self.enumerator.close()
+
+    def test_sessions_of_every_endpoint_are_merged(self):
+        self.registry.apply(self.enumerator.scan())
+
+        self.assertEqual(self.registry.get_by_pid(1).get_device(), "Speakers")
+        self.assertEqual(self.registry.get_by_pid(2).get_device(), "Headset")
+        self.assertEqual(self.backend.call_counts["list_sessions"], 2)
+
+    def test_stuck_endpoint_does_not_hold_up_the_scan(self):
+        self.registry.apply(self.enumerator.scan())
+        self.backend.endpoint_latency["Headset"] = 0.5
+        self.backend.add_session("spotify.exe", pid=3, device="Speakers")
+
+        started = time.perf_counter()
+        diff = self.enumerator.scan()
+        self.assertLess(time.perf_counter() - started, 0.4)
+        # The stuck endpoint keeps its last listing instead of losing its sessions
+        self.assertEqual(list(diff.added), [3])
+        self.assertEqual(diff.removed, [])
+
+    def test_moving_to_another_device_is_a_change(self):
+        self.registry.apply(self.enumerator.scan())
+        self.chat.device = "Speakers"
+
+        diff = self.enumerator.scan()
+        self.assertEqual(list(diff.changed), [2])
+        self.assertEqual(diff.changed[2].get_device(), "Speakers")
+
+    def test_moved_session_keeps_its_record(self):
+        evicted = []
+        self.registry = SessionRegistry(on_evict=evicted.append)
+        self.registry.apply(self.enumerator.scan())
+        process = self.registry.get_by_pid(2)
+        process.activate()
+        self.chat.volume = 0.4
+        self.chat.device = "Speakers"
+
+        self.registry.apply(self.enumerator.scan())
+        self.assertIs(self.registry.get_by_pid(2), process)
+        self.assertEqual(process.get_device(), "Speakers")
+        self.assertEqual(process.get_initial_volume(), 1.0)
+        self.assertFalse(process.is_released())
+        self.assertEqual(evicted, [])
+
+        # A new session handle gets its volume reopened without a new initial volume
+        moved = self.backend.add_session("discord.exe", pid=2, volume=0.7, device="Headset")
+        process.move(moved, "Headset")
+        self.assertTrue(process.is_active())
+        self.assertEqual(process.get_volume(), 0.7)
+        self.assertEqual(process.get_initial_volume(), 1.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import contextlib
+import io
+import time
+import unittest
+
+from src.backends import create_backend
+from src.session import AudioProcess
+from src.scheduler import VolumeWriteScheduler
+
+class VolumeWriteSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = create_backend("simulated", session_count=2, call_latency=0.005)
+        self.processes = [AudioProcess(s, self.backend) for s in self.backend.list_sessions()]
+        self.scheduler = VolumeWriteScheduler(self.backend, max_rate=20)
+
+    def tearDown(self):
+        self.scheduler.close()
+
+    def test_latest_value_wins(self):
+        process = self.processes[0]
+        for step in range(100):
+            self.scheduler.submit(process, step / 100)
+        self.scheduler.flush()
+
+        self.assertEqual(process.get_volume(), 0.99)
+        self.assertLess(self.backend.call_counts["set_volume"], 10)
+
+    def test_noop_writes_skipped(self):
+        process = self.processes[0]
+        self.scheduler.submit(process, 0.5)
+        self.scheduler.flush()
+        writes = self.backend.call_counts["set_volume"]
+
+        self.scheduler.submit(process, 0.5)
+        self.scheduler.submit(process, 0.502)
+        self.scheduler.flush()
+
+        self.assertEqual(self.backend.call_counts["set_volume"], writes)
+        self.assertEqual(self.scheduler.last_written(process), 0.5)
+
+    def test_pending_cancelled_by_return_to_written_value(self):
+        process = self.processes[0]
+        self.scheduler.submit(process, 0.5)
+        self.scheduler.flush()
+
+        self.scheduler.submit(process, 0.7)
+        self.scheduler.submit(process, 0.5)
+        self.scheduler.flush()
+
+        self.assertEqual(process.get_volume(), 0.5)
+
+    def test_sessions_written_independently(self):
+        self.scheduler.submit(self.processes[0], 0.2)
+        self.scheduler.submit(self.processes[1], 0.8)
+        self.scheduler.flush()
+
+        self.assertEqual(self.processes[0].get_volume(), 0.2)
+        self.assertEqual(self.processes[1].get_volume(), 0.8)
+
+    def test_close_drains_pending(self):
+        self.scheduler.submit(self.processes[0], 0.3)
+        self.scheduler.close()
+
+        self.assertEqual(self.processes[0].get_volume(), 0.3)
+        with self.assertRaises(RuntimeError):
+            self.scheduler.submit(self.processes[0], 0.4)
+
+    def test_return_to_written_value_during_write_is_kept(self):
+        backend = create_backend("simulated", session_count=1, call_latency=0.05)
+        process = AudioProcess(backend.list_sessions()[0], backend)
+        scheduler = VolumeWriteScheduler(backend, max_rate=0)
+        scheduler.submit(process, 1.0)
+        scheduler.flush()
+        scheduler.submit(process, 0.5)
+        time.sleep(0.02)
+        # 0.5 is being written, so going back to 1.0 is a change again
+        scheduler.submit(process, 1.0)
+        scheduler.flush()
+        scheduler.close()
+        self.assertEqual(process.get_volume(), 1.0)
+
+    def test_writer_survives_failed_thread_init(self):
+        backend = create_backend("simulated", session_count=1)
+        def fail():
+            raise OSError("apartment already initialised")
+        backend.thread_init = fail
+        process = AudioProcess(backend.list_sessions()[0], backend)
+        with contextlib.redirect_stdout(io.StringIO()):
+            scheduler = VolumeWriteScheduler(backend, max_rate=0)
+            scheduler.submit(process, 0.4)
+            self.assertTrue(scheduler.flush(2.0))
+        scheduler.close()
+        self.assertEqual(process.get_volume(), 0.4)
+
+if __name__ == "__main__":
+    unittest.main()
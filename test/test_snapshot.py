@@ -0,0 +1,78 @@
+import os
+import tempfile
+import time
+import tkinter as tk
+import unittest
+
+from src.backends import create_backend
+from src.main import VolumeBalancer
+from src.profiles import Profile
+from src.snapshot import StartupSnapshot
+
+class StartupSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "snapshot.json")
+
+    def test_round_trip(self):
+        profile = Profile("", [{"exe": "game.exe", "group": False}, None], -0.5, "equal_power")
+        StartupSnapshot(["game.exe (PID: 5)"], profile).save(self.path)
+
+        snapshot = StartupSnapshot.load(self.path)
+        self.assertEqual(snapshot.sessions, ["game.exe (PID: 5)"])
+        self.assertEqual(snapshot.profile.sources, ({"exe": "game.exe", "group": False}, None))
+        self.assertEqual((snapshot.profile.balance, snapshot.profile.curve), (-0.5, "equal_power"))
+
+    def test_missing_or_unreadable_snapshot_is_ignored(self):
+        self.assertIsNone(StartupSnapshot.load(self.path))
+        with open(self.path, "w") as f:
+            f.write("{")
+        self.assertIsNone(StartupSnapshot.load(self.path))
+
+    def test_unknown_curve_is_skipped(self):
+        profile = Profile("", [None, None], 0.25, "renamed_curve")
+        StartupSnapshot(["game.exe (PID: 5)"], profile).save(self.path)
+
+        root = tk.Tk()
+        root.withdraw()
+        app = VolumeBalancer(root, create_backend("simulated", session_count=0), hotkeys=False, snapshot=self.path)
+        self.assertEqual(app.core.mixer.curve.name, "linear")
+        self.assertEqual(app.balance_var.get(), 0.25)
+        app.on_closing()
+
+class WarmStartTest(unittest.TestCase):
+    def test_window_starts_from_snapshot(self):
+        path = os.path.join(tempfile.mkdtemp(), "snapshot.json")
+        profile = Profile("", [{"exe": "game.exe", "group": False}, None], -0.5)
+        StartupSnapshot(["game.exe (PID: 5)", "old.exe (PID: 9)"], profile).save(path)
+
+        backend = create_backend("simulated", session_count=0)
+        backend.add_session("game.exe", pid=5)
+        backend.add_session("chat.exe", pid=6)
+        root = tk.Tk()
+        root.withdraw()
+        app = VolumeBalancer(root, backend, hotkeys=False, snapshot=path)
+
+        # Drawn from the snapshot before any live session is applied
+        app.view.flush()
+        self.assertEqual(app.picker1.visible, ["game.exe (PID: 5)", "old.exe (PID: 9)"])
+        self.assertEqual(app.process1_label.cget("text"), "game.exe")
+        self.assertEqual(app.process1_label.cget("fg"), "gray")
+        self.assertEqual(app.balance_var.get(), -0.5)
+
+        app.refresh_processes(wait=True)
+        deadline = time.monotonic() + 2.0
+        while app._snapshot_keys and time.monotonic() < deadline:
+            app.dispatcher.drain()
+        app.view.flush()
+
+        self.assertEqual(app.picker2.visible, ["chat.exe (PID: 6)"])
+        self.assertEqual(app.process1.get_readable_process_key(), "game.exe (PID: 5)")
+        self.assertEqual(app.process1_label.cget("fg"), "black")
+
+        app.on_closing()
+        snapshot = StartupSnapshot.load(path)
+        self.assertEqual(sorted(snapshot.sessions), ["chat.exe (PID: 6)", "game.exe (PID: 5)"])
+        self.assertEqual(snapshot.profile.sources[0], {"exe": "game.exe", "group": False})
+
+if __name__ == "__main__":
+    unittest.main()
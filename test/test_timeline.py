@@ -0,0 +1,95 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from src.timeline import Timeline
+from test.helpers import make_core
+
+class TimelineTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "moves.timeline")
+
+    def test_round_trip(self):
+        timeline = Timeline()
+        for i, value in enumerate((0.0, -0.5, 0.25, 1.0)):
+            timeline.append(i * 0.125, value)
+        timeline.save(self.path)
+
+        loaded = Timeline.load(self.path)
+        self.assertEqual(list(loaded.times), [0.0, 0.125, 0.25, 0.375])
+        self.assertEqual(list(loaded.values), [0.0, -0.5, 0.25, 1.0])
+        self.assertEqual(os.path.getsize(self.path), 12 + 4 * 12)
+
+    def test_foreign_or_truncated_file_is_rejected(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a timeline")
+        with self.assertRaises(ValueError):
+            Timeline.load(self.path)
+
+        timeline = Timeline()
+        timeline.append(0.0, 0.5)
+        timeline.save(self.path)
+        with open(self.path, "r+b") as f:
+            f.truncate(16)
+        with self.assertRaises(ValueError):
+            Timeline.load(self.path)
+
+class RecordAndPlayTest(unittest.TestCase):
+    def setUp(self):
+        backend, self.core = make_core(("game.exe", 5), ("chat.exe", 6))
+        self.game, self.chat = backend.sessions
+        self.dispatcher = self.core.dispatcher
+        self.core.select(0, "game.exe (PID: 5)")
+        self.core.select(1, "chat.exe (PID: 6)")
+
+        self.thread = threading.Thread(target=self.dispatcher.run, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.dispatcher.post(self.dispatcher.stop)
+        self.thread.join()
+        self.core.close()
+
+    def call(self, function, *args):
+        done = threading.Event()
+        self.dispatcher.post(lambda: (function(*args), done.set()))
+        done.wait()
+
+    def test_recorded_moves_play_back(self):
+        self.call(self.core.start_recording)
+        for balance in (-0.5, 0.5, 1.0):
+            time.sleep(0.1)
+            self.call(self.core.set_balance, balance)
+        timeline = self.core.stop_recording()
+
+        self.assertEqual(list(timeline.values), [0.0, -0.5, 0.5, 1.0])
+        self.assertGreaterEqual(timeline.times[1], 0.1)
+        self.assertEqual(list(timeline.times), sorted(timeline.times))
+
+        self.call(self.core.set_balance, 0.0)
+        player = self.core.play(timeline)
+        self.assertTrue(player.wait(2.0))
+        self.call(lambda: None)
+
+        self.assertEqual(self.core.balance, 1.0)
+        self.assertEqual(player.dropped, 0)
+        self.assertEqual(player.jitter.count, 4)
+        self.assertLess(player.jitter.max, 0.05)
+
+    def test_superseded_points_are_dropped(self):
+        timeline = Timeline()
+        for i in range(1000):
+            timeline.append(i * 1e-5, i / 1000)
+
+        player = self.core.play(timeline)
+        self.assertTrue(player.wait(2.0))
+        self.call(lambda: None)
+
+        self.assertAlmostEqual(self.core.balance, 0.999, places=6)
+        self.assertGreater(player.dropped, 0)
+        self.assertEqual(player.stats()["points"], 1000)
+
+if __name__ == "__main__":
+    unittest.main()
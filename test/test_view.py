@@ -0,0 +1,81 @@
+import unittest
+
+from src.view import RenderQueue
+
+class ManualRoot:
+    """Stands in for a Tk root whose scheduled callbacks run on ``run()``."""
+
+    def __init__(self):
+        self.pending = {}
+        self._count = 0
+
+    def after(self, ms, function):
+        self._count += 1
+        self.pending[self._count] = function
+        return self._count
+
+    def after_idle(self, function):
+        return self.after(0, function)
+
+    def after_cancel(self, handle):
+        self.pending.pop(handle, None)
+
+    def run(self):
+        pending, self.pending = self.pending, {}
+        for function in pending.values():
+            function()
+
+class Label:
+    def __init__(self):
+        self.configs = []
+
+    def config(self, **options):
+        self.configs.append(options)
+
+class RenderQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.root = ManualRoot()
+        self.view = RenderQueue(self.root)
+        self.label = Label()
+
+    def test_burst_costs_one_flush(self):
+        for index in range(10):
+            self.view.set(self.label, text=f"step {index}")
+        self.assertEqual(len(self.root.pending), 1)
+
+        self.root.run()
+        self.assertEqual(self.label.configs, [{"text": "step 9"}])
+        self.assertEqual(self.view.rendered(self.label, "text"), "step 9")
+
+    def test_only_changed_options_are_applied(self):
+        self.view.set(self.label, text="game.exe", fg="black")
+        self.view.flush()
+        self.view.set(self.label, text="game.exe", fg="red")
+        self.view.flush()
+        self.view.set(self.label, text="game.exe", fg="red")
+        self.view.flush()
+
+        self.assertEqual(self.label.configs, [{"text": "game.exe", "fg": "black"}, {"fg": "red"}])
+
+    def test_calls_keep_the_latest_per_key(self):
+        calls = []
+        self.view.call("pickers", calls.append, 1)
+        self.view.call("pickers", calls.append, 2)
+        self.view.call("labels", calls.append, 3)
+        self.root.run()
+        self.assertEqual(calls, [2, 3])
+
+    def test_calls_may_set_options(self):
+        self.view.call("labels", lambda: self.view.set(self.label, text="chat.exe"))
+        self.view.flush()
+        self.assertEqual(self.label.configs, [{"text": "chat.exe"}])
+
+    def test_close_drops_pending_updates(self):
+        self.view.set(self.label, text="chat.exe")
+        self.view.close()
+        self.assertEqual(self.root.pending, {})
+        self.view.flush()
+        self.assertEqual(self.label.configs, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+
+from src.backends import create_backend
+from src.backends.base import AudioBackend
+from src.registry import SessionRegistry
+from src.watcher import SessionWatcher
+
+class ManualDispatcher:
+    def __init__(self):
+        self.posted = []
+        self.timers = []
+
+    def post(self, callback, *args):
+        self.posted.append((callback, args))
+
+    def call_later(self, delay, callback, *args):
+        self.timers.append((delay, callback, args))
+        return len(self.timers)
+
+    def cancel(self, handle):
+        pass
+
+    def drain(self):
+        posted, self.posted = self.posted, []
+        for callback, args in posted:
+            callback(*args)
+
+class PollingBackend(AudioBackend):
+    def __init__(self, sessions):
+        self.sessions = sessions
+
+    def list_sessions(self):
+        return list(self.sessions)
+
+    def get_session_pid(self, session):
+        return session.pid
+
+    def get_session_name(self, session):
+        return session.name
+
+    def open_volume(self, session):
+        return session
+
+    def get_volume(self, volume):
+        return volume.volume
+
+class SessionWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = ManualDispatcher()
+        self.registry = SessionRegistry()
+        self.changes = 0
+
+    def tearDown(self):
+        self.watcher.close()
+
+    def _start(self, backend):
+        self.watcher = SessionWatcher(backend, self.dispatcher, self.registry, self._on_change)
+        self.watcher.start()
+        self.watcher.refresh(wait=True)
+
+    def _on_change(self):
+        self.changes += 1
+
+    def test_push_notifications(self):
+        backend = create_backend("simulated", session_count=2)
+        self._start(backend)
+
+        self.assertTrue(self.watcher.is_push)
+        self.assertEqual(len(self.registry), 2)
+        scans = backend.call_counts["list_sessions"]
+
+        added = backend.add_session("discord.exe", pid=4242)
+        backend.remove_session(backend.sessions[0].pid)
+        self.dispatcher.drain()
+
+        self.assertIn("discord.exe (PID: 4242)", self.registry)
+        self.assertEqual(len(self.registry), 2)
+        self.assertEqual(backend.call_counts["list_sessions"], scans)
+
+        # The timer only reconciles, it does not poll at the fast interval
+        self.assertEqual(self.dispatcher.timers[-1][0], self.watcher.reconcile_interval)
+        self.assertIs(self.registry.get_by_pid(added.pid).get_session(), added)
+
+    def test_polling_fallback(self):
+        simulated = create_backend("simulated", session_count=2)
+        backend = PollingBackend(simulated.sessions)
+        self._start(backend)
+
+        self.assertFalse(self.watcher.is_push)
+        self.assertEqual(len(self.registry), 2)
+
+        backend.sessions.append(simulated.add_session("vlc.exe", pid=777))
+        delay, callback, args = self.dispatcher.timers[-1]
+        self.assertEqual(delay, self.watcher.poll_interval)
+
+        callback(*args)
+        self.watcher.refresh(wait=True)
+        self.assertIn("vlc.exe (PID: 777)", self.registry)
+
+    def test_batched_change_notification(self):
+        backend = create_backend("simulated", session_count=0)
+        self._start(backend)
+        self.changes = 0
+
+        for pid in range(10):
+            backend.add_session("game.exe", pid=pid + 1)
+        self.dispatcher.drain()
+
+        self.assertEqual(len(self.registry), 10)
+        self.assertEqual(self.changes, 1)
+
+    def test_close_unsubscribes(self):
+        backend = create_backend("simulated", session_count=1)
+        self._start(backend)
+        self.assertEqual(len(backend._watchers), 1)
+
+        self.watcher.close()
+        self.watcher._executor.shutdown(wait=True)
+        self.assertEqual(backend._watchers, [])
+
+    def test_pushed_removal_during_a_scan_sticks(self):
+        backend = create_backend("simulated", session_count=2)
+        self._start(backend)
+        gone = backend.sessions[0]
+        listed = backend.list_sessions()
+
+        # The session exits while a scan is between listing and diffing
+        original = backend.list_sessions
+        def list_sessions(endpoint=None):
+            backend.remove_session(gone.pid)
+            return listed
+        backend.list_sessions = list_sessions
+        self.watcher.refresh(wait=True)
+        backend.list_sessions = original
+        self.dispatcher.drain()
+
+        self.assertIsNone(self.registry.get_by_pid(gone.pid))
+        self.assertEqual(len(self.registry), 1)
+
+if __name__ == "__main__":
+    unittest.main()